@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+#
+# bench_compression.py
+#
+# Copyright (C) 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-opc and is released under the MIT License:
+# http://www.opensource.org/licenses/mit-license.php
+
+"""
+Benchmark comparing the CPU time and size of saving a media-heavy .pptx
+package with the default compression policy, which stores already
+compressed media, against deflating every member as was done before. Run
+with ``python benchmarks/bench_compression.py``.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+
+from io import BytesIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_package import build_pptx, _PackageBuilder  # noqa
+
+from opc.compression import CompressionPolicy, DEFAULT_LEVELS  # noqa
+from opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT  # noqa
+from opc.package import Part  # noqa
+from opc.packuri import PackURI  # noqa
+
+
+SLIDE_COUNT = 20
+IMAGE_COUNTS = (10, 50, 100)
+IMAGE_SIZE = 256 * 1024
+SAVE_COUNT = 3
+
+# deflate everything at the default level, as before compression policies
+DEFLATE_ALL = CompressionPolicy(
+    levels=dict((content_type, -1) for content_type in DEFAULT_LEVELS)
+)
+
+
+def build_media_deck(image_count):
+    """
+    Return a .pptx-shaped package with *image_count* JPEG images of random,
+    so incompressible, bytes, like real photos.
+    """
+    pkg = build_pptx(SLIDE_COUNT, 1)
+    presentation = pkg.parts[0]
+    for idx in range(1, image_count + 1):
+        image = Part(PackURI('/ppt/media/image%d.jpeg' % idx), CT.JPEG,
+                     os.urandom(IMAGE_SIZE))
+        _PackageBuilder.relate(presentation, RT.IMAGE, image)
+    return pkg
+
+
+def save_cpu_time(pkg, compression):
+    start = time.process_time()
+    for _ in range(SAVE_COUNT):
+        stream = BytesIO()
+        pkg.save(stream, compression=compression)
+    return (time.process_time() - start) / SAVE_COUNT, len(stream.getvalue())
+
+
+def main():
+    print('%8s  %14s  %14s  %8s  %10s  %10s' % (
+        'images', 'deflate (s)', 'policy (s)', 'speedup', 'deflate MB',
+        'policy MB'))
+    for image_count in IMAGE_COUNTS:
+        pkg = build_media_deck(image_count)
+        deflate_secs, deflate_size = save_cpu_time(pkg, DEFLATE_ALL)
+        policy_secs, policy_size = save_cpu_time(pkg, None)
+        print('%8d  %14.4f  %14.4f  %7.1fx  %10.1f  %10.1f' % (
+            image_count, deflate_secs, policy_secs,
+            deflate_secs / policy_secs, deflate_size / 1e6,
+            policy_size / 1e6))
+
+
+if __name__ == '__main__':
+    main()
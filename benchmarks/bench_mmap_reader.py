@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#
+# bench_mmap_reader.py
+#
+# Copyright (C) 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-opc and is released under the MIT License:
+# http://www.opensource.org/licenses/mit-license.php
+
+"""
+Benchmark comparing opening packages from local files with the
+memory-mapped reader now used for a package path against the seek-and-read
+|ZipFile| reader still used for a file-like object. Run with
+``python benchmarks/bench_mmap_reader.py``.
+"""
+
+from __future__ import print_function
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_package import build_pptx  # noqa
+
+from opc import pkgreader  # noqa
+from opc.package import OpcPackage  # noqa
+from opc.phys_pkg import MmapZipPkgReader, ZipPkgReader  # noqa
+
+
+PART_COUNTS = (10, 100, 1000)
+OPEN_COUNT = 200
+
+
+def open_packages(pkg_path, count):
+    start = time.time()
+    for _ in range(count):
+        OpcPackage.open(pkg_path)
+    return time.time() - start
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix='opc-bench-')
+    print('%8s  %6s  %12s  %12s  %8s' % (
+        'parts', 'opens', 'zip (s)', 'mmap (s)', 'speedup'))
+    try:
+        for part_count in PART_COUNTS:
+            pkg_path = os.path.join(workdir, 'pkg%d.pptx' % part_count)
+            build_pptx(part_count, 1).save(pkg_path)
+            count = max(1, OPEN_COUNT * 10 // part_count)
+            times = []
+            for phys_reader_cls in (ZipPkgReader, MmapZipPkgReader):
+                pkgreader.PhysPkgReader = (
+                    lambda pkg_file, backend, cls=phys_reader_cls:
+                    cls(pkg_file)
+                )
+                times.append(open_packages(pkg_path, count))
+            zip_secs, mmap_secs = times
+            print('%8d  %6d  %12.4f  %12.4f  %7.1fx' % (
+                part_count, count, zip_secs, mmap_secs, zip_secs / mmap_secs))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
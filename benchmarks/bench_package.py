@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+#
+# bench_package.py
+#
+# Copyright (C) 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-opc and is released under the MIT License:
+# http://www.opensource.org/licenses/mit-license.php
+
+"""
+Benchmark suite for whole-package operations. Synthesizes .docx, .pptx and
+.xlsx-shaped packages of increasing size and, for each, times saving,
+opening, traversing the parts, serializing the relationships and mapping
+content types, along with the peak RSS of the process doing the work.
+
+Two sweeps are run for each package shape: one scaling the number of parts
+with a single extra relationship per content part, and one scaling the
+number of relationships per content part in a ten-part package. Each case
+runs in a fresh worker process so its peak RSS is not inflated by the cases
+before it.
+
+Run with ``python benchmarks/bench_package.py``; ``--full`` extends the
+sweeps to 100k parts and 50k relationships per part. ``--json`` saves the
+results and ``--baseline`` compares a run against saved results, exiting
+non-zero when any operation slows by more than ``--tolerance``.
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from multiprocessing import Pool
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT  # noqa
+from opc.package import OpcPackage, Part  # noqa
+from opc.packuri import PackURI  # noqa
+from opc.pkgreader import _ContentTypeMap  # noqa
+from opc.pkgwriter import _ContentTypesItem  # noqa
+
+
+PART_COUNTS = (10, 100, 1000, 10000)
+FULL_PART_COUNTS = PART_COUNTS + (100000,)
+REL_COUNTS = (1, 10, 100, 1000, 10000)
+FULL_REL_COUNTS = REL_COUNTS + (50000,)
+REL_SWEEP_PART_COUNT = 10
+
+OPERATIONS = ('save', 'open', 'parts', 'rels_xml', 'ct_write', 'ct_read')
+
+_XML_BLOB = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<root>' +
+    b'<p>Lorem ipsum dolor sit amet</p>' * 32 + b'</root>'
+)
+_MEDIA_BLOB = bytes(bytearray(range(256))) * 4
+
+
+class _PackageBuilder(object):
+    """
+    Accumulates the parts of a synthetic package, relating each new part
+    to its source and giving each content part *extra_rels* external
+    hyperlink relationships, as a document with many links would have.
+    """
+    def __init__(self, extra_rels):
+        self._extra_rels = extra_rels
+        self.pkg = OpcPackage()
+
+    def add_part(self, source, reltype, partname, content_type, blob,
+                 is_content=False):
+        part = Part(PackURI(partname), content_type, blob)
+        self.relate(source, reltype, part)
+        if is_content:
+            for idx in range(self._extra_rels):
+                url = 'http://example.com/%s/link%d' % (partname, idx)
+                self.relate(part, RT.HYPERLINK, url, external=True)
+        return part
+
+    @staticmethod
+    def relate(source, reltype, target, external=False):
+        rId = source.rels.next_available_rId
+        source._add_relationship(reltype, target, rId, external)
+
+
+def build_docx(part_count, extra_rels):
+    """
+    Return a .docx-shaped package: a main document part with styles and
+    *part_count* - 2 images hanging directly off it.
+    """
+    builder = _PackageBuilder(extra_rels)
+    document = builder.add_part(
+        builder.pkg, RT.OFFICE_DOCUMENT, '/word/document.xml',
+        CT.WML_DOCUMENT_MAIN, _XML_BLOB, is_content=True
+    )
+    builder.add_part(document, RT.STYLES, '/word/styles.xml',
+                     CT.WML_STYLES, _XML_BLOB)
+    for idx in range(1, part_count - 1):
+        builder.add_part(document, RT.IMAGE, '/word/media/image%d.png' % idx,
+                         CT.PNG, _MEDIA_BLOB)
+    return builder.pkg
+
+
+def build_pptx(part_count, extra_rels):
+    """
+    Return a .pptx-shaped package: a presentation part with a slide master
+    and layout, and *part_count* - 3 slides that all relate to the shared
+    layout, so most of the relationship graph converges on one part.
+    """
+    builder = _PackageBuilder(extra_rels)
+    presentation = builder.add_part(
+        builder.pkg, RT.OFFICE_DOCUMENT, '/ppt/presentation.xml',
+        CT.PML_PRESENTATION_MAIN, _XML_BLOB
+    )
+    master = builder.add_part(
+        presentation, RT.SLIDE_MASTER, '/ppt/slideMasters/slideMaster1.xml',
+        CT.PML_SLIDE_MASTER, _XML_BLOB
+    )
+    layout = builder.add_part(
+        master, RT.SLIDE_LAYOUT, '/ppt/slideLayouts/slideLayout1.xml',
+        CT.PML_SLIDE_LAYOUT, _XML_BLOB
+    )
+    builder.relate(layout, RT.SLIDE_MASTER, master)
+    for idx in range(1, part_count - 2):
+        slide = builder.add_part(
+            presentation, RT.SLIDE, '/ppt/slides/slide%d.xml' % idx,
+            CT.PML_SLIDE, _XML_BLOB, is_content=True
+        )
+        builder.relate(slide, RT.SLIDE_LAYOUT, layout)
+    return builder.pkg
+
+
+def build_xlsx(part_count, extra_rels):
+    """
+    Return an .xlsx-shaped package: a workbook part with shared strings
+    and *part_count* - 2 worksheets.
+    """
+    builder = _PackageBuilder(extra_rels)
+    workbook = builder.add_part(
+        builder.pkg, RT.OFFICE_DOCUMENT, '/xl/workbook.xml',
+        CT.SML_SHEET_MAIN, _XML_BLOB
+    )
+    builder.add_part(workbook, RT.SHARED_STRINGS, '/xl/sharedStrings.xml',
+                     CT.SML_SHARED_STRINGS, _XML_BLOB)
+    for idx in range(1, part_count - 1):
+        builder.add_part(
+            workbook, RT.WORKSHEET, '/xl/worksheets/sheet%d.xml' % idx,
+            CT.SML_WORKSHEET, _XML_BLOB, is_content=True
+        )
+    return builder.pkg
+
+
+SHAPES = {
+    'docx': build_docx,
+    'pptx': build_pptx,
+    'xlsx': build_xlsx,
+}
+
+
+def peak_rss_mib():
+    """
+    Return the peak resident set size of this process in MiB, or |None|
+    where the :mod:`resource` module is not available.
+    """
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return maxrss / float(divisor)
+
+
+def timed(func, *args):
+    """
+    Return a 2-tuple ``(seconds, result)`` for calling *func* with *args*.
+    """
+    start = time.time()
+    result = func(*args)
+    return time.time() - start, result
+
+
+def serialize_rels(pkg):
+    return [pkg.rels.xml] + [part.rels.xml for part in pkg.parts]
+
+
+def run_case(shape, part_count, extra_rels, workdir):
+    """
+    Return a dict of timings and peak RSS for one package of *shape* having
+    *part_count* parts and *extra_rels* extra relationships per content
+    part. Meant to run in its own worker process.
+    """
+    pkg_path = os.path.join(
+        workdir, '%s-%d-%d.%s' % (shape, part_count, extra_rels, shape)
+    )
+    pkg = SHAPES[shape](part_count, extra_rels)
+    times = {}
+    times['save'], _ = timed(pkg.save, pkg_path)
+    del pkg
+
+    times['open'], pkg = timed(OpcPackage.open, pkg_path)
+    times['parts'], parts = timed(lambda: pkg.parts)
+    times['rels_xml'], _ = timed(serialize_rels, pkg)
+    times['ct_write'], ct_xml = timed(_ContentTypesItem.xml_for, parts)
+    times['ct_read'], _ = timed(_ContentTypeMap.from_xml, ct_xml)
+    os.remove(pkg_path)
+
+    return {
+        'shape': shape,
+        'parts': part_count,
+        'rels': extra_rels,
+        'times': times,
+        'peak_rss_mib': peak_rss_mib(),
+    }
+
+
+def _run_case_star(args):
+    return run_case(*args)
+
+
+def iter_cases(shapes, part_counts, rel_counts):
+    for shape in shapes:
+        cases = [(shape, part_count, 1) for part_count in part_counts]
+        cases.extend(
+            (shape, REL_SWEEP_PART_COUNT, rel_count)
+            for rel_count in rel_counts
+            if (shape, REL_SWEEP_PART_COUNT, rel_count) not in cases
+        )
+        for case in cases:
+            yield case
+
+
+def case_key(result):
+    return '%s/%d/%d' % (result['shape'], result['parts'], result['rels'])
+
+
+def print_header():
+    columns = ['%-5s %7s %6s' % ('shape', 'parts', 'rels')]
+    columns.extend('%9s' % op for op in OPERATIONS)
+    columns.append('%9s' % 'rss MiB')
+    print('  '.join(columns))
+
+
+def print_result(result, baseline):
+    columns = ['%-5s %7d %6d' % (
+        result['shape'], result['parts'], result['rels'])]
+    base_times = baseline.get(case_key(result), {}).get('times', {})
+    for op in OPERATIONS:
+        secs = result['times'][op]
+        base_secs = base_times.get(op)
+        if base_secs:
+            columns.append('%8.2fx' % (secs / base_secs))
+        else:
+            columns.append('%9.4f' % secs)
+    rss = result['peak_rss_mib']
+    columns.append('%9s' % ('-' if rss is None else '%.1f' % rss))
+    print('  '.join(columns))
+    sys.stdout.flush()
+
+
+def regressions(results, baseline, tolerance):
+    """
+    Return a list of ``(case, operation, ratio)`` for each operation in
+    *results* that took more than *tolerance* times its *baseline* time.
+    Operations too fast to time reliably are ignored.
+    """
+    slow = []
+    for result in results:
+        base_times = baseline.get(case_key(result), {}).get('times', {})
+        for op in OPERATIONS:
+            base_secs = base_times.get(op)
+            if not base_secs or base_secs < 0.01:
+                continue
+            ratio = result['times'][op] / base_secs
+            if ratio > tolerance:
+                slow.append((case_key(result), op, ratio))
+    return slow
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--shape', action='append', choices=sorted(SHAPES),
+                        help='package shape to run, may be repeated; '
+                             'default all')
+    parser.add_argument('--full', action='store_true',
+                        help='extend sweeps to 100k parts and 50k rels')
+    parser.add_argument('--json', metavar='PATH',
+                        help='write results to PATH as JSON')
+    parser.add_argument('--baseline', metavar='PATH',
+                        help='compare against results saved with --json, '
+                             'reporting times as ratios to the baseline')
+    parser.add_argument('--tolerance', type=float, default=1.25,
+                        help='slowdown ratio counted as a regression '
+                             '(default 1.25)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    shapes = args.shape or sorted(SHAPES)
+    part_counts = FULL_PART_COUNTS if args.full else PART_COUNTS
+    rel_counts = FULL_REL_COUNTS if args.full else REL_COUNTS
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = dict((case_key(r), r) for r in json.load(f))
+
+    workdir = tempfile.mkdtemp(prefix='opc-bench-')
+    cases = [
+        case + (workdir,) for case in
+        iter_cases(shapes, part_counts, rel_counts)
+    ]
+    pool = Pool(processes=1, maxtasksperchild=1)
+    results = []
+    try:
+        print_header()
+        for result in pool.imap(_run_case_star, cases):
+            print_result(result, baseline)
+            results.append(result)
+    finally:
+        pool.terminate()
+        pool.join()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    slow = regressions(results, baseline, args.tolerance)
+    for key, op, ratio in slow:
+        print('REGRESSION %s %s: %.2fx baseline' % (key, op, ratio))
+    return 1 if slow else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+#
+# bench_rels_parsing.py
+#
+# Copyright (C) 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-opc and is released under the MIT License:
+# http://www.opensource.org/licenses/mit-license.php
+
+"""
+Benchmark comparing parsing of .rels and [Content_Types].xml items using the
+objectify-based oxml parser, as python-opc originally did, with the plain
+``etree`` parsing now used by |PackageReader|. Run with
+``python benchmarks/bench_rels_parsing.py``.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from opc.constants import NAMESPACE as NS  # noqa
+from opc.oxml import oxml_fromstring  # noqa
+from opc.pkgreader import (  # noqa
+    _ContentTypeMap, _SerializedRelationshipCollection
+)
+
+
+ENTRY_COUNTS = (100, 1000, 10000)
+REPEAT = 5
+
+
+def rels_xml(count):
+    rel_tmpl = (
+        '<Relationship Id="rId%d" Type="http://schemas.openxmlformats.org/of'
+        'ficeDocument/2006/relationships/slide" Target="slides/slide%d.xml"/>'
+    )
+    rels = ''.join(rel_tmpl % (idx, idx) for idx in range(1, count + 1))
+    return ('<Relationships xmlns="%s">%s</Relationships>' %
+            (NS.OPC_RELATIONSHIPS, rels)).encode('utf-8')
+
+
+def types_xml(count):
+    override_tmpl = (
+        '<Override PartName="/ppt/slides/slide%d.xml" ContentType="applicat'
+        'ion/vnd.openxmlformats-officedocument.presentationml.slide+xml"/>'
+    )
+    overrides = ''.join(override_tmpl % idx for idx in range(1, count + 1))
+    defaults = (
+        '<Default Extension="rels" ContentType="application/vnd.openxmlforma'
+        'ts-package.relationships+xml"/><Default Extension="xml" ContentType='
+        '"application/xml"/>'
+    )
+    return ('<Types xmlns="%s">%s%s</Types>' %
+            (NS.OPC_CONTENT_TYPES, defaults, overrides)).encode('utf-8')
+
+
+def objectify_rels(rels_item_xml):
+    rels_elm = oxml_fromstring(rels_item_xml)
+    return [
+        (r.rId, r.reltype, r.target_ref, r.target_mode)
+        for r in rels_elm.Relationship
+    ]
+
+
+def objectify_types(content_types_xml):
+    types_elm = oxml_fromstring(content_types_xml)
+    overrides = dict((o.partname, o.content_type) for o in types_elm.overrides)
+    defaults = dict(
+        ('.%s' % d.extension, d.content_type) for d in types_elm.defaults
+    )
+    return overrides, defaults
+
+
+def plain_rels(rels_item_xml):
+    return _SerializedRelationshipCollection.load_from_xml('/ppt',
+                                                           rels_item_xml)
+
+
+def plain_types(content_types_xml):
+    return _ContentTypeMap.from_xml(content_types_xml)
+
+
+def best_time(func, arg):
+    best = None
+    for _ in range(REPEAT):
+        start = time.time()
+        func(arg)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    print('%-14s %8s  %14s  %14s  %8s' % (
+        'item', 'entries', 'objectify (s)', 'plain (s)', 'speedup'))
+    cases = (
+        ('rels', rels_xml, objectify_rels, plain_rels),
+        ('content types', types_xml, objectify_types, plain_types),
+    )
+    for name, make_xml, objectify_func, plain_func in cases:
+        for count in ENTRY_COUNTS:
+            xml = make_xml(count)
+            objectify_secs = best_time(objectify_func, xml)
+            plain_secs = best_time(plain_func, xml)
+            print('%-14s %8d  %14.5f  %14.5f  %7.1fx' % (
+                name, count, objectify_secs, plain_secs,
+                objectify_secs / plain_secs))
+
+
+if __name__ == '__main__':
+    main()
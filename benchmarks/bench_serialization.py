@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+#
+# bench_serialization.py
+#
+# Copyright (C) 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-opc and is released under the MIT License:
+# http://www.opensource.org/licenses/mit-license.php
+
+"""
+Benchmark comparing serialization of .rels and [Content_Types].xml items by
+parsing an XML template for each element, as python-opc originally did, with
+the direct element construction now used by the oxml custom element classes.
+Run with ``python benchmarks/bench_serialization.py``.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from lxml import objectify  # noqa
+
+from opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT  # noqa
+from opc.constants import RELATIONSHIP_TARGET_MODE as RTM  # noqa
+from opc.oxml import (  # noqa
+    CT_Relationships, CT_Types, nsmap, oxml_fromstring, oxml_tostring
+)
+
+
+ENTRY_COUNTS = (100, 1000, 10000)
+REPEAT = 5
+
+
+def rels_entries(count):
+    return [
+        ('rId%d' % idx, RT.SLIDE, 'slides/slide%d.xml' % idx, False)
+        for idx in range(1, count + 1)
+    ]
+
+
+def types_entries(count):
+    return [
+        ('/ppt/slides/slide%d.xml' % idx, CT.PML_SLIDE)
+        for idx in range(1, count + 1)
+    ]
+
+
+def _template_element(tmpl, ns_prefix, *attrs):
+    """
+    Return an element built the way the original ``new()`` methods did, by
+    parsing an XML template and then deannotating the result.
+    """
+    elm = oxml_fromstring(tmpl % nsmap[ns_prefix])
+    for name, value in attrs:
+        elm.set(name, value)
+    objectify.deannotate(elm, cleanup_namespaces=True)
+    return elm
+
+
+def template_rels(entries):
+    rels_elm = _template_element('<Relationships xmlns="%s"/>', 'pr')
+    for rId, reltype, target, is_external in entries:
+        attrs = [('Id', rId), ('Type', reltype), ('Target', target)]
+        if is_external:
+            attrs.append(('TargetMode', RTM.EXTERNAL))
+        rels_elm.append(
+            _template_element('<Relationship xmlns="%s"/>', 'pr', *attrs)
+        )
+    return oxml_tostring(rels_elm, encoding='UTF-8', standalone=True)
+
+
+def direct_rels(entries):
+    rels_elm = CT_Relationships.new()
+    for rId, reltype, target, is_external in entries:
+        rels_elm.add_rel(rId, reltype, target, is_external)
+    return oxml_tostring(rels_elm, encoding='UTF-8', standalone=True)
+
+
+def template_types(entries):
+    types_elm = _template_element('<Types xmlns="%s"/>', 'ct')
+    types_elm.append(_template_element(
+        '<Default xmlns="%s"/>', 'ct', ('Extension', 'rels'),
+        ('ContentType', CT.OPC_RELATIONSHIPS)
+    ))
+    for partname, content_type in entries:
+        types_elm.append(_template_element(
+            '<Override xmlns="%s"/>', 'ct', ('PartName', partname),
+            ('ContentType', content_type)
+        ))
+    return oxml_tostring(types_elm, encoding='UTF-8', standalone=True)
+
+
+def direct_types(entries):
+    types_elm = CT_Types.new()
+    types_elm.add_default('.rels', CT.OPC_RELATIONSHIPS)
+    for partname, content_type in entries:
+        types_elm.add_override(partname, content_type)
+    return oxml_tostring(types_elm, encoding='UTF-8', standalone=True)
+
+
+def best_time(func, arg):
+    best = None
+    for _ in range(REPEAT):
+        start = time.time()
+        func(arg)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    print('%-14s %8s  %14s  %14s  %8s' % (
+        'item', 'entries', 'template (s)', 'direct (s)', 'speedup'))
+    cases = (
+        ('rels', rels_entries, template_rels, direct_rels),
+        ('content types', types_entries, template_types, direct_types),
+    )
+    for name, make_entries, template_func, direct_func in cases:
+        for count in ENTRY_COUNTS:
+            entries = make_entries(count)
+            assert template_func(entries) == direct_func(entries)
+            template_secs = best_time(template_func, entries)
+            direct_secs = best_time(direct_func, entries)
+            print('%-14s %8d  %14.5f  %14.5f  %7.1fx' % (
+                name, count, template_secs, direct_secs,
+                template_secs / direct_secs))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+# bench_traversal.py
+#
+# Copyright (C) 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-opc and is released under the MIT License:
+# http://www.opensource.org/licenses/mit-license.php
+
+"""
+Benchmark for relationship graph traversal, showing how the time to walk
+the parts of an in-memory package and of a serialized package scales with
+the number of parts. Time per part should stay roughly constant as the part
+count doubles. Run with ``python benchmarks/bench_traversal.py``.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+
+from io import BytesIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from opc.constants import RELATIONSHIP_TYPE as RT  # noqa
+from opc.package import OpcPackage, Part  # noqa
+from opc.packuri import PackURI  # noqa
+from opc.pkgreader import PackageReader  # noqa
+
+
+PART_COUNTS = (1000, 2000, 4000, 8000, 16000)
+FAN_OUT = 3
+
+
+def build_package(part_count):
+    """
+    Return an in-memory |OpcPackage| having *part_count* parts, where each
+    part relates to the next *FAN_OUT* parts, forming a long chain with many
+    already-visited targets.
+    """
+    pkg = OpcPackage()
+    parts = [
+        Part(PackURI('/xl/part%d.xml' % idx), 'application/xml', b'<x/>')
+        for idx in range(part_count)
+    ]
+    pkg._add_relationship(RT.OFFICE_DOCUMENT, parts[0], 'rId1')
+    for idx, part in enumerate(parts):
+        for offset in range(1, FAN_OUT + 1):
+            if idx + offset < part_count:
+                rId = 'rId%d' % offset
+                part._add_relationship(RT.CUSTOM_XML, parts[idx + offset],
+                                       rId)
+    return pkg
+
+
+def build_pkg_file(part_count):
+    """
+    Return a file-like object containing a zip package equivalent to that
+    produced by :func:`build_package`.
+    """
+    pkg_file = BytesIO()
+    build_package(part_count).save(pkg_file)
+    pkg_file.seek(0)
+    return pkg_file
+
+
+def timed(func, *args):
+    start = time.time()
+    func(*args)
+    return time.time() - start
+
+
+def main():
+    print('%8s  %12s  %12s  %14s  %14s' % (
+        'parts', 'walk (s)', 'walk us/part', 'read (s)', 'read us/part'))
+    for part_count in PART_COUNTS:
+        pkg = build_package(part_count)
+        pkg_file = build_pkg_file(part_count)
+        walk_secs = timed(lambda: pkg.parts)
+        read_secs = timed(PackageReader.from_file, pkg_file)
+        print('%8d  %12.4f  %12.2f  %14.4f  %14.2f' % (
+            part_count, walk_secs, walk_secs / part_count * 1e6,
+            read_secs, read_secs / part_count * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -20,3 +20,12 @@ Feature: Save an OPC package
       When I open an Excel file
        And I save the spreadsheet package
       Then I see the xlsx file in the working directory
+
+  Scenario: Incrementally save a changed .pptx file in place
+     Given a clean working directory
+       And a copy of a PowerPoint file in the working directory
+      When I open the copied file lazily
+       And I change the core properties part
+       And I save the package incrementally
+      Then only the core properties member was rewritten
+       And the changed core properties are in the copied file
@@ -11,6 +11,9 @@
 
 import hashlib
 import os
+import shutil
+
+from zipfile import ZipFile
 
 from behave import given, when, then
 
@@ -30,18 +33,30 @@ basic_xlsx_path = absjoin(test_file_dir, 'test.xlsx')
 saved_docx_path = absjoin(scratch_dir, 'test_out.docx')
 saved_pptx_path = absjoin(scratch_dir, 'test_out.pptx')
 saved_xlsx_path = absjoin(scratch_dir, 'test_out.xlsx')
+copied_pptx_path = absjoin(scratch_dir, 'test_copy.pptx')
 
 
 # given ====================================================
 
 @given('a clean working directory')
 def step_given_clean_working_dir(context):
-    files_to_clean_out = (saved_docx_path, saved_pptx_path, saved_xlsx_path)
+    files_to_clean_out = (saved_docx_path, saved_pptx_path, saved_xlsx_path,
+                          copied_pptx_path)
     for path in files_to_clean_out:
         if os.path.isfile(path):
             os.remove(path)
 
 
+@given('a copy of a PowerPoint file in the working directory')
+def step_given_copy_of_pptx_file(context):
+    shutil.copy(basic_pptx_path, copied_pptx_path)
+    with ZipFile(copied_pptx_path) as zipf:
+        context.header_offsets = dict(
+            (zinfo.filename, zinfo.header_offset)
+            for zinfo in zipf.infolist()
+        )
+
+
 @given('a python-opc working environment')
 def step_given_python_opc_working_environment(context):
     pass
@@ -64,6 +79,24 @@ def step_when_open_basic_docx(context):
     context.pkg = OpcPackage.open(basic_docx_path)
 
 
+@when('I open the copied file lazily')
+def step_when_open_copied_pptx_lazily(context):
+    context.pkg = OpcPackage.open(copied_pptx_path, lazy=True)
+
+
+@when('I change the core properties part')
+def step_when_change_core_properties_part(context):
+    core_props = context.pkg.part_for('/docProps/core.xml')
+    core_props.blob = core_props.blob.replace(b'<dc:title>',
+                                              b'<dc:title>Changed ')
+
+
+@when('I save the package incrementally')
+def step_when_save_package_incrementally(context):
+    context.pkg.save_incremental(copied_pptx_path)
+    context.pkg.close()
+
+
 @when('I save the document package')
 def step_when_save_document_package(context):
     if os.path.isfile(saved_docx_path):
@@ -247,3 +280,21 @@ def step_then_see_xlsx_file_in_working_dir(context):
     minimum = 30000
     filesize = os.path.getsize(saved_xlsx_path)
     assert filesize > minimum
+
+
+@then('only the core properties member was rewritten')
+def step_then_only_core_props_member_rewritten(context):
+    with ZipFile(copied_pptx_path) as zipf:
+        assert zipf.testzip() is None
+        rewritten = [
+            zinfo.filename for zinfo in zipf.infolist()
+            if context.header_offsets[zinfo.filename] != zinfo.header_offset
+        ]
+    assert rewritten == ['docProps/core.xml'], rewritten
+
+
+@then('the changed core properties are in the copied file')
+def step_then_changed_core_props_in_copied_file(context):
+    pkg = OpcPackage.open(copied_pptx_path)
+    core_props = pkg.part_for('/docProps/core.xml')
+    assert b'<dc:title>Changed ' in core_props.blob
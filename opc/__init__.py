@@ -7,6 +7,10 @@
 # This module is part of python-opc and is released under the MIT License:
 # http://www.opensource.org/licenses/mit-license.php
 
-from opc.package import OpcPackage, Part, PartFactory  # noqa
+from opc.cache import BlobCache  # noqa
+from opc.compression import CompressionPolicy  # noqa
+from opc.package import (  # noqa
+    OpcPackage, PackageCache, Part, PartFactory, StreamPart
+)
 
 __version__ = '0.0.1d1'
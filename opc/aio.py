@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+#
+# aio.py
+#
+# Copyright (C) 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-opc and is released under the MIT License:
+# http://www.opensource.org/licenses/mit-license.php
+
+"""
+Provides the asyncio implementation behind :meth:`OpcPackage.open_async`
+and :meth:`OpcPackage.save_async`. Requires Python 3.6 or later, so it is
+only imported when one of those methods is called.
+
+The zip I/O, inflating, deflating and XML parsing of a package all run on
+an executor, leaving the event loop free. An async byte stream source is
+spooled to a temporary file a chunk at a time before the package is parsed
+from it, and a package saved to an async byte stream sink is first saved
+to a temporary file and then copied to the sink a chunk at a time, since a
+zip archive can only be read and written on a seekable file.
+"""
+
+import asyncio
+import inspect
+
+from functools import partial
+from tempfile import SpooledTemporaryFile
+
+from opc.package import OpcPackage
+
+
+# size of the chunks read from an async source or written to an async sink
+CHUNK_SIZE = 64 * 1024
+# size past which a spooled package is moved from memory to a temporary file
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+
+async def open_package(pkg_file, lazy=False, backend=None, follow=None,
+                       workers=None, blob_cache=None, executor=None):
+    """
+    Return an |OpcPackage| instance loaded with the contents of *pkg_file*,
+    parsed on *executor*, the event loop's default executor if |None|.
+    *pkg_file* can be anything accepted by :meth:`OpcPackage.open` or an
+    async byte stream, such as an :class:`asyncio.StreamReader`, which is
+    spooled to a temporary file closed once the package is loaded or, when
+    *lazy* is |True|, when the package is closed.
+    """
+    loop = asyncio.get_event_loop()
+    if not _is_async_source(pkg_file):
+        open_ = partial(OpcPackage.open, pkg_file, lazy, backend, follow,
+                        workers, blob_cache)
+        return await loop.run_in_executor(executor, open_)
+    spool = await _spool_source(loop, executor, pkg_file)
+    open_ = partial(OpcPackage.open, spool, lazy, backend, follow, workers,
+                    blob_cache)
+    try:
+        pkg = await loop.run_in_executor(executor, open_)
+    except BaseException:
+        spool.close()
+        raise
+    if not lazy:
+        spool.close()
+        return pkg
+    # the lazily loaded package reads blobs from the spool until closed
+    pkg._owned_file = spool
+    return pkg
+
+
+async def save_package(pkg, pkg_file, workers=None, backend=None,
+                       compression=None, executor=None):
+    """
+    Save *pkg* to *pkg_file* on *executor*, the event loop's default
+    executor if |None|. *pkg_file* can be anything accepted by
+    :meth:`OpcPackage.save` or an async byte stream, such as an
+    :class:`asyncio.StreamWriter`.
+    """
+    loop = asyncio.get_event_loop()
+    if not _is_async_sink(pkg_file):
+        await loop.run_in_executor(
+            executor,
+            partial(pkg.save, pkg_file, workers, backend, compression)
+        )
+        return
+    with SpooledTemporaryFile(SPOOL_MAX_SIZE) as spool:
+        await loop.run_in_executor(
+            executor, partial(pkg.save, spool, workers, backend, compression)
+        )
+        spool.seek(0)
+        read_chunk = partial(spool.read, CHUNK_SIZE)
+        while True:
+            chunk = await loop.run_in_executor(executor, read_chunk)
+            if not chunk:
+                break
+            await _write_chunk(pkg_file, chunk)
+
+
+def _is_async_sink(pkg_file):
+    """
+    Return |True| if *pkg_file* is an async byte stream sink, having either
+    a coroutine ``write()`` method or, like :class:`asyncio.StreamWriter`, a
+    coroutine ``drain()`` method to call after each write.
+    """
+    return (inspect.iscoroutinefunction(getattr(pkg_file, 'write', None)) or
+            inspect.iscoroutinefunction(getattr(pkg_file, 'drain', None)))
+
+
+def _is_async_source(pkg_file):
+    """
+    Return |True| if *pkg_file* is an async byte stream source, having a
+    coroutine ``read()`` method or being an async iterable of bytes.
+    """
+    return (inspect.iscoroutinefunction(getattr(pkg_file, 'read', None)) or
+            hasattr(pkg_file, '__aiter__'))
+
+
+async def _iter_source_chunks(source):
+    """
+    Generate the chunks of bytes read from the async byte stream *source*.
+    """
+    if not inspect.iscoroutinefunction(getattr(source, 'read', None)):
+        async for chunk in source:
+            yield chunk
+        return
+    while True:
+        chunk = await source.read(CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def _spool_source(loop, executor, source):
+    """
+    Return a seekable file object holding the bytes read from the async
+    byte stream *source*, positioned at its start. The file is closed if
+    reading *source* fails or is cancelled.
+    """
+    spool = SpooledTemporaryFile(SPOOL_MAX_SIZE)
+    try:
+        async for chunk in _iter_source_chunks(source):
+            await loop.run_in_executor(executor, spool.write, chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+async def _write_chunk(sink, chunk):
+    """
+    Write *chunk* to the async byte stream *sink*, waiting until the sink
+    accepts it.
+    """
+    written = sink.write(chunk)
+    if inspect.isawaitable(written):
+        await written
+    else:
+        await sink.drain()
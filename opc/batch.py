@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+#
+# batch.py
+#
+# Copyright (C) 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-opc and is released under the MIT License:
+# http://www.opensource.org/licenses/mit-license.php
+
+"""
+Provides process_packages(), which runs an open, transform and save
+pipeline over many packages on a pool of worker processes.
+"""
+
+import pickle
+import traceback
+
+from collections import deque
+from multiprocessing import cpu_count, Pool
+from timeit import default_timer
+
+from opc.package import OpcPackage, PartFactory
+
+
+# transform and open and save options of a worker process, set once by
+# _init_worker() when the worker starts
+_worker_settings = {}
+
+
+class BatchResult(object):
+    """
+    Value object reporting the outcome of processing one package with
+    :func:`process_packages`.
+    """
+    def __init__(self, source, target, value, elapsed, error=None):
+        super(BatchResult, self).__init__()
+        self._source = source
+        self._target = target
+        self._value = value
+        self._elapsed = elapsed
+        self._error = error
+
+    @property
+    def elapsed(self):
+        """
+        Time in seconds the worker spent opening, transforming and saving
+        the package.
+        """
+        return self._elapsed
+
+    @property
+    def error(self):
+        """
+        Formatted traceback of the exception raised while processing the
+        package, or |None| if it was processed successfully.
+        """
+        return self._error
+
+    @property
+    def ok(self):
+        """
+        |True| if the package was processed without raising.
+        """
+        return self._error is None
+
+    @property
+    def source(self):
+        return self._source
+
+    @property
+    def target(self):
+        """
+        Path the package was saved to, |None| if it was not saved.
+        """
+        return self._target
+
+    @property
+    def value(self):
+        """
+        Value returned by the transform for the package, |None| if it
+        failed.
+        """
+        return self._value
+
+
+def process_packages(jobs, transform=None, processes=None,
+                     max_in_flight=None, part_type_for=None, lazy=False,
+                     compression=None, initializer=None, initargs=()):
+    """
+    Generate a |BatchResult| for each of *jobs*, in the order of *jobs*,
+    processing them on a pool of *processes* worker processes, one per CPU
+    if |None|. A job is either a source package path, which is opened and
+    not saved, or a `(source, target)` pair of paths, the package opened
+    from *source* being saved to *target* once transformed.
+
+    *transform*, if not |None|, is called in the worker with each opened
+    |OpcPackage| and its return value reported as :attr:`BatchResult.value`.
+    It and its return value must be picklable, so it is generally a module
+    level function. An exception raised processing a package, or a
+    transform return value that cannot be pickled, is reported in its
+    result rather than stopping the batch.
+
+    At most *max_in_flight* jobs, twice *processes* if |None|, are queued
+    or held as unreported results at any time, so *jobs* can be a lazy
+    iterable of any length. Each worker is set up once, when it starts: the
+    part classes in *part_type_for*, by default those registered on
+    |PartFactory| in the calling process, are registered on its
+    |PartFactory| and *initializer*, if not |None|, is called with
+    *initargs*. *lazy* and *compression* are passed to
+    :meth:`OpcPackage.open` and :meth:`OpcPackage.save`.
+    """
+    if processes is None:
+        processes = cpu_count()
+    if max_in_flight is None:
+        max_in_flight = 2 * processes
+    if part_type_for is None:
+        part_type_for = dict(PartFactory.part_type_for)
+    settings = {
+        'transform': transform, 'lazy': lazy, 'compression': compression
+    }
+    pool = Pool(processes, _init_worker,
+                (settings, part_type_for, initializer, initargs))
+    in_flight = deque()
+    try:
+        for job in jobs:
+            if len(in_flight) >= max_in_flight:
+                yield in_flight.popleft().get()
+            source, target = _source_and_target(job)
+            in_flight.append(
+                pool.apply_async(_process_package, (source, target))
+            )
+        while in_flight:
+            yield in_flight.popleft().get()
+        pool.close()
+    finally:
+        # also reached when the caller stops consuming results early
+        pool.terminate()
+        pool.join()
+
+
+def _init_worker(settings, part_type_for, initializer, initargs):
+    """
+    Set up a worker process of :func:`process_packages` once, when it
+    starts, so each package it processes reuses the same setup.
+    """
+    _worker_settings.update(settings)
+    PartFactory.part_type_for.update(part_type_for)
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def _process_package(source, target):
+    """
+    Return a |BatchResult| for the package opened from *source* in a
+    worker process, transformed and saved to *target* if it is not
+    |None|.
+    """
+    transform = _worker_settings['transform']
+    start = default_timer()
+    value = error = None
+    try:
+        pkg = OpcPackage.open(source, _worker_settings['lazy'])
+        try:
+            if transform is not None:
+                value = transform(pkg)
+            if target is not None:
+                pkg.save(target,
+                         compression=_worker_settings['compression'])
+        finally:
+            pkg.close()
+        # the result is pickled back to the calling process, where an
+        # unpicklable value would abort the whole batch
+        pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        # traceback text is reported as the exception may not be picklable
+        value, error = None, traceback.format_exc()
+    elapsed = default_timer() - start
+    return BatchResult(source, target, value, elapsed, error)
+
+
+def _source_and_target(job):
+    """
+    Return the `(source, target)` pair of paths for *job*, *target* being
+    |None| when *job* is a source path alone.
+    """
+    if isinstance(job, tuple):
+        return job
+    return job, None
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+#
+# cache.py
+#
+# Copyright (C) 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-opc and is released under the MIT License:
+# http://www.opensource.org/licenses/mit-license.php
+
+"""
+Provides bounded least-recently-used caches: one used to memoize values that
+are costly to compute but cheap to keep, such as relative references between
+partnames, and one holding part blobs within a byte budget.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+
+
+class LRUCache(object):
+    """
+    Mapping holding at most *maxsize* items, discarding the least recently
+    used item to make room for a new one. Lookups and insertions are
+    thread-safe.
+    """
+    def __init__(self, maxsize):
+        super(LRUCache, self).__init__()
+        self._maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = Lock()
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def clear(self):
+        """
+        Remove all items from this cache.
+        """
+        with self._lock:
+            self._items.clear()
+
+    def get(self, key, default=None):
+        """
+        Return the value for *key*, marking it most recently used, or
+        *default* if *key* is not in this cache.
+        """
+        with self._lock:
+            try:
+                value = self._items.pop(key)
+            except KeyError:
+                return default
+            self._items[key] = value
+            return value
+
+    @property
+    def maxsize(self):
+        """
+        The maximum number of items this cache holds.
+        """
+        return self._maxsize
+
+    def setdefault(self, key, value):
+        """
+        Return the value for *key*, marking it most recently used, adding
+        *value* under *key* first if *key* is not in this cache.
+        """
+        with self._lock:
+            try:
+                value = self._items.pop(key)
+            except KeyError:
+                if len(self._items) >= self._maxsize:
+                    self._items.popitem(last=False)
+            self._items[key] = value
+            return value
+
+    def put(self, key, value):
+        """
+        Add *value* to this cache under *key*, discarding the least recently
+        used item if this cache is full.
+        """
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = value
+            if len(self._items) > self._maxsize:
+                self._items.popitem(last=False)
+
+
+class BlobCache(object):
+    """
+    Cache of part blobs holding at most *max_bytes* bytes of blob content,
+    discarding least recently used blobs to make room for a new one. A blob
+    larger than *max_bytes* is never cached. Counts its hits, misses and
+    evictions, so its budget can be tuned. Lookups and insertions are
+    thread-safe and a single instance can be shared by many packages.
+    """
+    def __init__(self, max_bytes):
+        super(BlobCache, self).__init__()
+        self._max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._size = 0
+        self._hits = self._misses = self._evictions = 0
+        self._lock = Lock()
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def clear(self):
+        """
+        Remove all blobs from this cache. The counters are not reset.
+        """
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+    @property
+    def evictions(self):
+        """
+        Number of blobs discarded to keep within the byte budget.
+        """
+        return self._evictions
+
+    def get(self, key):
+        """
+        Return the blob cached under *key*, marking it most recently used,
+        or |None| if no blob is cached under *key*.
+        """
+        with self._lock:
+            try:
+                blob = self._items.pop(key)
+            except KeyError:
+                self._misses += 1
+                return None
+            self._items[key] = blob
+            self._hits += 1
+            return blob
+
+    @property
+    def hits(self):
+        """
+        Number of lookups that found a cached blob.
+        """
+        return self._hits
+
+    @property
+    def max_bytes(self):
+        """
+        The maximum number of bytes of blob content this cache holds.
+        """
+        return self._max_bytes
+
+    @property
+    def misses(self):
+        """
+        Number of lookups that found no cached blob.
+        """
+        return self._misses
+
+    def put(self, key, blob):
+        """
+        Add *blob* to this cache under *key*, discarding least recently used
+        blobs until it fits within the byte budget. A blob larger than the
+        whole budget is not added.
+        """
+        blob_size = len(blob)
+        with self._lock:
+            old_blob = self._items.pop(key, None)
+            if old_blob is not None:
+                self._size -= len(old_blob)
+            if blob_size > self._max_bytes:
+                return
+            while self._items and self._size + blob_size > self._max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+                self._evictions += 1
+            self._items[key] = blob
+            self._size += blob_size
+
+    @property
+    def size(self):
+        """
+        Number of bytes of blob content currently held in this cache.
+        """
+        return self._size
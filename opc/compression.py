@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+#
+# compression.py
+#
+# Copyright (C) 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-opc and is released under the MIT License:
+# http://www.opensource.org/licenses/mit-license.php
+
+"""
+Provides the CompressionPolicy class, which decides how each member of a
+package is compressed when the package is saved.
+"""
+
+import zlib
+
+from opc.constants import CONTENT_TYPE as CT
+
+
+# compression level meaning a member is stored without compression
+STORED = 0
+# size at and above which an XML part is compressed at the large XML level
+LARGE_XML_SIZE = 4 * 1024 * 1024
+
+# media formats compressed in their own right, gaining next to nothing from
+# being deflated again, so stored by default
+DEFAULT_LEVELS = {
+    CT.GIF: STORED,
+    CT.JPEG: STORED,
+    CT.MOV: STORED,
+    CT.MP3: STORED,
+    CT.MP4: STORED,
+    CT.MS_PHOTO: STORED,
+    CT.OFC_PACKAGE: STORED,
+    CT.PNG: STORED,
+}
+
+
+class CompressionPolicy(object):
+    """
+    Decides the compression level of each member of a package when it is
+    saved, from the content type and size of the part it holds. Levels are
+    those of zlib, from 1 (fastest) to 9 (smallest), or ``STORED`` (0) for a
+    member stored without compression.
+
+    *levels* is a dict mapping content type to level, e.g. ``{CT.PNG: 9,
+    CT.SML_WORKSHEET: 1}``, overriding the defaults, which store media
+    already compressed in its own format such as JPEG, PNG and MP4. An XML
+    part of at least *large_xml_size* bytes with no level of its own is
+    compressed at *large_xml_level*, trading a little size for a lot of
+    time. Any other member is compressed at *default_level*.
+    """
+    def __init__(self, levels=None, default_level=zlib.Z_DEFAULT_COMPRESSION,
+                 large_xml_level=1, large_xml_size=LARGE_XML_SIZE):
+        super(CompressionPolicy, self).__init__()
+        self._levels = dict(DEFAULT_LEVELS)
+        if levels is not None:
+            self._levels.update(levels)
+        self._default_level = default_level
+        self._large_xml_level = large_xml_level
+        self._large_xml_size = large_xml_size
+
+    def level_for(self, content_type, size=None):
+        """
+        Return the compression level for a member holding *size* bytes of
+        *content_type*. Either may be |None| when not known, as for the
+        content types item or a part whose content is streamed.
+        """
+        level = self._levels.get(content_type)
+        if level is not None:
+            return level
+        if (size is not None and size >= self._large_xml_size and
+                _is_xml(content_type)):
+            return self._large_xml_level
+        return self._default_level
+
+
+def _is_xml(content_type):
+    """
+    Return |True| if *content_type* is an XML format.
+    """
+    if content_type is None:
+        return False
+    return content_type == CT.XML or content_type.endswith('+xml')
@@ -48,6 +48,15 @@ class CONTENT_TYPE(object):
     JPEG = (
         'image/jpeg'
     )
+    MOV = (
+        'video/quicktime'
+    )
+    MP3 = (
+        'audio/mpeg'
+    )
+    MP4 = (
+        'video/mp4'
+    )
     MS_PHOTO = (
         'image/vnd.ms-photo'
     )
@@ -650,6 +659,10 @@ class RELATIONSHIP_TYPE(object):
         'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
         '/webSettings'
     )
+    WORKSHEET = (
+        'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+        '/worksheet'
+    )
     WORKSHEET_SOURCE = (
         'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
         '/worksheetSource'
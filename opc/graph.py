@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+#
+# graph.py
+#
+# Copyright (C) 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-opc and is released under the MIT License:
+# http://www.opensource.org/licenses/mit-license.php
+
+"""
+Provides traversal of the relationship graph of a package, shared by the
+in-memory package and the package reader.
+"""
+
+
+def walk_rels_graph(rels, target_key, visit):
+    """
+    Generate one item for each target reachable from the relationships in
+    *rels*, in depth-first preorder. *target_key* is called with a
+    relationship to get a hashable key identifying its target; a target is
+    visited only the first time its key is seen. *visit* is called with the
+    relationship to each newly found target and returns a 2-tuple `(item,
+    child_rels)`, where *item* is generated and *child_rels* are the
+    relationships from that target. External relationships are skipped.
+
+    The traversal is iterative and tracks visited targets in a set, so its
+    cost is linear in the size of the graph and deep relationship chains
+    cannot exhaust the recursion limit.
+    """
+    visited = set()
+    stack = [iter(rels)]
+    while stack:
+        for rel in stack[-1]:
+            if rel.is_external:
+                continue
+            key = target_key(rel)
+            if key in visited:
+                continue
+            visited.add(key)
+            item, child_rels = visit(rel)
+            yield item
+            stack.append(iter(child_rels))
+            break
+        else:
+            stack.pop()
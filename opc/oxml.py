@@ -23,6 +23,11 @@ element_class_lookup = etree.ElementNamespaceClassLookup(fallback_lookup)
 oxml_parser = etree.XMLParser(remove_blank_text=True)
 oxml_parser.set_element_class_lookup(element_class_lookup)
 
+# plain parser producing ordinary lxml elements, for read-only access to
+# items such as .rels and [Content_Types].xml where objectify's custom
+# element class lookup only adds overhead
+plain_parser = etree.XMLParser(remove_blank_text=True)
+
 nsmap = {
     'ct': NS.OPC_CONTENT_TYPES,
     'pr': NS.OPC_RELATIONSHIPS,
@@ -38,6 +43,36 @@ def oxml_fromstring(text):
     return objectify.fromstring(text, oxml_parser)
 
 
+def new_element(tag):
+    """
+    Return a new, empty element for namespace-prefixed *tag*, e.g.
+    ``'pr:Relationship'``, of the custom element class registered for it.
+    The element is constructed directly rather than by parsing XML, so it
+    carries no objectify annotations needing removal.
+    """
+    prefix = tag.split(':')[0]
+    return oxml_parser.makeelement(qn(tag), nsmap={None: nsmap[prefix]})
+
+
+def plain_fromstring(text):
+    """
+    ``etree.fromstring()`` replacement that uses the plain parser, producing
+    elements that are not objectified
+    """
+    return etree.fromstring(text, plain_parser)
+
+
+def qn(tag):
+    """
+    Stands for "qualified name", a utility function to turn a namespace
+    prefixed tag name into a Clark-notation qualified tag name for lxml. For
+    example, ``qn('pr:Relationship')`` returns
+    ``'{http://schemas.../relationships}Relationship'``.
+    """
+    prefix, tagroot = tag.split(':')
+    return '{%s}%s' % (nsmap[prefix], tagroot)
+
+
 def oxml_tostring(elm, encoding=None, pretty_print=False, standalone=None):
     # if xsi parameter is not set to False, PowerPoint won't load without a
     # repair step; deannotate removes some original xsi:type tags in core.xml
@@ -93,13 +128,14 @@ class CT_Default(OxmlBaseElement):
         Return a new ``<Default>`` element with attributes set to parameter
         values.
         """
-        xml = '<Default xmlns="%s"/>' % nsmap['ct']
-        default = oxml_fromstring(xml)
-        default.set('Extension', ext[1:])
-        default.set('ContentType', content_type)
-        objectify.deannotate(default, cleanup_namespaces=True)
+        default = new_element('ct:Default')
+        default._set_values(ext, content_type)
         return default
 
+    def _set_values(self, ext, content_type):
+        self.set('Extension', ext[1:])
+        self.set('ContentType', content_type)
+
 
 class CT_Override(OxmlBaseElement):
     """
@@ -120,11 +156,8 @@ class CT_Override(OxmlBaseElement):
         Return a new ``<Override>`` element with attributes set to parameter
         values.
         """
-        xml = '<Override xmlns="%s"/>' % nsmap['ct']
-        override = oxml_fromstring(xml)
-        override.set('PartName', partname)
-        override.set('ContentType', content_type)
-        objectify.deannotate(override, cleanup_namespaces=True)
+        override = new_element('ct:Override')
+        override._set_values(partname, content_type)
         return override
 
     @property
@@ -135,6 +168,10 @@ class CT_Override(OxmlBaseElement):
         """
         return self.get('PartName')
 
+    def _set_values(self, partname, content_type):
+        self.set('PartName', partname)
+        self.set('ContentType', content_type)
+
 
 class CT_Relationship(OxmlBaseElement):
     """
@@ -146,14 +183,8 @@ class CT_Relationship(OxmlBaseElement):
         """
         Return a new ``<Relationship>`` element.
         """
-        xml = '<Relationship xmlns="%s"/>' % nsmap['pr']
-        relationship = oxml_fromstring(xml)
-        relationship.set('Id', rId)
-        relationship.set('Type', reltype)
-        relationship.set('Target', target)
-        if target_mode == RTM.EXTERNAL:
-            relationship.set('TargetMode', RTM.EXTERNAL)
-        objectify.deannotate(relationship, cleanup_namespaces=True)
+        relationship = new_element('pr:Relationship')
+        relationship._set_values(rId, reltype, target, target_mode)
         return relationship
 
     @property
@@ -189,6 +220,13 @@ class CT_Relationship(OxmlBaseElement):
         """
         return self.get('TargetMode', RTM.INTERNAL)
 
+    def _set_values(self, rId, reltype, target, target_mode):
+        self.set('Id', rId)
+        self.set('Type', reltype)
+        self.set('Target', target)
+        if target_mode == RTM.EXTERNAL:
+            self.set('TargetMode', RTM.EXTERNAL)
+
 
 class CT_Relationships(OxmlBaseElement):
     """
@@ -200,18 +238,15 @@ class CT_Relationships(OxmlBaseElement):
         to parameter values.
         """
         target_mode = RTM.EXTERNAL if is_external else RTM.INTERNAL
-        relationship = CT_Relationship.new(rId, reltype, target, target_mode)
-        self.append(relationship)
+        relationship = etree.SubElement(self, qn('pr:Relationship'))
+        relationship._set_values(rId, reltype, target, target_mode)
 
     @staticmethod
     def new():
         """
         Return a new ``<Relationships>`` element.
         """
-        xml = '<Relationships xmlns="%s"/>' % nsmap['pr']
-        relationships = oxml_fromstring(xml)
-        objectify.deannotate(relationships, cleanup_namespaces=True)
-        return relationships
+        return new_element('pr:Relationships')
 
     @property
     def xml(self):
@@ -232,16 +267,16 @@ class CT_Types(OxmlBaseElement):
         Add a child ``<Default>`` element with attributes set to parameter
         values.
         """
-        default = CT_Default.new(ext, content_type)
-        self.append(default)
+        default = etree.SubElement(self, qn('ct:Default'))
+        default._set_values(ext, content_type)
 
     def add_override(self, partname, content_type):
         """
         Add a child ``<Override>`` element with attributes set to parameter
         values.
         """
-        override = CT_Override.new(partname, content_type)
-        self.append(override)
+        override = etree.SubElement(self, qn('ct:Override'))
+        override._set_values(partname, content_type)
 
     @property
     def defaults(self):
@@ -255,10 +290,7 @@ class CT_Types(OxmlBaseElement):
         """
         Return a new ``<Types>`` element.
         """
-        xml = '<Types xmlns="%s"/>' % nsmap['ct']
-        types = oxml_fromstring(xml)
-        objectify.deannotate(types, cleanup_namespaces=True)
-        return types
+        return new_element('ct:Types')
 
     @property
     def overrides(self):
@@ -11,7 +11,17 @@
 Provides an API for manipulating Open Packaging Convention (OPC) packages.
 """
 
+import copy
+import hashlib
+import os
+
+from io import BytesIO
+from multiprocessing.pool import ThreadPool
+from threading import Lock
+
+from opc.cache import LRUCache
 from opc.constants import RELATIONSHIP_TYPE as RT
+from opc.graph import walk_rels_graph
 from opc.oxml import CT_Relationships
 from opc.packuri import PACKAGE_URI
 from opc.pkgreader import PackageReader
@@ -27,6 +37,84 @@ class OpcPackage(object):
     def __init__(self):
         super(OpcPackage, self).__init__()
         self._rels = RelationshipCollection(PACKAGE_URI.baseURI)
+        self._pkg_reader = None
+        self._owned_file = None
+        self._is_partial = False
+        self._parts = None
+        self._graph_version = _GraphVersion()
+        self._parts_version = None
+        self._parts_by_partname = None
+
+    def __enter__(self):
+        """
+        Enable use as a context manager, e.g. ``with OpcPackage.open(path,
+        lazy=True) as pkg:``, closing the package on exit.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Release the package file held open by a package opened with
+        ``lazy=True``. The blob of any part not accessed before the package
+        is closed can no longer be read. When the package was opened with a
+        *blob_cache*, parts do not keep their blob, so this applies to every
+        part, including those already accessed. A file object the package was
+        opened on by the package itself, such as the temporary file an async
+        byte stream is spooled to by :meth:`open_async`, is closed too. Has
+        no effect on a package that holds no open package file.
+        """
+        if self._pkg_reader is not None:
+            self._pkg_reader.close()
+            self._pkg_reader = None
+        if self._owned_file is not None:
+            self._owned_file.close()
+            self._owned_file = None
+
+    def clone(self):
+        """
+        Return a new |OpcPackage| instance with the same parts and
+        relationships as this one, without serializing and parsing it. Only
+        the part and relationship graph is copied; each plain part clone
+        shares the blob and partname of its original until its blob is
+        assigned, and a part of a custom part class is loaded afresh from
+        its blob (see :meth:`Part._clone`), so changes to either package do
+        not affect the other. As when a package is opened, the
+        :meth:`_after_unmarshal` hook of each part clone is called once all
+        relationships are added. The parts of a lazily loaded package read
+        blobs not yet accessed from its package file, so it must not be
+        closed while the clone still needs them. A clone of a partial
+        package is partial too.
+        """
+        clone = OpcPackage()
+        clone._is_partial = self._is_partial
+        parts = self.parts
+        part_clones = dict((part, part._clone()) for part in parts)
+
+        def clone_rels(source, source_clone):
+            for rel in source.rels:
+                target = (rel.target_ref if rel.is_external
+                          else part_clones[rel.target_part])
+                source_clone._add_relationship(rel.reltype, target, rel.rId,
+                                               rel.is_external)
+
+        clone_rels(self, clone)
+        for part, part_clone in part_clones.items():
+            clone_rels(part, part_clone)
+        for part in parts:
+            part_clones[part]._after_unmarshal()
+        return clone
+
+    @property
+    def is_partial(self):
+        """
+        |True| if this package was opened with a *follow* predicate, so it
+        holds only the parts and relationships that predicate selected. A
+        partial package is read-only; saving it raises |ValueError|.
+        """
+        return self._is_partial
 
     @property
     def main_document(self):
@@ -40,23 +128,113 @@ class OpcPackage(object):
         return rel.target_part
 
     @staticmethod
-    def open(pkg_file):
+    def inspect(pkg_file, backend=None):
+        """
+        Return a |PackageManifest| instance listing the partname, content
+        type, size and compressed size of each part in *pkg_file* along with
+        the relationship graph, without reading any part blob. Only the
+        content types item, the rels items and the zip central directory
+        are read, so inspecting a package is fast regardless of its size.
+        """
+        return PackageReader.inspect(pkg_file, backend)
+
+    @staticmethod
+    def open(pkg_file, lazy=False, backend=None, follow=None, workers=None,
+             blob_cache=None):
         """
         Return an |OpcPackage| instance loaded with the contents of
-        *pkg_file*.
+        *pkg_file*. If *lazy* is |True|, the blob of each part is not read
+        until it is first accessed. In that case the package keeps
+        *pkg_file* open until :meth:`close` is called, so it should not be
+        saved over *pkg_file* while open, other than by
+        :meth:`save_incremental`. *pkg_file* is read by the physical package
+        backend named *backend*; by default a dict is read as a mapping of
+        membernames to blobs, a path to an existing directory as an
+        extracted package and anything else as a zip file.
+
+        If *follow* is not |None|, only part of the package is loaded. It is
+        called as ``follow(source_partname, reltype, target_content_type)``
+        for each internal relationship reached, the package pseudo-partname
+        '/' being the source of package relationships, and only the
+        relationships it returns |True| for are loaded and followed. Parts
+        reached only through the others are never read. The resulting
+        package is partial; see :attr:`is_partial`.
+
+        If *workers* is a positive integer, the package is unmarshalled on a
+        pool of that many threads. Part blobs are inflated concurrently and
+        the parts of any custom part class declaring itself thread-safe (see
+        :attr:`Part.is_thread_safe`) are loaded concurrently. The resulting
+        package is the same as the one loaded serially.
+
+        If *blob_cache* is a |BlobCache| instance and *lazy* is |True|, the
+        blobs of parts read on demand are held in *blob_cache* rather than
+        by each part, so the memory they use stays within its byte budget.
+        A blob evicted from the cache is read again on next access. A blob
+        cache can be shared by many packages. Since parts do not keep their
+        blob, no part blob can be read once the package is closed, whether
+        accessed before or not; assign a blob to a part to keep it.
         """
         pkg = OpcPackage()
-        pkg_reader = PackageReader.from_file(pkg_file)
-        Unmarshaller.unmarshal(pkg_reader, pkg, PartFactory)
+        pkg_reader = PackageReader.from_file(pkg_file, lazy, backend, follow,
+                                             workers)
+        Unmarshaller.unmarshal(pkg_reader, pkg, PartFactory, workers)
+        pkg._is_partial = follow is not None
+        if lazy:
+            pkg_reader.blob_cache = blob_cache
+            pkg._pkg_reader = pkg_reader
         return pkg
 
+    @staticmethod
+    def open_async(pkg_file, lazy=False, backend=None, follow=None,
+                   workers=None, blob_cache=None, executor=None):
+        """
+        Return an awaitable resolving to an |OpcPackage| instance loaded as
+        by :meth:`open`, with the package read and parsed on *executor*, the
+        event loop's default executor if |None|, so the event loop is not
+        blocked. *pkg_file* can also be an async byte stream, such as an
+        :class:`asyncio.StreamReader`. Requires Python 3.6 or later.
+        """
+        # imported here as the asyncio implementation is Python 3 only
+        from opc.aio import open_package
+        return open_package(pkg_file, lazy, backend, follow, workers,
+                            blob_cache, executor)
+
+    def part_for(self, partname):
+        """
+        Return the part in this package having *partname*. Raises |KeyError|
+        if no part in the package has that partname.
+        """
+        parts = self.parts
+        index = self._parts_by_partname
+        part = None if index is None else index.get(partname)
+        if part is None or part.partname != partname:
+            # index not yet built or stale because a part was renamed
+            index = dict((p.partname, p) for p in parts)
+            self._parts_by_partname = index
+            part = index.get(partname)
+        if part is None:
+            tmpl = "no part with partname '%s' in package"
+            raise KeyError(tmpl % partname)
+        return part
+
     @property
     def parts(self):
         """
         Return an immutable sequence (tuple) containing a reference to each
-        of the parts in this package.
-        """
-        return tuple([p for p in self._walk_parts(self._rels)])
+        of the parts in this package. The sequence is cached and only
+        recomputed after a relationship in this package has changed.
+        """
+        graph_version = self._graph_version
+        if self._parts is None or self._parts_version != graph_version.value:
+            parts = tuple([p for p in self._walk_parts(self._rels)])
+            # any change to a collection walked makes the sequence stale
+            self._rels._watch(graph_version)
+            for part in parts:
+                part._rels._watch(graph_version)
+            self._parts = parts
+            self._parts_version = graph_version.value
+            self._parts_by_partname = None
+        return self._parts
 
     @property
     def rels(self):
@@ -66,14 +244,78 @@ class OpcPackage(object):
         """
         return self._rels
 
-    def save(self, pkg_file):
+    def save(self, pkg_file, workers=None, backend=None, compression=None):
         """
         Save this package to *pkg_file*, where *file* can be either a path to
-        a file (a string) or a file-like object.
-        """
+        a file (a string) or a file-like object. When this package was opened
+        with ``lazy=True``, the compressed member of each part whose blob is
+        unchanged is copied directly from a source package of the same
+        format. If *workers* is a positive integer, part blobs are
+        compressed concurrently on a pool of that many threads. *pkg_file*
+        is written by the physical package backend named *backend*, chosen
+        as by :meth:`open` by default; use ``backend='dir'`` to extract the
+        package into a directory not yet created. *compression* is a
+        |CompressionPolicy| deciding how each part is compressed; by default
+        media such as JPEG and PNG images is stored and very large XML parts
+        are compressed at a fast level. Raises |ValueError| if *pkg_file* is
+        the package file this package was opened from with ``lazy=True`` and
+        still holds open; use :meth:`save_incremental` to save in place. A
+        partial package cannot be saved and also raises |ValueError|.
+        """
+        self._raise_if_partial()
+        if self._pkg_reader is not None and self._pkg_reader.reads_from(
+                pkg_file):
+            raise ValueError('cannot save over the package file held open by '
+                             'a lazily opened package; save to another file '
+                             'or use save_incremental()')
         for part in self.parts:
             part._before_marshal()
-        PackageWriter.write(pkg_file, self._rels, self.parts)
+        PackageWriter.write(pkg_file, self._rels, self.parts, workers,
+                            backend, compression)
+
+    def save_async(self, pkg_file, workers=None, backend=None,
+                   compression=None, executor=None):
+        """
+        Return an awaitable that saves this package as :meth:`save` does,
+        with the package serialized and written on *executor*, the event
+        loop's default executor if |None|, so the event loop is not blocked.
+        *pkg_file* can also be an async byte stream, such as an
+        :class:`asyncio.StreamWriter`. Requires Python 3.6 or later.
+        """
+        from opc.aio import save_package
+        return save_package(self, pkg_file, workers, backend, compression,
+                            executor)
+
+    def save_incremental(self, pkg_file, compact_threshold=0.5,
+                         compression=None):
+        """
+        Save this package in place to *pkg_file*, the package file (path or
+        file-like object) it was opened from with ``lazy=True``, writing
+        only the parts and items that changed. Changed items are appended to
+        the archive, so the cost of a save depends on the size of the edit
+        rather than of the package. The space left behind by replaced and
+        removed items is reclaimed, by compacting the archive in place, once
+        it exceeds *compact_threshold*, a fraction of the archive size.
+        Changed items are compressed as *compression* decides, as for
+        :meth:`save`. Only zip packages can be saved incrementally. Raises
+        |ValueError| if this package was not opened with ``lazy=True``, is
+        partial or was not opened from *pkg_file*.
+        """
+        self._raise_if_partial()
+        if self._pkg_reader is None:
+            raise ValueError('save_incremental() requires a package opened '
+                             'with lazy=True and not yet closed')
+        if not self._pkg_reader.reads_from(pkg_file):
+            raise ValueError('save_incremental() can only save to the '
+                             'package file the package was opened from')
+        parts = self.parts
+        for part in parts:
+            part._before_marshal()
+        PackageWriter.update(pkg_file, self._rels, parts, self._pkg_reader,
+                             compact_threshold, compression)
+        self._pkg_reader.reopen(pkg_file)
+        for part in parts:
+            part._after_save(self._pkg_reader)
 
     def _add_relationship(self, reltype, target, rId, external=False):
         """
@@ -83,24 +325,155 @@ class OpcPackage(object):
         """
         return self._rels.add_relationship(reltype, target, rId, external)
 
+    def _raise_if_partial(self):
+        """
+        Raise |ValueError| if this package is partial, as saving it would
+        drop the relationships and parts it did not load.
+        """
+        if self._is_partial:
+            raise ValueError('cannot save a package opened with follow, '
+                             'which holds only part of its package file')
+
     @staticmethod
-    def _walk_parts(rels, visited_parts=None):
+    def _walk_parts(rels):
         """
         Generate exactly one reference to each of the parts in the package by
         performing a depth-first traversal of the rels graph.
         """
-        if visited_parts is None:
-            visited_parts = []
-        for rel in rels:
-            if rel.is_external:
-                continue
+        def target_key(rel):
+            return id(rel.target_part)
+
+        def visit(rel):
             part = rel.target_part
-            if part in visited_parts:
-                continue
-            visited_parts.append(part)
-            yield part
-            for part in OpcPackage._walk_parts(part._rels, visited_parts):
-                yield part
+            return part, part._rels
+
+        return walk_rels_graph(rels, target_key, visit)
+
+
+class PackageCache(object):
+    """
+    Cache of parsed packages, for a process that repeatedly opens the same
+    few package files, such as templates. The first :meth:`open` of a
+    package file parses it as :meth:`OpcPackage.open` does; later ones only
+    build a new part and relationship graph from the parsed contents, the
+    blobs of plain parts being shared until they are assigned. At most
+    *maxsize* parsed packages are held, the least recently opened being
+    discarded to make room.
+
+    A package file path is recognized by its modification time and size
+    when *keyed_by* is ``'mtime'`` and by a digest of its content when it
+    is ``'digest'``. A file-like object is always recognized by a digest of
+    its content. Opening is thread-safe, so a single instance can serve a
+    whole process; threads opening the same uncached package file wait for
+    the one parsing it rather than each parsing it.
+    """
+    def __init__(self, maxsize=16, keyed_by='mtime'):
+        super(PackageCache, self).__init__()
+        if keyed_by not in ('mtime', 'digest'):
+            tmpl = "keyed_by must be 'mtime' or 'digest', got '%s'"
+            raise ValueError(tmpl % keyed_by)
+        self._pkg_readers = LRUCache(maxsize)
+        self._keyed_by = keyed_by
+        self._hits = self._misses = 0
+        self._lock = Lock()
+        # lock held while parsing the package file having each key
+        self._parse_locks = {}
+
+    def __len__(self):
+        return len(self._pkg_readers)
+
+    def clear(self):
+        """
+        Discard all parsed packages held by this cache.
+        """
+        self._pkg_readers.clear()
+
+    @property
+    def hits(self):
+        """
+        Number of packages opened from a cached parse.
+        """
+        return self._hits
+
+    @property
+    def misses(self):
+        """
+        Number of packages parsed from their package file.
+        """
+        return self._misses
+
+    def open(self, pkg_file):
+        """
+        Return a new |OpcPackage| instance loaded with the contents of
+        *pkg_file*, a path to a zip package file or a file-like object
+        containing one, parsing it only if it is not already cached.
+        Changes to the returned package do not affect the cache or other
+        packages opened from it.
+        """
+        key, pkg_file = self._key_for(pkg_file)
+        pkg_reader = self._pkg_reader_for(key, pkg_file)
+        pkg = OpcPackage()
+        Unmarshaller.unmarshal(pkg_reader, pkg, PartFactory)
+        return pkg
+
+    def _cached_pkg_reader(self, key):
+        """
+        Return the parsed package cached under *key*, counting a hit, or
+        |None| if there is none. The caller holds :attr:`_lock`.
+        """
+        pkg_reader = self._pkg_readers.get(key)
+        if pkg_reader is not None:
+            self._hits += 1
+        return pkg_reader
+
+    def _pkg_reader_for(self, key, pkg_file):
+        """
+        Return the parsed package cached under *key*, first parsing it from
+        *pkg_file* and caching it if not cached. Only one thread at a time
+        parses the package file having a given key.
+        """
+        with self._lock:
+            pkg_reader = self._cached_pkg_reader(key)
+            if pkg_reader is not None:
+                return pkg_reader
+            parse_lock = self._parse_locks.setdefault(key, Lock())
+        with parse_lock:
+            with self._lock:
+                pkg_reader = self._cached_pkg_reader(key)
+            if pkg_reader is not None:
+                return pkg_reader
+            try:
+                pkg_reader = PackageReader.from_file(pkg_file)
+                with self._lock:
+                    self._misses += 1
+                    self._pkg_readers.put(key, pkg_reader)
+            finally:
+                with self._lock:
+                    if self._parse_locks.get(key) is parse_lock:
+                        del self._parse_locks[key]
+        return pkg_reader
+
+    def _key_for(self, pkg_file):
+        """
+        Return a `(key, pkg_file)` pair, *key* identifying the content of
+        *pkg_file* and *pkg_file* to be parsed in its place if not cached.
+        A file-like object is read whole to compute its digest, so it is
+        replaced by an in-memory copy of its content.
+        """
+        if hasattr(pkg_file, 'read'):
+            blob = pkg_file.read()
+            return ('digest', hashlib.sha1(blob).hexdigest()), BytesIO(blob)
+        if not os.path.isfile(pkg_file):
+            tmpl = "only a zip package file can be cached, got '%s'"
+            raise ValueError(tmpl % pkg_file)
+        if self._keyed_by == 'digest':
+            with open(pkg_file, 'rb') as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+            return ('digest', digest), pkg_file
+        stat = os.stat(pkg_file)
+        key = ('mtime', os.path.abspath(pkg_file), stat.st_mtime,
+               stat.st_size)
+        return key, pkg_file
 
 
 class Part(object):
@@ -109,20 +482,42 @@ class Part(object):
     intended to be subclassed in client code to implement specific part
     behaviors.
     """
-    def __init__(self, partname, content_type, blob=None):
+    # True for parts written by streaming chunks from :meth:`iter_chunks`
+    is_streamed = False
+    # True for a part class whose load() and _after_unmarshal() may run on a
+    # worker thread concurrently with those of other parts, see
+    # :meth:`OpcPackage.open`
+    is_thread_safe = False
+
+    def __init__(self, partname, content_type, blob=None, blob_reader=None):
         super(Part, self).__init__()
         self._partname = partname
         self._content_type = content_type
         self._blob = blob
+        self._blob_reader = blob_reader
+        self._src_partname = partname
         self._rels = RelationshipCollection(partname.baseURI)
 
     @property
     def blob(self):
         """
         Contents of this package part as a sequence of bytes. May be text or
-        binary.
-        """
-        return self._blob
+        binary. If this part was loaded lazily, its blob is read from the
+        package file the first time it is accessed, or each time it is
+        accessed if the package was opened with a blob cache, which then
+        holds it.
+        """
+        if self._blob is not None or self._blob_reader is None:
+            return self._blob
+        blob = self._blob_reader.blob_for(self._src_partname)
+        if not self._blob_reader.caches_blobs:
+            self._blob = blob
+        return blob
+
+    @blob.setter
+    def blob(self, blob):
+        self._blob = blob
+        self._blob_reader = None
 
     @property
     def content_type(self):
@@ -131,6 +526,31 @@ class Part(object):
         """
         return self._content_type
 
+    @property
+    def is_dirty(self):
+        """
+        |False| if the blob of this part is known to be unchanged from the
+        package member it was lazily loaded from, |True| otherwise. A part
+        whose class overrides :attr:`blob`, for example to serialize an XML
+        tree, is always dirty since its blob is generated on demand.
+        """
+        if self._blob_reader is None:
+            return True
+        return type(self).blob is not Part.blob
+
+    def open_stream(self):
+        """
+        Return a readable file-like object over the content of this part,
+        which the caller should close when done with it. The content of a
+        lazily loaded part whose blob has not been read is decompressed from
+        the package file as it is read rather than held in memory, so a
+        large part can be processed incrementally, for example with
+        ``lxml.etree.iterparse(part.open_stream())``.
+        """
+        if not self.is_dirty and self._blob is None:
+            return self._blob_reader.open_stream(self._src_partname)
+        return BytesIO(self.blob)
+
     @property
     def partname(self):
         """
@@ -138,6 +558,10 @@ class Part(object):
         """
         return self._partname
 
+    @partname.setter
+    def partname(self, partname):
+        self._partname = partname
+
     @property
     def rels(self):
         """
@@ -153,6 +577,15 @@ class Part(object):
         """
         return self._rels.add_relationship(reltype, target, rId, external)
 
+    def _after_save(self, blob_reader):
+        """
+        Note that the content of this part is now stored under its current
+        partname in the package read by *blob_reader*, so an unchanged part
+        is not written again by the next incremental save.
+        """
+        self._blob_reader = blob_reader
+        self._src_partname = self.partname
+
     def _after_unmarshal(self):
         """
         Entry point for post-unmarshaling processing, for example to parse
@@ -173,19 +606,132 @@ class Part(object):
         # subclass
         pass
 
+    def _clone(self):
+        """
+        Return a copy of this part having no relationships. A plain |Part|
+        is copied sharing its blob, which is immutable, and its blob reader.
+        A part of a subclass, which may hold mutable state derived from its
+        blob such as a parsed XML tree, is instead loaded afresh from its
+        current blob by the ``load()`` classmethod of its class, and then
+        gets an :meth:`_after_unmarshal` call once its relationships are
+        added. Raises |ValueError| if the subclass has no ``load()``. A
+        subclass can override this to copy its state more cheaply.
+        """
+        if type(self) is Part:
+            return self._shallow_clone()
+        load = getattr(type(self), 'load', None)
+        if load is None:
+            tmpl = ("part '%s' of class %s cannot be cloned, it has no load"
+                    "() classmethod")
+            raise ValueError(tmpl % (self.partname, type(self).__name__))
+        return load(self.partname, self.content_type, self.blob)
+
+    def _shallow_clone(self):
+        """
+        Return a shallow copy of this part having no relationships.
+        """
+        clone = copy.copy(self)
+        clone._rels = RelationshipCollection(self._partname.baseURI)
+        return clone
+
+
+class StreamPart(Part):
+    """
+    Part whose content is supplied as an iterable of byte chunks or a
+    file-like object instead of a blob, for example a very large generated
+    worksheet. When the package is saved, the content is streamed into the
+    package one chunk at a time so it is never held in memory as a whole.
+    The content source is generally consumed when read, so a package
+    containing a stream part can be saved only once.
+    """
+    is_streamed = True
+
+    _CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, partname, content_type, source):
+        super(StreamPart, self).__init__(partname, content_type)
+        self._source = source
+
+    @property
+    def blob(self):
+        """
+        Entire content of this part as a single sequence of bytes. Reading
+        it consumes the content source and holds the content in memory, so
+        it should be avoided for large content.
+        """
+        if self._blob is None:
+            self._blob = b''.join(self.iter_chunks())
+        return self._blob
+
+    def iter_chunks(self):
+        """
+        Generate the content of this part as a sequence of byte chunks,
+        read from the file-like object or iterable it was constructed with.
+        """
+        if self._blob is not None:
+            yield self._blob
+            return
+        source = self._source
+        if hasattr(source, 'read'):
+            while True:
+                chunk = source.read(self._CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+            return
+        for chunk in source:
+            yield chunk
+
+    def _clone(self):
+        """
+        Return a copy of this part having no relationships and sharing its
+        blob. Raises |ValueError| unless the content source has already been
+        read into :attr:`blob`, since a source consumed by one part cannot
+        also be read by the other.
+        """
+        if self._blob is None:
+            tmpl = "stream part '%s' cannot be cloned before it is read"
+            raise ValueError(tmpl % self.partname)
+        return self._shallow_clone()
+
 
 class PartFactory(object):
     """
     Provides a way for client code to specify a subclass of |Part| to be
-    constructed by |Unmarshaller| based on its content type.
+    constructed by |Unmarshaller| based on its content type. When
+    *blob_reader* is provided and *blob* is |None|, a plain |Part| defers
+    reading its blob to first access while a custom part class, which
+    generally needs its blob to load, has it read immediately.
     """
     part_type_for = {}
 
-    def __new__(cls, partname, content_type, blob):
+    def __new__(cls, partname, content_type, blob, blob_reader=None):
         if content_type in PartFactory.part_type_for:
+            if blob is None and blob_reader is not None:
+                blob = blob_reader.blob_for(partname)
             CustomPartClass = PartFactory.part_type_for[content_type]
             return CustomPartClass.load(partname, content_type, blob)
-        return Part(partname, content_type, blob)
+        return Part(partname, content_type, blob, blob_reader)
+
+    @staticmethod
+    def part_class_for(content_type):
+        """
+        Return the part class constructed for a part having *content_type*,
+        without constructing one.
+        """
+        return PartFactory.part_type_for.get(content_type, Part)
+
+
+class _GraphVersion(object):
+    """
+    Counter advanced on every change to a relationship collection of one
+    package, so views computed from its relationship graph, such as
+    :attr:`OpcPackage.parts`, can tell when they may be stale without being
+    affected by changes to other packages.
+    """
+    def __init__(self):
+        super(_GraphVersion, self).__init__()
+        self.value = 0
 
 
 class _Relationship(object):
@@ -235,19 +781,29 @@ class RelationshipCollection(object):
         super(RelationshipCollection, self).__init__()
         self._baseURI = baseURI
         self._rels = []
+        self._rels_by_rId = {}
+        self._rels_by_reltype = {}
+        # all of 'rId1' up to but not including this number are in use
+        self._rId_num_floor = 1
+        # |_GraphVersion| of each package whose cached views were computed
+        # from this collection, advanced on every change to it
+        self._watchers = []
 
     def __getitem__(self, key):
         """
         Implements access by subscript, e.g. ``rels[9]``. It also implements
         dict-style lookup of a relationship by rId, e.g. ``rels['rId1']``.
         """
-        if isinstance(key, basestring):
-            for rel in self._rels:
-                if rel.rId == key:
-                    return rel
-            raise KeyError("no rId '%s' in RelationshipCollection" % key)
-        else:
+        if isinstance(key, (int, slice)):
             return self._rels.__getitem__(key)
+        try:
+            return self._rels_by_rId[key]
+        except KeyError:
+            raise KeyError("no rId '%s' in RelationshipCollection" % key)
+
+    def __iter__(self):
+        """Implements iteration, e.g. ``for rel in rels:``"""
+        return self._rels.__iter__()
 
     def __len__(self):
         """Implements len() built-in on this object"""
@@ -259,6 +815,10 @@ class RelationshipCollection(object):
         """
         rel = _Relationship(rId, reltype, target, self._baseURI, external)
         self._rels.append(rel)
+        self._rels_by_rId.setdefault(rId, rel)
+        self._rels_by_reltype.setdefault(reltype, []).append(rel)
+        for graph_version in self._watchers:
+            graph_version.value += 1
         return rel
 
     def get_rel_of_type(self, reltype):
@@ -267,7 +827,7 @@ class RelationshipCollection(object):
         Raises |KeyError| if no matching relationship is found. Raises
         |ValueError| if more than one matching relationship is found.
         """
-        matching = [rel for rel in self._rels if rel.reltype == reltype]
+        matching = self._rels_by_reltype.get(reltype, ())
         if len(matching) == 0:
             tmpl = "no relationship of type '%s' in collection"
             raise KeyError(tmpl % reltype)
@@ -276,6 +836,27 @@ class RelationshipCollection(object):
             raise ValueError(tmpl % reltype)
         return matching[0]
 
+    def rels_of_type(self, reltype):
+        """
+        Return a list, possibly empty, of the relationships of type
+        *reltype* in this collection, in the order they were added.
+        """
+        return list(self._rels_by_reltype.get(reltype, ()))
+
+    @property
+    def next_available_rId(self):
+        """
+        Next available rId in this collection, starting from 'rId1' and
+        making use of any gaps in numbering, e.g. 'rId2' for rIds ['rId1',
+        'rId3']. Since no rId below the lowest gap is ever freed, the search
+        resumes where the last one stopped rather than rescanning.
+        """
+        num = self._rId_num_floor
+        while 'rId%d' % num in self._rels_by_rId:
+            num += 1
+        self._rId_num_floor = num
+        return 'rId%d' % num
+
     @property
     def xml(self):
         """
@@ -288,6 +869,14 @@ class RelationshipCollection(object):
                              rel.is_external)
         return rels_elm.xml
 
+    def _watch(self, graph_version):
+        """
+        Advance *graph_version*, a |_GraphVersion| instance, on every later
+        change to this collection.
+        """
+        if graph_version not in self._watchers:
+            self._watchers.append(graph_version)
+
 
 class Unmarshaller(object):
     """
@@ -295,27 +884,115 @@ class Unmarshaller(object):
     instance.
     """
     @staticmethod
-    def unmarshal(pkg_reader, pkg, part_factory):
+    def unmarshal(pkg_reader, pkg, part_factory, workers=None):
         """
         Construct graph of parts and realized relationships based on the
         contents of *pkg_reader*, delegating construction of each part to
-        *part_factory*. Package relationships are added to *pkg*.
-        """
+        *part_factory*. Package relationships are added to *pkg*. If
+        *workers* is a positive integer, thread-safe parts are constructed
+        and their :meth:`_after_unmarshal` hooks run on a pool of that many
+        threads, as described for :meth:`_unmarshal_in_parallel`.
+        """
+        if workers:
+            Unmarshaller._unmarshal_in_parallel(pkg_reader, pkg,
+                                                part_factory, workers)
+            return
         parts = Unmarshaller._unmarshal_parts(pkg_reader, part_factory)
         Unmarshaller._unmarshal_relationships(pkg_reader, pkg, parts)
         for part in parts.values():
             part._after_unmarshal()
 
+    @staticmethod
+    def _is_thread_safe(part_factory, content_type):
+        """
+        Return |True| if the part *part_factory* constructs for
+        *content_type* can be constructed on a worker thread. Parts of a
+        factory that cannot name its part class never are.
+        """
+        part_class_for = getattr(part_factory, 'part_class_for', None)
+        if part_class_for is None:
+            return False
+        return getattr(part_class_for(content_type), 'is_thread_safe', False)
+
+    @staticmethod
+    def _unmarshal_in_parallel(pkg_reader, pkg, part_factory, workers):
+        """
+        Unmarshal *pkg_reader* into *pkg* as :meth:`unmarshal` does, with
+        the thread-safe parts constructed and their :meth:`_after_unmarshal`
+        hooks run on a pool of *workers* threads. The other parts are
+        constructed and their hooks run on the calling thread, in package
+        order. Every part is constructed before any relationship is added
+        and every relationship is added before any hook is run, just as
+        when unmarshalling serially.
+        """
+        sparts = list(pkg_reader.iter_sparts())
+        is_thread_safe = Unmarshaller._is_thread_safe
+
+        def unmarshal_part(spart):
+            partname, content_type, blob = spart
+            return Unmarshaller._unmarshal_part(
+                pkg_reader, part_factory, partname, content_type, blob
+            )
+
+        def after_unmarshal(part):
+            part._after_unmarshal()
+
+        pool = ThreadPool(workers)
+        try:
+            pooled_sparts = [
+                spart for spart in sparts
+                if is_thread_safe(part_factory, spart[1])
+            ]
+            pooled = pool.map_async(unmarshal_part, pooled_sparts)
+            parts = {}
+            for spart in sparts:
+                if not is_thread_safe(part_factory, spart[1]):
+                    parts[spart[0]] = unmarshal_part(spart)
+            for spart, part in zip(pooled_sparts, pooled.get()):
+                parts[spart[0]] = part
+            Unmarshaller._unmarshal_relationships(pkg_reader, pkg, parts)
+            ordered_parts = [parts[spart[0]] for spart in sparts]
+            # a registered part class need not be a Part subclass
+            pooled_parts = [
+                part for part in ordered_parts
+                if getattr(part, 'is_thread_safe', False)
+            ]
+            pooled = pool.map_async(after_unmarshal, pooled_parts)
+            for part in ordered_parts:
+                if not getattr(part, 'is_thread_safe', False):
+                    part._after_unmarshal()
+            pooled.get()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    @staticmethod
+    def _unmarshal_part(pkg_reader, part_factory, partname, content_type,
+                        blob):
+        """
+        Return the |Part| instance constructed by *part_factory* for the
+        serialized part having *partname*, *content_type* and *blob*. A part
+        whose blob was not loaded by a lazy *pkg_reader* is given
+        *pkg_reader* to read its blob from on demand.
+        """
+        if blob is None:
+            return part_factory(partname, content_type, blob, pkg_reader)
+        return part_factory(partname, content_type, blob)
+
     @staticmethod
     def _unmarshal_parts(pkg_reader, part_factory):
         """
         Return a dictionary of |Part| instances unmarshalled from
         *pkg_reader*, keyed by partname. Side-effect is that each part in
-        *pkg_reader* is constructed using *part_factory*.
+        *pkg_reader* is constructed using *part_factory*. A part whose blob
+        was not loaded by a lazy *pkg_reader* is given *pkg_reader* to read
+        its blob from on demand.
         """
         parts = {}
         for partname, content_type, blob in pkg_reader.iter_sparts():
-            parts[partname] = part_factory(partname, content_type, blob)
+            parts[partname] = Unmarshaller._unmarshal_part(
+                pkg_reader, part_factory, partname, content_type, blob
+            )
         return parts
 
     @staticmethod
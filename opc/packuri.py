@@ -14,17 +14,69 @@ PACKAGE_URI.
 
 import posixpath
 
+from weakref import WeakValueDictionary
+
+from opc.cache import LRUCache
+
+
+# bounds on the number of path computations remembered by PackURI; keys
+# include every input, so a renamed part never hits a stale entry
+REL_REF_CACHE_SIZE = 8192
+# bound on the number of PackURI instances interned where they cannot be
+# weakly referenced
+INTERN_CACHE_SIZE = 65536
+
+
+def _str_subclass_slots_supported():
+    """
+    Return |True| if a subclass of |str| can declare instance slots,
+    including one for weak references. Python 2 supports neither.
+    """
+    try:
+        type('_SlottedStr', (str,), {'__slots__': ('__weakref__',)})
+    except TypeError:
+        return False
+    return True
+
+
+_STR_SLOTS_SUPPORTED = _str_subclass_slots_supported()
+
 
 class PackURI(str):
     """
     Provides access to pack URI components such as the baseURI and the
     filename slice. Behaves as |str| otherwise.
+
+    Instances are interned, so constructing a |PackURI| from a string equal
+    to that of a live instance returns that same instance. Components are
+    computed once, when the instance is first constructed. Where a |str|
+    subclass cannot be weakly referenced, as on Python 2, the most recently
+    used instances are interned in a bounded cache instead.
     """
+    if _STR_SLOTS_SUPPORTED:
+        __slots__ = ('_baseURI', '_filename', '_ext', '_rels_uri',
+                     '__weakref__')
+        _interned = WeakValueDictionary()
+    else:
+        _interned = LRUCache(INTERN_CACHE_SIZE)
+
     def __new__(cls, pack_uri_str):
+        pack_uri = cls._interned.get(pack_uri_str)
+        if pack_uri is not None:
+            return pack_uri
         if not pack_uri_str[0] == '/':
             tmpl = "PackURI must begin with slash, got '%s'"
             raise ValueError(tmpl % pack_uri_str)
-        return str.__new__(cls, pack_uri_str)
+        pack_uri = str.__new__(cls, pack_uri_str)
+        pack_uri._baseURI, pack_uri._filename = posixpath.split(pack_uri)
+        pack_uri._ext = posixpath.splitext(pack_uri)[1]
+        pack_uri._rels_uri = None
+        # key on a plain str; a PackURI key would keep its value alive
+        return cls._interned.setdefault(str(pack_uri_str), pack_uri)
+
+    def __reduce__(self):
+        # unpickle through the constructor so the result is interned
+        return (PackURI, (str(self),))
 
     @staticmethod
     def from_rel_ref(baseURI, relative_ref):
@@ -32,9 +84,14 @@ class PackURI(str):
         Return a |PackURI| instance containing the absolute pack URI formed by
         translating *relative_ref* onto *baseURI*.
         """
-        joined_uri = posixpath.join(baseURI, relative_ref)
-        abs_uri = posixpath.abspath(joined_uri)
-        return PackURI(abs_uri)
+        key = (baseURI, relative_ref)
+        pack_uri = _from_rel_ref_cache.get(key)
+        if pack_uri is None:
+            joined_uri = posixpath.join(baseURI, relative_ref)
+            abs_uri = posixpath.abspath(joined_uri)
+            pack_uri = PackURI(abs_uri)
+            _from_rel_ref_cache.put(key, pack_uri)
+        return pack_uri
 
     @property
     def baseURI(self):
@@ -43,7 +100,7 @@ class PackURI(str):
         speaking. E.g. ``'/ppt/slides'`` for ``'/ppt/slides/slide1.xml'``.
         For the package pseudo-partname '/', baseURI is '/'.
         """
-        return posixpath.split(self)[0]
+        return self._baseURI
 
     @property
     def ext(self):
@@ -52,7 +109,7 @@ class PackURI(str):
         ``'/ppt/slides/slide1.xml'``. Note that the period is included,
         consistent with the behavior of :meth:`posixpath.ext`.
         """
-        return posixpath.splitext(self)[1]
+        return self._ext
 
     @property
     def filename(self):
@@ -61,7 +118,7 @@ class PackURI(str):
         ``'/ppt/slides/slide1.xml'``. For the package pseudo-partname '/',
         filename is ''.
         """
-        return posixpath.split(self)[1]
+        return self._filename
 
     @property
     def membername(self):
@@ -81,9 +138,12 @@ class PackURI(str):
         # workaround for posixpath bug in 2.6, doesn't generate correct
         # relative path when *start* (second) parameter is root ('/')
         if baseURI == '/':
-            relpath = self[1:]
-        else:
+            return self[1:]
+        key = (self, baseURI)
+        relpath = _relative_ref_cache.get(key)
+        if relpath is None:
             relpath = posixpath.relpath(self, baseURI)
+            _relative_ref_cache.put(key, relpath)
         return relpath
 
     @property
@@ -93,10 +153,16 @@ class PackURI(str):
         Only produces sensible output if the pack URI is a partname or the
         package pseudo-partname '/'.
         """
-        rels_filename = '%s.rels' % self.filename
-        rels_uri_str = posixpath.join(self.baseURI, '_rels', rels_filename)
-        return PackURI(rels_uri_str)
+        if self._rels_uri is None:
+            rels_filename = '%s.rels' % self._filename
+            rels_uri_str = posixpath.join(self._baseURI, '_rels',
+                                          rels_filename)
+            self._rels_uri = PackURI(rels_uri_str)
+        return self._rels_uri
+
 
+_from_rel_ref_cache = LRUCache(REL_REF_CACHE_SIZE)
+_relative_ref_cache = LRUCache(REL_REF_CACHE_SIZE)
 
 PACKAGE_URI = PackURI('/')
 CONTENT_TYPES_URI = PackURI('/[Content_Types].xml')
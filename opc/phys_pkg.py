@@ -9,35 +9,128 @@
 
 """
 Provides a general interface to a *physical* OPC package, such as a zip file.
+Other physical forms, such as a package extracted into a directory, are
+provided by backends registered with :func:`register_backend`.
 """
 
-from zipfile import ZIP_DEFLATED, ZipFile
+import errno
+import mmap
+import os
+import struct
+import time
+import zlib
+
+from io import BytesIO
+from operator import attrgetter
+
+from zipfile import BadZipfile, ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
+
+from opc.compression import CompressionPolicy, STORED
+from opc.packuri import PACKAGE_URI
+
+try:
+    _string_types = (basestring,)  # noqa
+except NameError:  # Python 3
+    _string_types = (str,)
+
+
+# size of fixed portion of a zip local file header
+_LOCAL_HEADER_SIZE = 30
+_LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+# general purpose flag bit indicating sizes follow data in a descriptor
+_DATA_DESCRIPTOR_FLAG = 0x08
+_DATA_DESCRIPTOR_SIGNATURE = b'PK\x07\x08'
+# general purpose flag bit indicating the member is encrypted
+_ENCRYPTED_FLAG = 0x01
+_ZIP64_EXTRA_ID = 0x0001
+_RAW_CHUNK_SIZE = 64 * 1024
+_CONTENT_TYPES_MEMBERNAME = '[Content_Types].xml'
+# name of the |ZipInfo| slot holding the level its member is deflated at,
+# |None| before Python 3.7, where zipfile always uses the default level
+_ZINFO_LEVEL_SLOT = next(
+    (name for name in ('compress_level', '_compresslevel')
+     if name in getattr(ZipInfo, '__slots__', ())), None
+)
+
+# maps backend name to a 2-tuple (reader_factory, writer_factory)
+_backends = {}
+
+
+def register_backend(name, reader_factory, writer_factory):
+    """
+    Register a physical package backend under *name*, making it selectable
+    using the *backend* argument of :meth:`OpcPackage.open` and
+    :meth:`OpcPackage.save`. *reader_factory* and *writer_factory* are each
+    called with a package file and return an object implementing the
+    |PhysPkgReader| or |PhysPkgWriter| interface respectively;
+    *writer_factory* is also passed the |CompressionPolicy| to save with, or
+    |None| for the default one. A backend registered under the name of an
+    existing one replaces it.
+    """
+    _backends[name] = (reader_factory, writer_factory)
+
+
+def _backend_factories(pkg_file, backend):
+    """
+    Return the 2-tuple `(reader_factory, writer_factory)` of the backend
+    named *backend* or, if *backend* is |None|, of the built-in backend
+    suited to *pkg_file*: 'dict' for a dict, 'dir' for a path to a
+    directory and 'zip' for anything else.
+    """
+    if backend is None:
+        if isinstance(pkg_file, dict):
+            backend = 'dict'
+        elif isinstance(pkg_file, _string_types) and os.path.isdir(pkg_file):
+            backend = 'dir'
+        else:
+            backend = 'zip'
+    try:
+        return _backends[backend]
+    except KeyError:
+        raise ValueError("no package backend registered as '%s'" % backend)
 
 
 class PhysPkgReader(object):
     """
-    Factory for physical package reader objects.
+    Factory for physical package reader objects, using the backend named
+    *backend* or, by default, the built-in backend suited to *pkg_file*.
     """
-    def __new__(cls, pkg_file):
-        return ZipPkgReader(pkg_file)
+    def __new__(cls, pkg_file, backend=None):
+        reader_factory = _backend_factories(pkg_file, backend)[0]
+        return reader_factory(pkg_file)
 
 
 class PhysPkgWriter(object):
     """
-    Factory for physical package writer objects.
+    Factory for physical package writer objects, using the backend named
+    *backend* or, by default, the built-in backend suited to *pkg_file*.
+    Members are compressed as *compression*, a |CompressionPolicy|, decides
+    or, if |None|, as the default policy does.
     """
-    def __new__(cls, pkg_file):
-        return ZipPkgWriter(pkg_file)
+    def __new__(cls, pkg_file, backend=None, compression=None):
+        writer_factory = _backend_factories(pkg_file, backend)[1]
+        return writer_factory(pkg_file, compression)
+
+
+class PhysPkgUpdater(object):
+    """
+    Factory for physical package updater objects, which write to an
+    existing physical package in place.
+    """
+    def __new__(cls, pkg_file, compression=None):
+        return ZipPkgUpdater(pkg_file, compression)
 
 
 class ZipPkgReader(object):
     """
     Implements |PhysPkgReader| interface for a zip file OPC package.
     """
-    _CONTENT_TYPES_MEMBERNAME = '[Content_Types].xml'
+    # members are copied as-is only between zip readers and writers
+    raw_format = 'zip'
 
     def __init__(self, pkg_file):
         super(ZipPkgReader, self).__init__()
+        self._pkg_file = pkg_file
         self._zipf = ZipFile(pkg_file, 'r')
 
     def blob_for(self, pack_uri):
@@ -45,7 +138,7 @@ class ZipPkgReader(object):
         Return blob corresponding to *pack_uri*. Raises |ValueError| if no
         matching member is present in zip archive.
         """
-        return self._zipf.read(pack_uri.membername)
+        return self._read_member(pack_uri.membername)
 
     def close(self):
         """
@@ -58,7 +151,49 @@ class ZipPkgReader(object):
         """
         Return the `[Content_Types].xml` blob from the zip package.
         """
-        return self._zipf.read(self._CONTENT_TYPES_MEMBERNAME)
+        return self._read_member(_CONTENT_TYPES_MEMBERNAME)
+
+    def open_stream(self, pack_uri):
+        """
+        Return a readable file-like object over the member corresponding to
+        *pack_uri*, decompressing its data as it is read. Raises |KeyError|
+        if no matching member is present in zip archive.
+        """
+        return self._zipf.open(pack_uri.membername)
+
+    def member_size(self, pack_uri):
+        """
+        Return a 2-tuple `(size, compressed_size)` of the member
+        corresponding to *pack_uri*, read from the central directory without
+        touching the member data. Raises |KeyError| if no matching member is
+        present in zip archive.
+        """
+        zinfo = self._zipf.getinfo(pack_uri.membername)
+        return zinfo.file_size, zinfo.compress_size
+
+    def raw_member_for(self, pack_uri):
+        """
+        Return a 2-tuple `(zinfo, raw_chunks)` for the member corresponding
+        to *pack_uri*, where *zinfo* is its |ZipInfo| and *raw_chunks*
+        generates its data exactly as stored in the archive, without
+        decompressing it. Raises |KeyError| if no matching member is present
+        in zip archive.
+        """
+        zinfo = self._zipf.getinfo(pack_uri.membername)
+        return zinfo, self._iter_raw_chunks(zinfo)
+
+    def reads_from(self, pkg_file):
+        """
+        Return |True| if *pkg_file* is the package file this reader reads
+        from, either the same file-like object or a path to the same file.
+        """
+        if pkg_file is self._pkg_file:
+            return True
+        if not (isinstance(pkg_file, _string_types) and
+                isinstance(self._pkg_file, _string_types)):
+            return False
+        return (os.path.exists(pkg_file) and
+                os.path.samefile(pkg_file, self._pkg_file))
 
     def rels_xml_for(self, source_uri):
         """
@@ -66,19 +201,166 @@ class ZipPkgReader(object):
         item is present.
         """
         try:
-            rels_xml = self._zipf.read(source_uri.rels_uri.membername)
+            rels_xml = self._read_member(source_uri.rels_uri.membername)
         except KeyError:
             rels_xml = None
         return rels_xml
 
+    def _read_member(self, membername):
+        """
+        Return the decompressed content of the member named *membername*.
+        Raises |KeyError| if no such member is present in the zip archive.
+        """
+        return self._zipf.read(membername)
+
+    def _iter_raw_chunks(self, zinfo):
+        """
+        Generate the stored (compressed) data of the member described by
+        *zinfo* in chunks, locating it by reading its local file header.
+        """
+        zipf = self._zipf
+        with zipf._lock:
+            zipf.fp.seek(zinfo.header_offset)
+            header = zipf.fp.read(_LOCAL_HEADER_SIZE)
+        if header[:4] != _LOCAL_HEADER_SIGNATURE:
+            tmpl = "bad local file header for zip member '%s'"
+            raise BadZipfile(tmpl % zinfo.filename)
+        filename_len, extra_len = struct.unpack('<HH', header[26:30])
+        offset = (zinfo.header_offset + _LOCAL_HEADER_SIZE + filename_len +
+                  extra_len)
+        remaining = zinfo.compress_size
+        while remaining:
+            with zipf._lock:
+                zipf.fp.seek(offset)
+                chunk = zipf.fp.read(min(remaining, _RAW_CHUNK_SIZE))
+            if not chunk:
+                tmpl = "truncated data for zip member '%s'"
+                raise BadZipfile(tmpl % zinfo.filename)
+            offset += len(chunk)
+            remaining -= len(chunk)
+            yield chunk
+
+
+class MmapZipPkgReader(ZipPkgReader):
+    """
+    Implements |PhysPkgReader| interface for a zip file OPC package at a
+    filesystem path, reading member data through a read-only memory map of
+    the file rather than by a seek and read for each member. The central
+    directory is parsed once, by |ZipFile|, which also serves streams and
+    any member stored in a form not read directly from the map, such as an
+    encrypted one.
+    """
+    def __init__(self, pkg_path):
+        super(MmapZipPkgReader, self).__init__(pkg_path)
+        fileno = self._zipf.fp.fileno()
+        if not os.fstat(fileno).st_size:
+            self._zipf.close()
+            raise BadZipfile("File is not a zip file")
+        self._mmap = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+        self._data_offsets = {}
+
+    def close(self):
+        """
+        Close the zip archive and its memory map, releasing any resources
+        they are using. The map stays valid until the last view returned by
+        :meth:`view_for` is released.
+        """
+        super(MmapZipPkgReader, self).close()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # views remain, the map is released when they are
+            pass
+
+    def view_for(self, pack_uri):
+        """
+        Return a |memoryview| over the content of the member corresponding
+        to *pack_uri*. The view of a stored (uncompressed) member is a slice
+        of the memory map, no bytes are copied; a compressed member is
+        inflated into a new buffer. Unlike :meth:`blob_for`, the CRC of a
+        stored member is not checked. Raises |KeyError| if no matching
+        member is present in zip archive.
+        """
+        zinfo = self._zipf.getinfo(pack_uri.membername)
+        if zinfo.compress_type == ZIP_STORED and not self._is_encrypted(zinfo):
+            return self._data_view(zinfo)
+        return memoryview(self._read_member(zinfo.filename))
+
+    def _data_view(self, zinfo):
+        """
+        Return a |memoryview| slice of the memory map over the data of the
+        member described by *zinfo*, as stored in the archive.
+        """
+        offset = self._data_offsets.get(zinfo.filename)
+        if offset is None:
+            offset = self._data_offset(zinfo)
+            self._data_offsets[zinfo.filename] = offset
+        end = offset + zinfo.compress_size
+        if end > len(self._mmap):
+            tmpl = "truncated data for zip member '%s'"
+            raise BadZipfile(tmpl % zinfo.filename)
+        return memoryview(self._mmap)[offset:end]
+
+    def _data_offset(self, zinfo):
+        """
+        Return the offset in the archive of the data of the member described
+        by *zinfo*, just past its local file header.
+        """
+        header_offset = zinfo.header_offset
+        header = self._mmap[header_offset:header_offset + _LOCAL_HEADER_SIZE]
+        if header[:4] != _LOCAL_HEADER_SIGNATURE:
+            tmpl = "bad local file header for zip member '%s'"
+            raise BadZipfile(tmpl % zinfo.filename)
+        filename_len, extra_len = struct.unpack('<HH', header[26:30])
+        return header_offset + _LOCAL_HEADER_SIZE + filename_len + extra_len
+
+    @staticmethod
+    def _is_encrypted(zinfo):
+        return bool(zinfo.flag_bits & _ENCRYPTED_FLAG)
+
+    def _iter_raw_chunks(self, zinfo):
+        """
+        Generate the stored (compressed) data of the member described by
+        *zinfo* as a single view of the memory map.
+        """
+        yield self._data_view(zinfo)
+
+    def _read_member(self, membername):
+        """
+        Return the decompressed content of the member named *membername*,
+        copied or inflated straight from the memory map, and check its CRC.
+        """
+        zinfo = self._zipf.getinfo(membername)
+        if (self._is_encrypted(zinfo) or
+                zinfo.compress_type not in (ZIP_STORED, ZIP_DEFLATED)):
+            return self._zipf.read(membername)
+        data = self._data_view(zinfo)
+        if zinfo.compress_type == ZIP_STORED:
+            blob = data.tobytes()
+        else:
+            blob = zlib.decompress(data, -15, zinfo.file_size or 1)
+        data.release()
+        if zlib.crc32(blob) & 0xffffffff != zinfo.CRC:
+            tmpl = "bad CRC-32 for zip member '%s'"
+            raise BadZipfile(tmpl % membername)
+        return blob
+
 
 class ZipPkgWriter(object):
     """
-    Implements |PhysPkgWriter| interface for a zip file OPC package.
+    Implements |PhysPkgWriter| interface for a zip file OPC package. Each
+    member is deflated at the level *compression*, a |CompressionPolicy|,
+    gives its content type, or stored when that level is ``STORED``.
     """
-    def __init__(self, pkg_file):
+    _MODE = 'w'
+    raw_format = 'zip'
+
+    def __init__(self, pkg_file, compression=None):
         super(ZipPkgWriter, self).__init__()
-        self._zipf = ZipFile(pkg_file, 'w', compression=ZIP_DEFLATED)
+        self._zipf = ZipFile(pkg_file, self._MODE, compression=ZIP_DEFLATED)
+        if compression is None:
+            compression = CompressionPolicy()
+        self._compression = compression
 
     def close(self):
         """
@@ -87,9 +369,589 @@ class ZipPkgWriter(object):
         """
         self._zipf.close()
 
-    def write(self, pack_uri, blob):
+    def compress(self, pack_uri, blob, content_type=None):
+        """
+        Return a 2-tuple `(zinfo, raw_chunks)` containing *blob*, of
+        *content_type*, compressed into member data for *pack_uri*, in the
+        form accepted by :meth:`write_raw`. Does not touch the archive, so it
+        may be called from any thread; zlib releases the GIL while
+        compressing.
+        """
+        level = self._compression.level_for(content_type, len(blob))
+        zinfo = self._new_zinfo(pack_uri, level)
+        zinfo.file_size = len(blob)
+        zinfo.CRC = zlib.crc32(blob) & 0xffffffff
+        if level == STORED:
+            data = blob
+        else:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+            data = compressor.compress(blob) + compressor.flush()
+        zinfo.compress_size = len(data)
+        return zinfo, (data,)
+
+    def write(self, pack_uri, blob, content_type=None):
+        """
+        Write *blob*, of *content_type*, to this zip package with the
+        membername corresponding to *pack_uri*. Before Python 3.7 a member
+        that is not stored is deflated at zlib's default level.
+        """
+        level = self._compression.level_for(content_type, len(blob))
+        self._zipf.writestr(self._new_zinfo(pack_uri, level), blob)
+
+    def write_stream(self, pack_uri, chunks, content_type=None):
+        """
+        Write a member with the membername corresponding to *pack_uri*
+        containing the bytes of *content_type* generated by *chunks*,
+        compressing them as they are written so the member data is never
+        held in memory as a whole. The member is always written with ZIP64
+        extensions since its size is not known in advance. Before Python 3.7
+        a member that is not stored is deflated at zlib's default level.
+        """
+        level = self._compression.level_for(content_type)
+        zinfo = self._new_zinfo(pack_uri, level)
+        with self._zipf.open(zinfo, 'w', force_zip64=True) as member:
+            for chunk in chunks:
+                member.write(chunk)
+
+    def write_raw(self, pack_uri, src_zinfo, raw_chunks):
+        """
+        Write a member with the membername corresponding to *pack_uri* whose
+        data is generated, already compressed, by *raw_chunks*. *src_zinfo*
+        is a |ZipInfo| describing that data, such as the one returned along
+        with it by :meth:`ZipPkgReader.raw_member_for`; its compression
+        type, CRC and sizes are used for the new member.
+        """
+        zinfo = ZipInfo(pack_uri.membername, src_zinfo.date_time)
+        zinfo.compress_type = src_zinfo.compress_type
+        zinfo.flag_bits = src_zinfo.flag_bits & ~_DATA_DESCRIPTOR_FLAG
+        zinfo.external_attr = src_zinfo.external_attr or 0o600 << 16
+        zinfo.CRC = src_zinfo.CRC
+        zinfo.compress_size = src_zinfo.compress_size
+        zinfo.file_size = src_zinfo.file_size
+        zipf = self._zipf
+        with zipf._lock:
+            if zipf._seekable:
+                zipf.fp.seek(zipf.start_dir)
+            zinfo.header_offset = zipf.fp.tell()
+            zipf._writecheck(zinfo)
+            zipf._didModify = True
+            zipf.fp.write(zinfo.FileHeader())
+            offset = zipf.fp.tell()
+            for chunk in raw_chunks:
+                # chunks may be read from this same file object, e.g. when
+                # updating the package they come from, so seek back first
+                if zipf._seekable:
+                    zipf.fp.seek(offset)
+                zipf.fp.write(chunk)
+                offset += len(chunk)
+            zipf.start_dir = offset
+            zipf.filelist.append(zinfo)
+            zipf.NameToInfo[zinfo.filename] = zinfo
+
+    @staticmethod
+    def _new_zinfo(pack_uri, level):
+        """
+        Return a |ZipInfo| for a new member with the membername corresponding
+        to *pack_uri*, stored when *level* is ``STORED`` and otherwise
+        deflated at *level* where zipfile allows choosing it.
+        """
+        zinfo = ZipInfo(pack_uri.membername, time.localtime(time.time())[:6])
+        zinfo.external_attr = 0o600 << 16
+        if level == STORED:
+            zinfo.compress_type = ZIP_STORED
+        else:
+            zinfo.compress_type = ZIP_DEFLATED
+            if _ZINFO_LEVEL_SLOT is not None:
+                setattr(zinfo, _ZINFO_LEVEL_SLOT, level)
+        return zinfo
+
+
+class ZipPkgUpdater(ZipPkgWriter):
+    """
+    Implements |PhysPkgUpdater| interface for a zip file OPC package. Each
+    member written is appended after the existing members, replacing any
+    member of the same name in the central directory, which is rewritten
+    when the updater is closed. The data of replaced and removed members is
+    left in place as garbage until :meth:`compact` is called.
+    """
+    _MODE = 'a'
+
+    @property
+    def garbage_ratio(self):
+        """
+        The approximate fraction of the archive, up to its central
+        directory, occupied by the data of replaced and removed members.
+        """
+        zipf = self._zipf
+        if not zipf.start_dir:
+            return 0.0
+        with zipf._lock:
+            zinfos = sorted(zipf.filelist, key=attrgetter('header_offset'))
+            next_offsets = [z.header_offset for z in zinfos[1:]]
+            next_offsets.append(zipf.start_dir)
+            live_size = 0
+            for zinfo, next_offset in zip(zinfos, next_offsets):
+                gap = next_offset - zinfo.header_offset
+                # only read the local header when the member is not simply
+                # followed by the next one, e.g. its header extra is padded
+                if gap == self._member_span_from_central_dir(zinfo):
+                    live_size += gap
+                else:
+                    live_size += self._member_span(zinfo)
+        return max(0.0, 1.0 - float(live_size) / zipf.start_dir)
+
+    def compact(self):
+        """
+        Reclaim the space held by replaced and removed members by moving
+        each live member down over any garbage preceding it, in place. The
+        archive is truncated after its central directory when closed.
+        """
+        zipf = self._zipf
+        with zipf._lock:
+            zinfos = sorted(zipf.filelist, key=attrgetter('header_offset'))
+            offset = zinfos[0].header_offset if zinfos else zipf.start_dir
+            for zinfo in zinfos:
+                span = self._member_span(zinfo)
+                if zinfo.header_offset != offset:
+                    self._move(zinfo.header_offset, offset, span)
+                    zinfo.header_offset = offset
+                offset += span
+            zipf.start_dir = offset
+            zipf._didModify = True
+
+    def member_blob(self, pack_uri):
+        """
+        Return the blob of the existing member corresponding to *pack_uri*,
+        or |None| if the archive has no such member.
+        """
+        try:
+            return self._zipf.read(pack_uri.membername)
+        except KeyError:
+            return None
+
+    def remove(self, pack_uri):
+        """
+        Remove the member corresponding to *pack_uri* from the central
+        directory, if present. Its data remains in the archive as garbage.
+        """
+        zipf = self._zipf
+        zinfo = zipf.NameToInfo.pop(pack_uri.membername, None)
+        if zinfo is None:
+            return
+        zipf.filelist.remove(zinfo)
+        zipf._didModify = True
+
+    def retain(self, pack_uris):
+        """
+        Remove each member whose membername does not correspond to one of
+        *pack_uris*.
+        """
+        membernames = set(pack_uri.membername for pack_uri in pack_uris)
+        zipf = self._zipf
+        for zinfo in list(zipf.filelist):
+            if zinfo.filename not in membernames:
+                del zipf.NameToInfo[zinfo.filename]
+                zipf.filelist.remove(zinfo)
+                zipf._didModify = True
+
+    def write(self, pack_uri, blob, content_type=None):
+        self.remove(pack_uri)
+        super(ZipPkgUpdater, self).write(pack_uri, blob, content_type)
+
+    def write_raw(self, pack_uri, src_zinfo, raw_chunks):
+        self.remove(pack_uri)
+        super(ZipPkgUpdater, self).write_raw(pack_uri, src_zinfo, raw_chunks)
+
+    def write_stream(self, pack_uri, chunks, content_type=None):
+        self.remove(pack_uri)
+        super(ZipPkgUpdater, self).write_stream(pack_uri, chunks,
+                                                content_type)
+
+    def _member_span(self, zinfo):
+        """
+        Return the number of bytes taken in the archive by the member
+        described by *zinfo*, from its local file header to the end of its
+        data or data descriptor.
+        """
+        fp = self._zipf.fp
+        fp.seek(zinfo.header_offset)
+        header = fp.read(_LOCAL_HEADER_SIZE)
+        if header[:4] != _LOCAL_HEADER_SIGNATURE:
+            tmpl = "bad local file header for zip member '%s'"
+            raise BadZipfile(tmpl % zinfo.filename)
+        filename_len, extra_len = struct.unpack('<HH', header[26:30])
+        span = (_LOCAL_HEADER_SIZE + filename_len + extra_len +
+                zinfo.compress_size)
+        if not zinfo.flag_bits & _DATA_DESCRIPTOR_FLAG:
+            return span
+        fp.seek(zinfo.header_offset + _LOCAL_HEADER_SIZE + filename_len)
+        size_len = 8 if self._has_zip64_extra(fp.read(extra_len)) else 4
+        fp.seek(zinfo.header_offset + span)
+        if fp.read(4) == _DATA_DESCRIPTOR_SIGNATURE:
+            span += 4
+        return span + 4 + 2 * size_len
+
+    @staticmethod
+    def _member_span_from_central_dir(zinfo):
+        """
+        Return the number of bytes the member described by *zinfo* would
+        take if its local header matched its central directory entry and it
+        had no data descriptor.
+        """
+        return (_LOCAL_HEADER_SIZE + len(zinfo.orig_filename.encode('utf-8'))
+                + len(zinfo.extra) + zinfo.compress_size)
+
+    @staticmethod
+    def _has_zip64_extra(extra):
+        """
+        Return |True| if the local header *extra* field bytes contain a
+        ZIP64 extended information record.
+        """
+        while len(extra) >= 4:
+            header_id, data_len = struct.unpack('<HH', extra[:4])
+            if header_id == _ZIP64_EXTRA_ID:
+                return True
+            extra = extra[4 + data_len:]
+        return False
+
+    def _move(self, src_offset, dst_offset, length):
+        """
+        Copy *length* bytes at *src_offset* in the archive down to
+        *dst_offset*, which must not be greater than *src_offset*.
         """
-        Write *blob* to this zip package with the membername corresponding to
+        fp = self._zipf.fp
+        copied = 0
+        while copied < length:
+            fp.seek(src_offset + copied)
+            chunk = fp.read(min(length - copied, _RAW_CHUNK_SIZE))
+            if not chunk:
+                raise BadZipfile('truncated zip archive during compaction')
+            fp.seek(dst_offset + copied)
+            fp.write(chunk)
+            copied += len(chunk)
+
+
+class DirPkgReader(object):
+    """
+    Implements |PhysPkgReader| interface for an OPC package extracted into
+    the directory at *pkg_dir*, each member stored uncompressed as a file at
+    the path corresponding to its membername.
+    """
+    raw_format = None
+
+    def __init__(self, pkg_dir):
+        super(DirPkgReader, self).__init__()
+        self._pkg_dir = pkg_dir
+
+    def blob_for(self, pack_uri):
+        """
+        Return blob corresponding to *pack_uri*. Raises |KeyError| if no
+        matching member is present in the package directory.
+        """
+        return self._read_member(pack_uri.membername)
+
+    def close(self):
+        """
+        Provided for interface compatibility; no files are held open.
+        """
+        pass
+
+    @property
+    def content_types_xml(self):
+        """
+        Return the `[Content_Types].xml` blob from the package directory.
+        """
+        return self._read_member(_CONTENT_TYPES_MEMBERNAME)
+
+    def member_size(self, pack_uri):
+        """
+        Return a 2-tuple `(size, compressed_size)` of the member
+        corresponding to *pack_uri*, both the size of its file since members
+        are stored uncompressed. Raises |KeyError| if no matching member is
+        present in the package directory.
+        """
+        path = _member_path(self._pkg_dir, pack_uri.membername)
+        try:
+            size = os.path.getsize(path)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+            tmpl = "no member '%s' in package directory '%s'"
+            raise KeyError(tmpl % (pack_uri.membername, self._pkg_dir))
+        return size, size
+
+    def open_stream(self, pack_uri):
+        """
+        Return a readable file object over the member corresponding to
+        *pack_uri*. Raises |KeyError| if no matching member is present in
+        the package directory.
+        """
+        return self._open_member(pack_uri.membername)
+
+    def reads_from(self, pkg_file):
+        """
+        Return |True| if *pkg_file* is a path to this package directory.
+        """
+        return (isinstance(pkg_file, _string_types) and
+                os.path.exists(pkg_file) and
+                os.path.samefile(pkg_file, self._pkg_dir))
+
+    def rels_xml_for(self, source_uri):
+        """
+        Return rels item XML for source with *source_uri* or None if no rels
+        item is present.
+        """
+        try:
+            return self._read_member(source_uri.rels_uri.membername)
+        except KeyError:
+            return None
+
+    def _open_member(self, membername):
+        path = _member_path(self._pkg_dir, membername)
+        try:
+            return open(path, 'rb')
+        except IOError as e:
+            if e.errno != errno.ENOENT:
+                raise
+            tmpl = "no member '%s' in package directory '%s'"
+            raise KeyError(tmpl % (membername, self._pkg_dir))
+
+    def _read_member(self, membername):
+        with self._open_member(membername) as f:
+            return f.read()
+
+
+class DirPkgWriter(object):
+    """
+    Implements |PhysPkgWriter| interface for an OPC package extracted into
+    the directory at *pkg_dir*, which is created if it does not exist. A
+    directory that already exists must be empty or hold a package. The
+    members of that package not written again are removed when the writer
+    is closed; any other file in the directory is left in place. Members
+    are written uncompressed, so *compression* is ignored.
+    """
+    raw_format = None
+
+    def __init__(self, pkg_dir, compression=None):
+        super(DirPkgWriter, self).__init__()
+        if not os.path.isdir(pkg_dir):
+            os.makedirs(pkg_dir)
+        elif os.listdir(pkg_dir) and not os.path.isfile(
+                _member_path(pkg_dir, _CONTENT_TYPES_MEMBERNAME)):
+            tmpl = "directory '%s' is not empty and does not hold a package"
+            raise ValueError(tmpl % pkg_dir)
+        self._pkg_dir = pkg_dir
+        self._stale_paths = self._previous_member_paths(pkg_dir)
+        self._written_paths = set()
+
+    def close(self):
+        """
+        Remove each file of the package previously saved in the package
+        directory that was not written again by this writer, and any
+        directory that removal leaves empty.
+        """
+        pkg_dir = os.path.abspath(self._pkg_dir)
+        for path in sorted(self._stale_paths - self._written_paths):
+            if not os.path.isfile(path):
+                continue
+            os.remove(path)
+            dirpath = os.path.dirname(os.path.abspath(path))
+            while dirpath != pkg_dir and not os.listdir(dirpath):
+                os.rmdir(dirpath)
+                dirpath = os.path.dirname(dirpath)
+
+    @staticmethod
+    def compress(pack_uri, blob, content_type=None):
+        """
+        Return *blob* as member data for *pack_uri* in the form accepted by
+        :meth:`write_raw`. Members are stored uncompressed, so this is just
+        a change of form.
+        """
+        return None, (blob,)
+
+    def write(self, pack_uri, blob, content_type=None):
+        """
+        Write *blob* to the file in the package directory corresponding to
+        *pack_uri*.
+        """
+        self.write_stream(pack_uri, (blob,))
+
+    def write_raw(self, pack_uri, src_info, raw_chunks):
+        """
+        Write the member data generated by *raw_chunks*, as returned by
+        :meth:`compress`, to the file corresponding to *pack_uri*.
+        """
+        self.write_stream(pack_uri, raw_chunks)
+
+    def write_stream(self, pack_uri, chunks, content_type=None):
+        """
+        Write the bytes generated by *chunks* to the file in the package
+        directory corresponding to *pack_uri*, one chunk at a time.
+        """
+        path = _member_path(self._pkg_dir, pack_uri.membername)
+        dirname = os.path.dirname(path)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        with open(path, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+        self._written_paths.add(path)
+
+    @staticmethod
+    def _previous_member_paths(pkg_dir):
+        """
+        Return the set of paths of the files holding the members of the
+        package extracted into *pkg_dir*: its content types item, rels items
+        and the parts reachable from its package relationships. The set is
+        empty if *pkg_dir* holds no package.
+        """
+        if not os.path.isfile(_member_path(pkg_dir,
+                                           _CONTENT_TYPES_MEMBERNAME)):
+            return set()
+        # imported here as opc.pkgreader imports this module
+        from opc.pkgreader import PackageReader
+        manifest = PackageReader.inspect(pkg_dir, 'dir')
+        membernames = [_CONTENT_TYPES_MEMBERNAME,
+                       PACKAGE_URI.rels_uri.membername]
+        for part_info in manifest:
+            partname = part_info.partname
+            membernames.extend(
+                (partname.membername, partname.rels_uri.membername)
+            )
+        return set(
+            _member_path(pkg_dir, membername) for membername in membernames
+        )
+
+
+class DictPkgReader(object):
+    """
+    Implements |PhysPkgReader| interface for an OPC package held in memory
+    as the dict *members*, mapping the membername of each member, e.g.
+    ``'ppt/presentation.xml'``, to its blob.
+    """
+    raw_format = None
+
+    def __init__(self, members):
+        super(DictPkgReader, self).__init__()
+        self._members = members
+
+    def blob_for(self, pack_uri):
+        """
+        Return blob corresponding to *pack_uri*. Raises |KeyError| if no
+        matching member is present.
+        """
+        return self._members[pack_uri.membername]
+
+    def close(self):
+        """
+        Provided for interface compatibility; there is nothing to release.
+        """
+        pass
+
+    @property
+    def content_types_xml(self):
+        """
+        Return the `[Content_Types].xml` blob.
+        """
+        return self._members[_CONTENT_TYPES_MEMBERNAME]
+
+    def member_size(self, pack_uri):
+        """
+        Return a 2-tuple `(size, compressed_size)` of the member
+        corresponding to *pack_uri*, both the length of its blob. Raises
+        |KeyError| if no matching member is present.
+        """
+        size = len(self._members[pack_uri.membername])
+        return size, size
+
+    def open_stream(self, pack_uri):
+        """
+        Return a readable file-like object over the member corresponding to
         *pack_uri*.
         """
-        self._zipf.writestr(pack_uri.membername, blob)
+        return BytesIO(self.blob_for(pack_uri))
+
+    def reads_from(self, pkg_file):
+        """
+        Return |True| if *pkg_file* is the dict this reader reads from.
+        """
+        return pkg_file is self._members
+
+    def rels_xml_for(self, source_uri):
+        """
+        Return rels item XML for source with *source_uri* or None if no rels
+        item is present.
+        """
+        return self._members.get(source_uri.rels_uri.membername)
+
+
+class DictPkgWriter(object):
+    """
+    Implements |PhysPkgWriter| interface for an OPC package held in memory
+    as the dict *members*, which is cleared and then filled with the blob of
+    each member keyed by its membername. Members are held uncompressed, so
+    *compression* is ignored.
+    """
+    raw_format = None
+
+    def __init__(self, members, compression=None):
+        super(DictPkgWriter, self).__init__()
+        members.clear()
+        self._members = members
+
+    def close(self):
+        """
+        Provided for interface compatibility; there is nothing to flush.
+        """
+        pass
+
+    @staticmethod
+    def compress(pack_uri, blob, content_type=None):
+        """
+        Return *blob* as member data for *pack_uri* in the form accepted by
+        :meth:`write_raw`.
+        """
+        return None, (blob,)
+
+    def write(self, pack_uri, blob, content_type=None):
+        """
+        Store *blob* under the membername corresponding to *pack_uri*.
+        """
+        self._members[pack_uri.membername] = blob
+
+    def write_raw(self, pack_uri, src_info, raw_chunks):
+        """
+        Store the member data generated by *raw_chunks*, as returned by
+        :meth:`compress`, under the membername corresponding to *pack_uri*.
+        """
+        self.write_stream(pack_uri, raw_chunks)
+
+    def write_stream(self, pack_uri, chunks, content_type=None):
+        """
+        Store the bytes generated by *chunks* under the membername
+        corresponding to *pack_uri*.
+        """
+        self._members[pack_uri.membername] = b''.join(chunks)
+
+
+def _member_path(pkg_dir, membername):
+    """
+    Return the path of the file holding the member named *membername* in a
+    package extracted into *pkg_dir*.
+    """
+    return os.path.join(pkg_dir, *membername.split('/'))
+
+
+def _zip_pkg_reader(pkg_file):
+    if isinstance(pkg_file, _string_types):
+        return MmapZipPkgReader(pkg_file)
+    return ZipPkgReader(pkg_file)
+
+
+def _zip_pkg_writer(pkg_file, compression=None):
+    return ZipPkgWriter(pkg_file, compression)
+
+
+register_backend('zip', _zip_pkg_reader, _zip_pkg_writer)
+register_backend('dir', DirPkgReader, DirPkgWriter)
+register_backend('dict', DictPkgReader, DictPkgWriter)
@@ -12,8 +12,11 @@ Provides a low-level, read-only API to a serialized Open Packaging Convention
 (OPC) package.
 """
 
+from multiprocessing.pool import ThreadPool
+
 from opc.constants import RELATIONSHIP_TARGET_MODE as RTM
-from opc.oxml import oxml_fromstring
+from opc.graph import walk_rels_graph
+from opc.oxml import plain_fromstring, qn
 from opc.packuri import PACKAGE_URI, PackURI
 from opc.phys_pkg import PhysPkgReader
 
@@ -23,24 +26,175 @@ class PackageReader(object):
     Provides access to the contents of a zip-format OPC package via its
     :attr:`serialized_parts` and :attr:`pkg_srels` attributes.
     """
-    def __init__(self, content_types, pkg_srels, sparts):
+    def __init__(self, content_types, pkg_srels, sparts, phys_reader=None):
         super(PackageReader, self).__init__()
         self._pkg_srels = pkg_srels
         self._sparts = sparts
+        self._phys_reader = phys_reader
+        self._blob_cache = None
+        self._cache_token = object()
+
+    def blob_for(self, partname):
+        """
+        Return the blob for the part having *partname*, read on demand from
+        the physical package. Only available on a reader loaded with
+        ``lazy=True``, which keeps its physical package open until
+        :meth:`close` is called. Raises |ValueError| if the physical package
+        is not open. If this reader has a :attr:`blob_cache`, the blob is
+        served from it when cached and added to it when read.
+        """
+        blob_cache = self._blob_cache
+        if blob_cache is None:
+            return self._open_phys_reader(partname).blob_for(partname)
+        key = (self._cache_token, partname)
+        blob = blob_cache.get(key)
+        if blob is None:
+            blob = self._open_phys_reader(partname).blob_for(partname)
+            blob_cache.put(key, blob)
+        return blob
+
+    @property
+    def blob_cache(self):
+        """
+        |BlobCache| instance the blobs read by :meth:`blob_for` are cached
+        in, or |None| if they are not cached. Parts reading their blob from
+        a reader having a blob cache do not keep it, so the memory held by
+        blobs read on demand is bounded by the cache budget.
+        """
+        return self._blob_cache
+
+    @blob_cache.setter
+    def blob_cache(self, blob_cache):
+        self._blob_cache = blob_cache
+
+    @property
+    def caches_blobs(self):
+        """
+        |True| if blobs read by :meth:`blob_for` are held in a
+        :attr:`blob_cache` rather than by the parts reading them.
+        """
+        return self._blob_cache is not None
+
+    def open_stream(self, partname):
+        """
+        Return a readable file-like object over the content of the part
+        having *partname*, decompressed from the physical package as it is
+        read. Like :meth:`blob_for`, only available on a reader loaded with
+        ``lazy=True``.
+        """
+        return self._open_phys_reader(partname).open_stream(partname)
+
+    def raw_member_for(self, partname):
+        """
+        Return the raw (still compressed) physical package member for the
+        part having *partname*, in the form produced by the ``raw_member_for``
+        method of the physical package reader. Like :meth:`blob_for`, only
+        available on a reader loaded with ``lazy=True``.
+        """
+        return self._open_phys_reader(partname).raw_member_for(partname)
+
+    def close(self):
+        """
+        Close the physical package held open by a lazily loaded reader,
+        releasing any resources it is using. Has no effect when the reader
+        holds no open physical package.
+        """
+        if self._phys_reader is None:
+            return
+        self._phys_reader.close()
+        self._phys_reader = None
+        # blobs cached from the closed physical package are never served
+        # again and age out of the cache
+        self._cache_token = object()
+
+    @property
+    def raw_format(self):
+        """
+        The format of the raw members produced by :meth:`raw_member_for`,
+        e.g. ``'zip'``, or |None| if the physical package has no raw form or
+        is not open.
+        """
+        if self._phys_reader is None:
+            return None
+        return self._phys_reader.raw_format
+
+    def reads_from(self, pkg_file):
+        """
+        Return |True| if this reader holds *pkg_file* open, the package file
+        (path or file-like object) it was lazily loaded from.
+        """
+        if self._phys_reader is None:
+            return False
+        return self._phys_reader.reads_from(pkg_file)
+
+    def reopen(self, pkg_file):
+        """
+        Replace the physical package held open by this reader with one newly
+        opened on *pkg_file*, for example after that package file has been
+        updated in place. Blobs are read from the new physical package from
+        then on.
+        """
+        self.close()
+        self._phys_reader = PhysPkgReader(pkg_file)
 
     @staticmethod
-    def from_file(pkg_file):
+    def from_file(pkg_file, lazy=False, backend=None, follow=None,
+                  workers=None):
         """
         Return a |PackageReader| instance loaded with contents of *pkg_file*.
+        If *lazy* is |True|, part blobs are not read; the physical package is
+        instead kept open so each blob can be read on demand using
+        :meth:`blob_for`. *backend* names the physical package backend to
+        read with, chosen to suit *pkg_file* by default. If *follow* is not
+        |None|, it is called with the source partname, reltype and target
+        content type of each internal relationship and only relationships
+        it returns |True| for are loaded and followed, so the parts reached
+        only through the others are never read. If *workers* is a positive
+        integer and *lazy* is |False|, part blobs are read and decompressed
+        concurrently on a pool of that many threads.
         """
-        phys_reader = PhysPkgReader(pkg_file)
+        phys_reader = PhysPkgReader(pkg_file, backend)
         content_types = _ContentTypeMap.from_xml(phys_reader.content_types_xml)
-        pkg_srels = PackageReader._srels_for(phys_reader, PACKAGE_URI)
-        sparts = PackageReader._load_serialized_parts(phys_reader, pkg_srels,
-                                                      content_types)
+        follow_srel = PackageReader._follow_srel_for(follow, content_types)
+        pkg_srels = PackageReader._srels_for(phys_reader, PACKAGE_URI,
+                                             follow_srel)
+        sparts = PackageReader._load_serialized_parts(
+            phys_reader, pkg_srels, content_types, lazy, follow_srel, workers
+        )
+        if lazy:
+            return PackageReader(content_types, pkg_srels, sparts,
+                                 phys_reader)
         phys_reader.close()
         return PackageReader(content_types, pkg_srels, sparts)
 
+    @staticmethod
+    def inspect(pkg_file, backend=None):
+        """
+        Return a |PackageManifest| instance describing the parts of the
+        package in *pkg_file* and the relationships between them. Only the
+        content types item, the rels items and the member directory, such as
+        the central directory of a zip package, are read; no part blob is
+        read or decompressed. *backend* is as for :meth:`from_file`.
+        """
+        phys_reader = PhysPkgReader(pkg_file, backend)
+        try:
+            content_types = _ContentTypeMap.from_xml(
+                phys_reader.content_types_xml
+            )
+            pkg_srels = PackageReader._srels_for(phys_reader, PACKAGE_URI)
+            part_infos = []
+            part_walker = PackageReader._walk_phys_parts(phys_reader,
+                                                         pkg_srels, lazy=True)
+            for partname, _, srels in part_walker:
+                size, compressed_size = phys_reader.member_size(partname)
+                part_infos.append(PartInfo(
+                    partname, content_types[partname], size,
+                    compressed_size, srels
+                ))
+        finally:
+            phys_reader.close()
+        return PackageManifest(pkg_srels, part_infos)
+
     def iter_sparts(self):
         """
         Generate a 3-tuple `(partname, content_type, blob)` for each of the
@@ -60,15 +214,38 @@ class PackageReader(object):
             for srel in spart.srels:
                 yield (spart.partname, srel)
 
+    def _open_phys_reader(self, partname):
+        """
+        Return the open physical package reader, raising |ValueError| if
+        there is none to read the part having *partname* from.
+        """
+        if self._phys_reader is None:
+            tmpl = "no open package to read part '%s' from"
+            raise ValueError(tmpl % partname)
+        return self._phys_reader
+
     @staticmethod
-    def _load_serialized_parts(phys_reader, pkg_srels, content_types):
+    def _load_serialized_parts(phys_reader, pkg_srels, content_types,
+                               lazy=False, follow_srel=None, workers=None):
         """
         Return a list of |_SerializedPart| instances corresponding to the
         parts in *phys_reader* accessible by walking the relationship graph
-        starting with *pkg_srels*.
+        starting with *pkg_srels*. The blob of each serialized part is |None|
+        when *lazy* is |True|. Relationships are pruned by *follow_srel* as
+        described for :meth:`_srels_for`. If *workers* is a positive integer
+        and *lazy* is |False|, blobs are read after the walk on a pool of
+        that many threads.
         """
         sparts = []
-        part_walker = PackageReader._walk_phys_parts(phys_reader, pkg_srels)
+        read_in_pool = bool(workers) and not lazy
+        part_walker = PackageReader._walk_phys_parts(
+            phys_reader, pkg_srels, lazy=lazy or read_in_pool,
+            follow_srel=follow_srel
+        )
+        if read_in_pool:
+            part_walker = PackageReader._read_blobs_in_parallel(
+                phys_reader, list(part_walker), workers
+            )
         for partname, blob, srels in part_walker:
             content_type = content_types[partname]
             spart = _SerializedPart(partname, content_type, blob, srels)
@@ -76,36 +253,180 @@ class PackageReader(object):
         return tuple(sparts)
 
     @staticmethod
-    def _srels_for(phys_reader, source_uri):
+    def _read_blobs_in_parallel(phys_reader, walked_parts, workers):
+        """
+        Return a list of 3-tuples `(partname, blob, srels)`, one for each of
+        the `(partname, None, srels)` tuples in *walked_parts* and in the
+        same order, with each blob read from *phys_reader* on a pool of
+        *workers* threads. Zip inflation releases the GIL, so blobs are
+        decompressed concurrently.
+        """
+        partnames = [partname for partname, _, _ in walked_parts]
+        pool = ThreadPool(workers)
+        try:
+            blobs = pool.map(phys_reader.blob_for, partnames)
+        finally:
+            pool.terminate()
+            pool.join()
+        return [
+            (partname, blob, srels)
+            for (partname, _, srels), blob in zip(walked_parts, blobs)
+        ]
+
+    @staticmethod
+    def _follow_srel_for(follow, content_types):
+        """
+        Return a ``follow_srel(source_uri, srel)`` function calling *follow*
+        with the source partname, reltype and target content type, looked up
+        in *content_types*, of an internal relationship, or |None| if
+        *follow* is |None|.
+        """
+        if follow is None:
+            return None
+
+        def follow_srel(source_uri, srel):
+            content_type = content_types[srel.target_partname]
+            return follow(source_uri, srel.reltype, content_type)
+        return follow_srel
+
+    @staticmethod
+    def _srels_for(phys_reader, source_uri, follow_srel=None):
         """
         Return |_SerializedRelationshipCollection| instance populated with
-        relationships for source identified by *source_uri*.
+        relationships for source identified by *source_uri*. If
+        *follow_srel* is not |None|, only the external relationships and
+        those internal ones for which ``follow_srel(source_uri, srel)``
+        returns |True| are included.
         """
         rels_xml = phys_reader.rels_xml_for(source_uri)
-        return _SerializedRelationshipCollection.load_from_xml(
+        srels = _SerializedRelationshipCollection.load_from_xml(
             source_uri.baseURI, rels_xml)
+        if follow_srel is not None:
+            srels = srels.filtered(
+                lambda srel: srel.is_external or follow_srel(source_uri, srel)
+            )
+        return srels
 
     @staticmethod
-    def _walk_phys_parts(phys_reader, srels, visited_partnames=None):
+    def _walk_phys_parts(phys_reader, srels, lazy=False, follow_srel=None):
         """
         Generate a 3-tuple `(partname, blob, srels)` for each of the parts in
         *phys_reader* by walking the relationship graph rooted at srels.
+        Blobs are not read when *lazy* is |True|; |None| is generated in
+        their place. Relationships from each part are pruned by
+        *follow_srel* as described for :meth:`_srels_for`.
         """
-        if visited_partnames is None:
-            visited_partnames = []
-        for srel in srels:
-            if srel.is_external:
-                continue
+        def target_key(srel):
+            return srel.target_partname
+
+        def visit(srel):
             partname = srel.target_partname
-            if partname in visited_partnames:
-                continue
-            visited_partnames.append(partname)
-            part_srels = PackageReader._srels_for(phys_reader, partname)
-            blob = phys_reader.blob_for(partname)
-            yield (partname, blob, part_srels)
-            for partname, blob, srels in PackageReader._walk_phys_parts(
-                    phys_reader, part_srels, visited_partnames):
-                yield (partname, blob, srels)
+            part_srels = PackageReader._srels_for(phys_reader, partname,
+                                                  follow_srel)
+            blob = None if lazy else phys_reader.blob_for(partname)
+            return (partname, blob, part_srels), part_srels
+
+        return walk_rels_graph(srels, target_key, visit)
+
+
+class PackageManifest(object):
+    """
+    Read-only description of a package, as returned by
+    :meth:`PackageReader.inspect`: its relationships and the partname,
+    content type, sizes and relationships of each of its parts.
+    """
+    def __init__(self, pkg_srels, part_infos):
+        super(PackageManifest, self).__init__()
+        self._pkg_srels = pkg_srels
+        self._part_infos = tuple(part_infos)
+        self._part_infos_by_partname = dict(
+            (part_info.partname, part_info) for part_info in part_infos
+        )
+
+    def __getitem__(self, partname):
+        """
+        Return the |PartInfo| of the part having *partname*. Raises
+        |KeyError| if the package has no such part.
+        """
+        return self._part_infos_by_partname[partname]
+
+    def __iter__(self):
+        return iter(self._part_infos)
+
+    def __len__(self):
+        return len(self._part_infos)
+
+    @property
+    def compressed_size(self):
+        """
+        Total stored size in bytes of the parts in the package.
+        """
+        return sum(part_info.compressed_size for part_info in self)
+
+    @property
+    def parts(self):
+        """
+        Tuple of the |PartInfo| of each part in the package, in the order
+        they are reached by walking the relationship graph.
+        """
+        return self._part_infos
+
+    @property
+    def pkg_srels(self):
+        """
+        The serialized relationships of the package itself.
+        """
+        return self._pkg_srels
+
+    @property
+    def size(self):
+        """
+        Total uncompressed size in bytes of the parts in the package.
+        """
+        return sum(part_info.size for part_info in self)
+
+
+class PartInfo(object):
+    """
+    Value object describing a part listed in a |PackageManifest|.
+    """
+    def __init__(self, partname, content_type, size, compressed_size,
+                 srels):
+        super(PartInfo, self).__init__()
+        self._partname = partname
+        self._content_type = content_type
+        self._size = size
+        self._compressed_size = compressed_size
+        self._srels = srels
+
+    @property
+    def compressed_size(self):
+        """
+        Size in bytes of the part as stored in the package.
+        """
+        return self._compressed_size
+
+    @property
+    def content_type(self):
+        return self._content_type
+
+    @property
+    def partname(self):
+        return self._partname
+
+    @property
+    def size(self):
+        """
+        Uncompressed size in bytes of the part blob.
+        """
+        return self._size
+
+    @property
+    def srels(self):
+        """
+        The serialized relationships from this part.
+        """
+        return self._srels
 
 
 class _ContentTypeMap(object):
@@ -138,14 +459,15 @@ class _ContentTypeMap(object):
         Return a new |_ContentTypeMap| instance populated with the contents
         of *content_types_xml*.
         """
-        types_elm = oxml_fromstring(content_types_xml)
+        types_elm = plain_fromstring(content_types_xml)
         ctmap = _ContentTypeMap()
-        ctmap._overrides = dict(
-            (o.partname, o.content_type) for o in types_elm.overrides
-        )
-        ctmap._defaults = dict(
-            ('.%s' % d.extension, d.content_type) for d in types_elm.defaults
-        )
+        override_tag, default_tag = qn('ct:Override'), qn('ct:Default')
+        for elm in types_elm:
+            if elm.tag == override_tag:
+                ctmap._overrides[elm.get('PartName')] = elm.get('ContentType')
+            elif elm.tag == default_tag:
+                ext = '.%s' % elm.get('Extension')
+                ctmap._defaults[ext] = elm.get('ContentType')
         return ctmap
 
 
@@ -184,13 +506,14 @@ class _SerializedRelationship(object):
     Serialized, in this case, means any target part is referred to via its
     partname rather than a direct link to an in-memory |Part| object.
     """
-    def __init__(self, baseURI, rel_elm):
+    def __init__(self, baseURI, rId, reltype, target_ref,
+                 target_mode=RTM.INTERNAL):
         super(_SerializedRelationship, self).__init__()
         self._baseURI = baseURI
-        self._rId = rel_elm.rId
-        self._reltype = rel_elm.reltype
-        self._target_mode = rel_elm.target_mode
-        self._target_ref = rel_elm.target_ref
+        self._rId = rId
+        self._reltype = reltype
+        self._target_mode = target_mode
+        self._target_ref = target_ref
 
     @property
     def is_external(self):
@@ -260,6 +583,15 @@ class _SerializedRelationshipCollection(object):
         """Support iteration, e.g. 'for x in srels:'"""
         return self._srels.__iter__()
 
+    def filtered(self, predicate):
+        """
+        Return a new |_SerializedRelationshipCollection| containing the
+        relationships in this one for which *predicate* returns |True|.
+        """
+        srels = _SerializedRelationshipCollection()
+        srels._srels = [srel for srel in self._srels if predicate(srel)]
+        return srels
+
     @staticmethod
     def load_from_xml(baseURI, rels_item_xml):
         """
@@ -269,7 +601,11 @@ class _SerializedRelationshipCollection(object):
         """
         srels = _SerializedRelationshipCollection()
         if rels_item_xml is not None:
-            rels_elm = oxml_fromstring(rels_item_xml)
-            for rel_elm in rels_elm.Relationship:
-                srels._srels.append(_SerializedRelationship(baseURI, rel_elm))
+            rels_elm = plain_fromstring(rels_item_xml)
+            for rel_elm in rels_elm.iterchildren(qn('pr:Relationship')):
+                get = rel_elm.get
+                srels._srels.append(_SerializedRelationship(
+                    baseURI, get('Id'), get('Type'), get('Target'),
+                    get('TargetMode', RTM.INTERNAL)
+                ))
         return srels
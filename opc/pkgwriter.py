@@ -12,33 +12,168 @@ Provides a low-level, write-only API to a serialized Open Packaging
 Convention (OPC) package, essentially an implementation of OpcPackage.save()
 """
 
+from multiprocessing.pool import ThreadPool
+
 from opc.constants import CONTENT_TYPE as CT
 from opc.oxml import CT_Types, oxml_tostring
 from opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
-from opc.phys_pkg import PhysPkgWriter
+from opc.phys_pkg import PhysPkgUpdater, PhysPkgWriter
+from opc.pkgreader import _ContentTypeMap, _SerializedRelationshipCollection
 from opc.spec import default_content_types
 
 
 class PackageWriter(object):
     """
     Writes a zip-format OPC package to *pkg_file*, where *pkg_file* can be
-    either a path to a zip file (a string) or a file-like object. Its single
-    API method, :meth:`write`, is static, so this class is not intended to
-    be instantiated.
+    either a path to a zip file (a string) or a file-like object. Its API
+    methods, :meth:`write` and :meth:`update`, are static, so this class is
+    not intended to be instantiated.
     """
     @staticmethod
-    def write(pkg_file, pkg_rels, parts):
+    def update(pkg_file, pkg_rels, parts, pkg_reader, compact_threshold,
+               compression=None):
+        """
+        Update the physical package *pkg_file*, the one *pkg_reader* was
+        lazily loaded from, in place so it contains *pkg_rels* and *parts*.
+        Only items that changed are written, each appended to the archive in
+        place of its earlier version; items no longer in the package are
+        dropped. The archive is then compacted if the space held by replaced
+        and dropped items exceeds *compact_threshold*, a fraction of the
+        archive size. Items are compressed as *compression*, a
+        |CompressionPolicy|, decides or, if |None|, as the default policy
+        does.
+        """
+        phys_writer = PhysPkgUpdater(pkg_file, compression)
+        try:
+            pack_uris = [CONTENT_TYPES_URI]
+            if not PackageWriter._content_types_is_current(
+                    phys_writer, parts):
+                PackageWriter._write_content_types_stream(phys_writer, parts)
+            pack_uris.extend(PackageWriter._update_rels_item(
+                phys_writer, PACKAGE_URI, pkg_rels
+            ))
+            for part in parts:
+                PackageWriter._update_part(phys_writer, part, pkg_reader)
+                pack_uris.append(part.partname)
+                pack_uris.extend(PackageWriter._update_rels_item(
+                    phys_writer, part.partname, part._rels
+                ))
+            phys_writer.retain(pack_uris)
+            if phys_writer.garbage_ratio > compact_threshold:
+                phys_writer.compact()
+        finally:
+            phys_writer.close()
+
+    @staticmethod
+    def write(pkg_file, pkg_rels, parts, workers=None, backend=None,
+              compression=None):
         """
         Write a physical package (.pptx file) to *pkg_file* containing
         *pkg_rels* and *parts* and a content types stream based on the
-        content types of the parts.
+        content types of the parts. If *workers* is a positive integer, part
+        blobs are compressed concurrently on a pool of that many threads.
+        *backend* names the physical package backend to write with, chosen
+        to suit *pkg_file* by default, and *compression* is the
+        |CompressionPolicy| it compresses members with, the default policy
+        if |None|.
         """
-        phys_writer = PhysPkgWriter(pkg_file)
+        phys_writer = PhysPkgWriter(pkg_file, backend, compression)
         PackageWriter._write_content_types_stream(phys_writer, parts)
         PackageWriter._write_pkg_rels(phys_writer, pkg_rels)
-        PackageWriter._write_parts(phys_writer, parts)
+        PackageWriter._write_parts(phys_writer, parts, workers)
         phys_writer.close()
 
+    @staticmethod
+    def _copies_raw(phys_writer, part):
+        """
+        Return |True| if the stored member of *part* can be copied as-is to
+        the package being written by *phys_writer*, because *part* is
+        unchanged since it was lazily loaded from a package having the same
+        physical format.
+        """
+        if part.is_dirty or phys_writer.raw_format is None:
+            return False
+        return part._blob_reader.raw_format == phys_writer.raw_format
+
+    @staticmethod
+    def _content_types_is_current(phys_writer, parts):
+        """
+        Return |True| if the existing content types item in the package
+        being updated by *phys_writer* maps each of *parts* to its content
+        type and has no override for a part not among *parts*.
+        """
+        content_types_xml = phys_writer.member_blob(CONTENT_TYPES_URI)
+        if content_types_xml is None:
+            return False
+        ct_map = _ContentTypeMap.from_xml(content_types_xml)
+        partnames = set()
+        for part in parts:
+            try:
+                if ct_map[part.partname] != part.content_type:
+                    return False
+            except KeyError:
+                return False
+            partnames.add(part.partname)
+        return partnames.issuperset(ct_map._overrides)
+
+    @staticmethod
+    def _rels_is_current(rels_xml, source_uri, rels):
+        """
+        Return |True| if *rels_xml*, the existing rels item for the source
+        having *source_uri*, holds the same relationships as *rels*,
+        regardless of how they were serialized.
+        """
+        srels = _SerializedRelationshipCollection.load_from_xml(
+            source_uri.baseURI, rels_xml
+        )
+        existing = set(
+            (srel.rId, srel.reltype, srel.is_external,
+             srel.target_ref if srel.is_external else srel.target_partname)
+            for srel in srels
+        )
+        current = set(
+            (rel.rId, rel.reltype, rel.is_external,
+             rel.target_ref if rel.is_external else rel.target_part.partname)
+            for rel in rels
+        )
+        return existing == current
+
+    @staticmethod
+    def _update_part(phys_writer, part, pkg_reader):
+        """
+        Write *part* to the package being updated by *phys_writer* unless it
+        is unchanged since being loaded by *pkg_reader* from that package.
+        """
+        if not part.is_dirty and part._blob_reader is pkg_reader and (
+                part._src_partname == part.partname):
+            return
+        if PackageWriter._copies_raw(phys_writer, part):
+            raw_member = part._blob_reader.raw_member_for(part._src_partname)
+            phys_writer.write_raw(part.partname, *raw_member)
+        elif part.is_streamed:
+            phys_writer.write_stream(part.partname, part.iter_chunks(),
+                                     part.content_type)
+        else:
+            phys_writer.write(part.partname, part.blob, part.content_type)
+
+    @staticmethod
+    def _update_rels_item(phys_writer, source_uri, rels):
+        """
+        Write the rels item for *rels*, the relationships of the source
+        having *source_uri*, to the package being updated by *phys_writer*
+        unless its existing rels item already holds them. Return a list
+        containing the pack URI of the rels item, or an empty list when
+        *rels* is empty and so no rels item belongs in the package.
+        """
+        if not len(rels):
+            return []
+        rels_uri = source_uri.rels_uri
+        rels_xml = phys_writer.member_blob(rels_uri)
+        if rels_xml is None or not PackageWriter._rels_is_current(
+                rels_xml, source_uri, rels):
+            phys_writer.write(rels_uri, rels.xml, CT.OPC_RELATIONSHIPS)
+        return [rels_uri]
+
     @staticmethod
     def _write_content_types_stream(phys_writer, parts):
         """
@@ -48,15 +183,85 @@ class PackageWriter(object):
         phys_writer.write(CONTENT_TYPES_URI, _ContentTypesItem.xml_for(parts))
 
     @staticmethod
-    def _write_parts(phys_writer, parts):
+    def _write_parts(phys_writer, parts, workers=None):
         """
         Write the blob of each part in *parts* to the package, along with a
-        rels item for its relationships if and only if it has any.
+        rels item for its relationships if and only if it has any. The
+        compressed member of a part unchanged since it was lazily loaded from
+        a package of the same physical format is copied as-is from the
+        source package, avoiding a decompress and
+        recompress of its blob. The content of a streamed part is written
+        chunk by chunk.
         """
+        if workers:
+            return PackageWriter._write_parts_in_parallel(phys_writer, parts,
+                                                          workers)
         for part in parts:
-            phys_writer.write(part.partname, part.blob)
+            if PackageWriter._copies_raw(phys_writer, part):
+                raw_member = part._blob_reader.raw_member_for(
+                    part._src_partname)
+                phys_writer.write_raw(part.partname, *raw_member)
+            elif part.is_streamed:
+                phys_writer.write_stream(part.partname, part.iter_chunks(),
+                                         part.content_type)
+            else:
+                phys_writer.write(part.partname, part.blob,
+                                  part.content_type)
             if len(part._rels):
-                phys_writer.write(part.partname.rels_uri, part._rels.xml)
+                phys_writer.write(part.partname.rels_uri, part._rels.xml,
+                                  CT.OPC_RELATIONSHIPS)
+
+    @staticmethod
+    def _write_parts_in_parallel(phys_writer, parts, workers):
+        """
+        Write *parts* to the package as :meth:`_write_parts` does, but
+        compress blobs and rels items on a pool of *workers* threads and
+        write the precompressed members in their original order. Blobs are
+        obtained on the calling thread since part classes may generate them.
+        Streamed parts are not held in memory to be compressed in a worker;
+        they are streamed on the calling thread when their turn comes.
+        """
+        # each member is a 4-tuple (pack_uri, blob, content_type, raw_member)
+        # where blob is None for a raw member copied from the source package,
+        # and both are None for a streamed part, written in its turn from
+        # streamed_parts
+        members, streamed_parts = [], {}
+        for part in parts:
+            if PackageWriter._copies_raw(phys_writer, part):
+                raw_member = part._blob_reader.raw_member_for(
+                    part._src_partname)
+                members.append((part.partname, None, None, raw_member))
+            elif part.is_streamed:
+                streamed_parts[part.partname] = part
+                members.append((part.partname, None, None, None))
+            else:
+                members.append(
+                    (part.partname, part.blob, part.content_type, None)
+                )
+            if len(part._rels):
+                members.append((part.partname.rels_uri, part._rels.xml,
+                                CT.OPC_RELATIONSHIPS, None))
+
+        def compress(member):
+            pack_uri, blob, content_type, raw_member = member
+            if blob is None:
+                return raw_member
+            return phys_writer.compress(pack_uri, blob, content_type)
+
+        pool = ThreadPool(workers)
+        try:
+            raw_members = pool.imap(compress, members)
+            for member, raw_member in zip(members, raw_members):
+                pack_uri = member[0]
+                if raw_member is None:
+                    part = streamed_parts[pack_uri]
+                    phys_writer.write_stream(pack_uri, part.iter_chunks(),
+                                             part.content_type)
+                    continue
+                phys_writer.write_raw(pack_uri, *raw_member)
+        finally:
+            pool.terminate()
+            pool.join()
 
     @staticmethod
     def _write_pkg_rels(phys_writer, pkg_rels):
@@ -64,7 +269,8 @@ class PackageWriter(object):
         Write the XML rels item for *pkg_rels* ('/_rels/.rels') to the
         package.
         """
-        phys_writer.write(PACKAGE_URI.rels_uri, pkg_rels.xml)
+        phys_writer.write(PACKAGE_URI.rels_uri, pkg_rels.xml,
+                          CT.OPC_RELATIONSHIPS)
 
 
 class _ContentTypesItem(object):
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+#
+# test_aio.py
+#
+# Copyright (C) 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-opc and is released under the MIT License:
+# http://www.opensource.org/licenses/mit-license.php
+
+"""Test suite for opc.aio module."""
+
+import asyncio
+
+from io import BytesIO
+from tempfile import SpooledTemporaryFile
+
+import pytest
+
+from mock import patch
+
+from opc.aio import _spool_source
+from opc.package import OpcPackage
+
+from .unitutil import abspath
+
+
+test_pptx_path = abspath('test_files/test.pptx')
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def blobs_of(pkg):
+    return sorted((part.partname, part.blob) for part in pkg.parts)
+
+
+class _AsyncSource(object):
+    """
+    Async byte stream source reading *data* a few bytes at a time.
+    """
+    def __init__(self, data):
+        self._stream = BytesIO(data)
+
+    async def read(self, size=-1):
+        await asyncio.sleep(0)
+        return self._stream.read(min(size, 4096))
+
+
+class _FailingSource(_AsyncSource):
+    """
+    Async byte stream source raising |IOError| once *data* is read.
+    """
+    async def read(self, size=-1):
+        chunk = await super(_FailingSource, self).read(size)
+        if not chunk:
+            raise IOError('connection reset')
+        return chunk
+
+
+class _AsyncSink(object):
+    """
+    Async byte stream sink accumulating what is written to it.
+    """
+    def __init__(self):
+        self.chunks = []
+
+    async def write(self, data):
+        await asyncio.sleep(0)
+        self.chunks.append(data)
+
+
+class _DrainedSink(object):
+    """
+    Byte stream sink with the write()/drain() interface of a StreamWriter.
+    """
+    def __init__(self):
+        self.chunks = []
+        self.drains = 0
+
+    def write(self, data):
+        self.chunks.append(data)
+
+    async def drain(self):
+        self.drains += 1
+
+
+class DescribeOpenAsync(object):
+
+    @pytest.fixture
+    def expected_blobs(self):
+        return blobs_of(OpcPackage.open(test_pptx_path))
+
+    @pytest.fixture
+    def pptx_bytes(self):
+        with open(test_pptx_path, 'rb') as f:
+            return f.read()
+
+    @pytest.fixture
+    def spools(self, request):
+        spools = []
+
+        async def spool_source(loop, executor, source):
+            spool = await _spool_source(loop, executor, source)
+            spools.append(spool)
+            return spool
+
+        _patch = patch('opc.aio._spool_source', spool_source)
+        request.addfinalizer(_patch.stop)
+        _patch.start()
+        return spools
+
+    def it_can_open_a_pkg_file_path(self, expected_blobs):
+        pkg = run(OpcPackage.open_async(test_pptx_path))
+        assert blobs_of(pkg) == expected_blobs
+
+    def it_can_open_an_async_byte_stream(self, pptx_bytes, expected_blobs):
+        pkg = run(OpcPackage.open_async(_AsyncSource(pptx_bytes)))
+        assert blobs_of(pkg) == expected_blobs
+
+    def it_can_open_an_async_iterable_of_chunks(self, pptx_bytes,
+                                                expected_blobs):
+        async def chunks():
+            for idx in range(0, len(pptx_bytes), 1000):
+                yield pptx_bytes[idx:idx+1000]
+
+        pkg = run(OpcPackage.open_async(chunks(), lazy=True))
+        assert blobs_of(pkg) == expected_blobs
+        pkg.close()
+
+    def it_closes_the_spool_once_the_package_is_loaded(self, pptx_bytes,
+                                                       spools):
+        run(OpcPackage.open_async(_AsyncSource(pptx_bytes)))
+        assert [spool.closed for spool in spools] == [True]
+
+    def it_closes_the_spool_of_a_lazy_package_when_closed(
+            self, pptx_bytes, expected_blobs, spools):
+        pkg = run(OpcPackage.open_async(_AsyncSource(pptx_bytes), lazy=True))
+        assert [spool.closed for spool in spools] == [False]
+        assert blobs_of(pkg) == expected_blobs
+        pkg.close()
+        assert [spool.closed for spool in spools] == [True]
+
+    def it_closes_the_spool_when_reading_the_source_fails(self, pptx_bytes):
+        # mockery ----------------------
+        spools = []
+
+        def spooled_file(max_size):
+            spool = SpooledTemporaryFile(max_size)
+            spools.append(spool)
+            return spool
+        # exercise ---------------------
+        with patch('opc.aio.SpooledTemporaryFile', spooled_file):
+            with pytest.raises(IOError):
+                run(OpcPackage.open_async(_FailingSource(pptx_bytes)))
+        # verify -----------------------
+        assert [spool.closed for spool in spools] == [True]
+
+    def it_can_open_a_stream_reader(self, pptx_bytes, expected_blobs):
+        async def open_from_stream_reader():
+            reader = asyncio.StreamReader()
+            reader.feed_data(pptx_bytes)
+            reader.feed_eof()
+            return await OpcPackage.open_async(reader)
+
+        pkg = run(open_from_stream_reader())
+        assert blobs_of(pkg) == expected_blobs
+
+
+class DescribeSaveAsync(object):
+
+    @pytest.fixture
+    def pkg(self):
+        return OpcPackage.open(test_pptx_path)
+
+    def it_can_save_to_a_pkg_file_path(self, pkg, tmpdir):
+        pkg_path = str(tmpdir.join('saved.pptx'))
+        run(pkg.save_async(pkg_path, workers=2))
+        assert blobs_of(OpcPackage.open(pkg_path)) == blobs_of(pkg)
+
+    def it_can_save_to_an_async_byte_stream(self, pkg):
+        sink = _AsyncSink()
+        run(pkg.save_async(sink))
+        saved = OpcPackage.open(BytesIO(b''.join(sink.chunks)))
+        assert blobs_of(saved) == blobs_of(pkg)
+
+    def it_drains_a_stream_writer_after_each_chunk(self, pkg):
+        sink = _DrainedSink()
+        run(pkg.save_async(sink))
+        saved = OpcPackage.open(BytesIO(b''.join(sink.chunks)))
+        assert blobs_of(saved) == blobs_of(pkg)
+        assert sink.drains == len(sink.chunks)
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+#
+# test_batch.py
+#
+# Copyright (C) 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-opc and is released under the MIT License:
+# http://www.opensource.org/licenses/mit-license.php
+
+"""Test suite for opc.batch module."""
+
+import pytest
+
+from mock import Mock, patch
+
+from opc.batch import (
+    _init_worker, _process_package, _worker_settings, BatchResult,
+    process_packages
+)
+from opc.constants import CONTENT_TYPE as CT
+from opc.package import OpcPackage, PartFactory
+
+from .unitutil import abspath
+
+
+test_pptx_path = abspath('test_files/test.pptx')
+
+
+def count_parts(pkg):
+    return len(list(pkg.parts))
+
+
+def make_callback(pkg):
+    return lambda: count_parts(pkg)
+
+
+def stamp_app_props(pkg):
+    app_props = pkg.part_for('/docProps/app.xml')
+    app_props.blob = app_props.blob.replace(b'<TotalTime>4</TotalTime>',
+                                            b'<TotalTime>42</TotalTime>')
+    return len(app_props.blob)
+
+
+class DescribeProcessPackages(object):
+
+    @pytest.fixture
+    def Pool_(self, request):
+        _patch = patch('opc.batch.Pool')
+        request.addfinalizer(_patch.stop)
+        return _patch.start()
+
+    def it_reports_a_result_for_each_package_in_order(self):
+        sources = [test_pptx_path, abspath('test_files/missing.pptx'),
+                   test_pptx_path]
+        results = list(process_packages(sources, count_parts, processes=2))
+        expected_count = count_parts(OpcPackage.open(test_pptx_path))
+        assert [r.source for r in results] == sources
+        assert [r.ok for r in results] == [True, False, True]
+        assert [r.value for r in results] == [expected_count, None,
+                                              expected_count]
+        assert 'missing.pptx' in results[1].error
+        assert all(r.elapsed > 0 for r in results)
+
+    def it_reports_an_unpicklable_value_without_stopping(self):
+        sources = [test_pptx_path, test_pptx_path]
+        results = list(process_packages(sources, make_callback,
+                                        processes=1))
+        assert [r.ok for r in results] == [False, False]
+
+    def it_saves_each_transformed_package_to_its_target(self, tmpdir):
+        target = str(tmpdir.join('saved.pptx'))
+        jobs = [(test_pptx_path, target)]
+        results = list(process_packages(jobs, stamp_app_props, processes=1))
+        assert results[0].target == target
+        app_props = OpcPackage.open(target).part_for('/docProps/app.xml')
+        assert b'<TotalTime>42</TotalTime>' in app_props.blob
+        assert results[0].value == len(app_props.blob)
+
+    def it_bounds_the_jobs_in_flight(self, Pool_):
+        # mockery ----------------------
+        pool = Pool_.return_value
+        submitted = []
+
+        def apply_async(func, args):
+            async_result = Mock(name='async_result')
+            async_result.get.return_value = args[0]
+            submitted.append(args[0])
+            return async_result
+        pool.apply_async.side_effect = apply_async
+        # exercise ---------------------
+        results = process_packages(iter(range(10)), processes=2,
+                                   max_in_flight=3)
+        first = next(results)
+        # verify -----------------------
+        assert first == 0
+        assert submitted == [0, 1, 2]
+        assert list(results) == list(range(1, 10))
+        pool.close.assert_called_once_with()
+        pool.join.assert_called_once_with()
+
+    def it_sets_up_each_worker_with_the_part_type_registry(self, Pool_):
+        PartFactory.part_type_for[CT.PML_SLIDE] = OpcPackage
+        try:
+            list(process_packages([], count_parts, processes=2))
+        finally:
+            del PartFactory.part_type_for[CT.PML_SLIDE]
+        Pool_.assert_called_once_with(2, _init_worker, (
+            {'transform': count_parts, 'lazy': False, 'compression': None},
+            {CT.PML_SLIDE: OpcPackage}, None, ()
+        ))
+
+
+class Describe_init_worker(object):
+
+    def it_registers_part_types_and_calls_the_initializer(self):
+        initializer = Mock(name='initializer')
+        settings = {'transform': None, 'lazy': True, 'compression': None}
+        try:
+            _init_worker(settings, {CT.PML_SLIDE: OpcPackage}, initializer,
+                         ('foo', 42))
+            assert PartFactory.part_type_for[CT.PML_SLIDE] is OpcPackage
+            assert _worker_settings == settings
+        finally:
+            del PartFactory.part_type_for[CT.PML_SLIDE]
+            _worker_settings.clear()
+        initializer.assert_called_once_with('foo', 42)
+
+
+class Describe_process_package(object):
+
+    @pytest.fixture
+    def worker_settings(self, request):
+        _worker_settings.update(
+            {'transform': count_parts, 'lazy': False, 'compression': None}
+        )
+        request.addfinalizer(_worker_settings.clear)
+        return _worker_settings
+
+    def it_opens_and_transforms_a_package(self, worker_settings):
+        result = _process_package(test_pptx_path, None)
+        assert isinstance(result, BatchResult)
+        assert result.ok is True
+        assert result.value == count_parts(OpcPackage.open(test_pptx_path))
+
+    def it_reports_the_traceback_of_a_failure(self, worker_settings):
+        worker_settings['transform'] = Mock(side_effect=ValueError('boom'))
+        result = _process_package(test_pptx_path, None)
+        assert result.ok is False
+        assert result.value is None
+        assert 'ValueError: boom' in result.error
+
+    def it_reports_an_unpicklable_value_as_a_failure(self, worker_settings):
+        worker_settings['transform'] = make_callback
+        result = _process_package(test_pptx_path, None)
+        assert result.ok is False
+        assert result.value is None
+        assert 'pickle' in result.error.lower()
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+#
+# test_cache.py
+#
+# Copyright (C) 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-opc and is released under the MIT License:
+# http://www.opensource.org/licenses/mit-license.php
+
+"""Test suite for opc.cache module."""
+
+from opc.cache import BlobCache, LRUCache
+
+
+class DescribeLRUCache(object):
+
+    def it_returns_a_cached_value(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        assert cache.get('a') == 1
+        assert 'a' in cache
+
+    def it_returns_default_for_a_missing_key(self):
+        cache = LRUCache(2)
+        assert cache.get('a') is None
+        assert cache.get('a', 42) == 42
+
+    def it_discards_the_least_recently_used_item_when_full(self):
+        # setup ------------------------
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        # exercise ---------------------
+        cache.get('a')
+        cache.put('c', 3)
+        # verify -----------------------
+        assert len(cache) == 2
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert 'c' in cache
+
+    def it_can_set_a_value_only_if_missing(self):
+        cache = LRUCache(2)
+        assert cache.setdefault('a', 1) == 1
+        assert cache.setdefault('a', 2) == 1
+        assert cache.get('a') == 1
+
+    def it_can_be_cleared(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.clear()
+        assert len(cache) == 0
+
+
+class DescribeBlobCache(object):
+
+    def it_returns_a_cached_blob_and_counts_hits_and_misses(self):
+        cache = BlobCache(10)
+        assert cache.get('a') is None
+        cache.put('a', b'foo')
+        assert cache.get('a') == b'foo'
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert cache.size == 3
+
+    def it_evicts_least_recently_used_blobs_to_stay_within_budget(self):
+        # setup ------------------------
+        cache = BlobCache(10)
+        cache.put('a', b'aaaa')
+        cache.put('b', b'bbbb')
+        # exercise ---------------------
+        cache.get('a')
+        cache.put('c', b'cccc')
+        # verify -----------------------
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert 'c' in cache
+        assert cache.size == 8
+        assert cache.evictions == 1
+
+    def it_does_not_cache_a_blob_larger_than_its_budget(self):
+        cache = BlobCache(10)
+        cache.put('a', b'aaaa')
+        cache.put('b', b'b' * 11)
+        assert 'b' not in cache
+        assert 'a' in cache
+        assert cache.evictions == 0
+
+    def it_accounts_for_a_replaced_blob(self):
+        cache = BlobCache(10)
+        cache.put('a', b'aaaa')
+        cache.put('a', b'aa')
+        assert len(cache) == 1
+        assert cache.size == 2
+
+    def it_can_be_cleared(self):
+        cache = BlobCache(10)
+        cache.put('a', b'aaaa')
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.size == 0
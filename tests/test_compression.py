@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+#
+# test_compression.py
+#
+# Copyright (C) 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-opc and is released under the MIT License:
+# http://www.opensource.org/licenses/mit-license.php
+
+"""Test suite for opc.compression module."""
+
+import zlib
+
+from opc.compression import CompressionPolicy, LARGE_XML_SIZE, STORED
+from opc.constants import CONTENT_TYPE as CT
+
+
+class DescribeCompressionPolicy(object):
+
+    def it_stores_compressed_media_by_default(self):
+        policy = CompressionPolicy()
+        for content_type in (CT.JPEG, CT.PNG, CT.GIF, CT.MP4):
+            assert policy.level_for(content_type, 1024) == STORED
+
+    def it_uses_the_default_level_for_other_content(self):
+        policy = CompressionPolicy()
+        assert policy.level_for(CT.PML_SLIDE, 1024) == (
+            zlib.Z_DEFAULT_COMPRESSION)
+        assert policy.level_for(CT.X_EMF, 1024) == zlib.Z_DEFAULT_COMPRESSION
+        assert policy.level_for(None) == zlib.Z_DEFAULT_COMPRESSION
+
+    def it_uses_a_fast_level_for_large_xml(self):
+        policy = CompressionPolicy(large_xml_level=2)
+        assert policy.level_for(CT.SML_WORKSHEET, LARGE_XML_SIZE) == 2
+        assert policy.level_for(CT.XML, LARGE_XML_SIZE) == 2
+        assert policy.level_for(CT.SML_WORKSHEET, LARGE_XML_SIZE - 1) == (
+            zlib.Z_DEFAULT_COMPRESSION)
+        assert policy.level_for(CT.SML_WORKSHEET) == (
+            zlib.Z_DEFAULT_COMPRESSION)
+        assert policy.level_for(CT.TIFF, LARGE_XML_SIZE) == (
+            zlib.Z_DEFAULT_COMPRESSION)
+
+    def it_can_override_the_level_per_content_type(self):
+        policy = CompressionPolicy(
+            levels={CT.PNG: 9, CT.SML_WORKSHEET: 3}, default_level=STORED
+        )
+        assert policy.level_for(CT.PNG, 1024) == 9
+        assert policy.level_for(CT.SML_WORKSHEET, LARGE_XML_SIZE) == 3
+        assert policy.level_for(CT.JPEG, 1024) == STORED
+        assert policy.level_for(CT.PML_SLIDE, 1024) == STORED
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+#
+# test_graph.py
+#
+# Copyright (C) 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-opc and is released under the MIT License:
+# http://www.opensource.org/licenses/mit-license.php
+
+"""Test suite for opc.graph module."""
+
+import sys
+
+from mock import Mock
+
+from opc.graph import walk_rels_graph
+
+
+def _walk(rels_of, root_rels):
+    """
+    Return list of target names generated by walking the graph described by
+    *rels_of*, a dict of target name to the rels from that target.
+    """
+    def target_key(rel):
+        return rel.target
+
+    def visit(rel):
+        return rel.target, rels_of[rel.target]
+
+    return list(walk_rels_graph(root_rels, target_key, visit))
+
+
+def _rel(target, is_external=False):
+    return Mock(name='rel_%s' % target, target=target,
+                is_external=is_external)
+
+
+class DescribeWalkRelsGraph(object):
+
+    def it_generates_targets_in_depth_first_preorder(self):
+        # root -> a -> c
+        #      -> b -> c, a
+        rels_of = {
+            'a': [_rel('c')],
+            'b': [_rel('c'), _rel('a')],
+            'c': [],
+        }
+        root_rels = [_rel('a'), _rel('b')]
+        assert _walk(rels_of, root_rels) == ['a', 'c', 'b']
+
+    def it_visits_each_target_once_in_a_cycle(self):
+        rels_of = {'a': [_rel('b')], 'b': [_rel('a')]}
+        visit = Mock(side_effect=lambda rel: (rel.target,
+                                              rels_of[rel.target]))
+        items = list(walk_rels_graph([_rel('a')], lambda r: r.target, visit))
+        assert items == ['a', 'b']
+        assert visit.call_count == 2
+
+    def it_skips_external_rels(self):
+        rels_of = {'a': [_rel('http://x', is_external=True)]}
+        root_rels = [_rel('http://y', is_external=True), _rel('a')]
+        assert _walk(rels_of, root_rels) == ['a']
+
+    def it_can_walk_a_chain_deeper_than_the_recursion_limit(self):
+        depth = sys.getrecursionlimit() * 2
+        rels_of = dict((n, [_rel(n + 1)]) for n in range(depth))
+        rels_of[depth] = []
+        assert _walk(rels_of, [_rel(0)]) == list(range(depth + 1))
@@ -98,6 +98,14 @@ class DescribeCT_Relationships(object):
                                    pretty_print=True)
         assert actual_xml == expected_rels_xml
 
+    def it_adds_rels_as_custom_element_instances(self):
+        rels = CT_Relationships.new()
+        rels.add_rel('rId1', 'http://reltype1', 'docProps/core.xml')
+        rel = rels.Relationship[0]
+        assert isinstance(rel, CT_Relationship)
+        assert rel.rId == 'rId1'
+        assert rel.target_ref == 'docProps/core.xml'
+
     def it_can_generate_rels_file_xml(self):
         expected_xml = (
             '<?xml version=\'1.0\' encoding=\'UTF-8\' standalone=\'yes\'?>\n'
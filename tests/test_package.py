@@ -10,18 +10,35 @@
 """Test suite for opc.package module."""
 
 import pytest
+import threading
+import time
+
+from io import BytesIO
 
 from mock import call, Mock, patch, PropertyMock
 
+from opc.cache import BlobCache
 from opc.constants import CONTENT_TYPE as CT
 from opc.oxml import CT_Relationships
 from opc.package import (
-    OpcPackage, Part, PartFactory, _Relationship, RelationshipCollection,
-    Unmarshaller
+    OpcPackage, PackageCache, Part, PartFactory, _Relationship,
+    RelationshipCollection, StreamPart, Unmarshaller
 )
 from opc.packuri import PACKAGE_URI, PackURI
+from opc.pkgreader import PackageReader
+
+from .unitutil import abspath, class_mock, method_mock
+
+
+test_pptx_path = abspath('test_files/test.pptx')
+
+
+def blobs_of(pkg):
+    return sorted((part.partname, part.blob) for part in pkg.parts)
 
-from .unitutil import class_mock, method_mock
+
+def rels_of(source):
+    return [(r.rId, r.reltype, r.target_ref) for r in source.rels]
 
 
 @pytest.fixture
@@ -65,10 +82,152 @@ class DescribeOpcPackage(object):
         # exercise ---------------------
         pkg = OpcPackage.open(pkg_file)
         # verify -----------------------
-        PackageReader_.from_file.assert_called_once_with(pkg_file)
+        PackageReader_.from_file.assert_called_once_with(pkg_file, False,
+                                                         None, None, None)
         Unmarshaller_.unmarshal.assert_called_once_with(pkg_reader, pkg,
-                                                        PartFactory_)
+                                                        PartFactory_, None)
         assert isinstance(pkg, OpcPackage)
+        assert pkg._pkg_reader is None
+        assert pkg.is_partial is False
+
+    def it_can_open_a_pkg_file_lazily(self, PackageReader_, PartFactory_,
+                                      Unmarshaller_):
+        pkg_file = Mock(name='pkg_file')
+        pkg_reader = PackageReader_.from_file.return_value
+        pkg = OpcPackage.open(pkg_file, lazy=True)
+        PackageReader_.from_file.assert_called_once_with(pkg_file, True,
+                                                         None, None, None)
+        assert pkg._pkg_reader is pkg_reader
+        assert pkg_reader.blob_cache is None
+
+    def it_can_open_a_pkg_file_lazily_with_a_blob_cache(self):
+        blob_cache = BlobCache(64 * 1024)
+        with OpcPackage.open(test_pptx_path, lazy=True,
+                             blob_cache=blob_cache) as pkg:
+            theme = pkg.part_for('/ppt/theme/theme1.xml')
+            blob = theme.blob
+            assert theme.blob == blob
+        assert blob_cache.misses == 1
+        assert blob_cache.hits == 1
+        assert blob_cache.size == len(blob)
+
+    def it_cannot_read_any_blob_once_closed_with_a_blob_cache(self):
+        blob_cache = BlobCache(64 * 1024)
+        pkg = OpcPackage.open(test_pptx_path, lazy=True,
+                              blob_cache=blob_cache)
+        theme = pkg.part_for('/ppt/theme/theme1.xml')
+        theme.blob
+        pkg.close()
+        with pytest.raises(ValueError):
+            theme.blob
+
+    def it_can_open_a_pkg_file_on_a_pool_of_threads(
+            self, PackageReader_, PartFactory_, Unmarshaller_):
+        pkg_file = Mock(name='pkg_file')
+        pkg_reader = PackageReader_.from_file.return_value
+        pkg = OpcPackage.open(pkg_file, workers=4)
+        PackageReader_.from_file.assert_called_once_with(pkg_file, False,
+                                                         None, None, 4)
+        Unmarshaller_.unmarshal.assert_called_once_with(pkg_reader, pkg,
+                                                        PartFactory_, 4)
+
+    def it_can_clone_itself(self):
+        # setup ------------------------
+        pkg = OpcPackage.open(test_pptx_path)
+        # exercise ---------------------
+        clone = pkg.clone()
+        # verify -----------------------
+        assert blobs_of(clone) == blobs_of(pkg)
+        assert rels_of(clone) == rels_of(pkg)
+        for part, part_clone in zip(pkg.parts, clone.parts):
+            assert part_clone is not part
+            assert part_clone.partname is part.partname
+            assert part_clone.blob is part.blob
+            assert rels_of(part_clone) == rels_of(part)
+            for rel in part_clone.rels:
+                assert rel.is_external or rel.target_part in clone.parts
+        assert clone.is_partial is False
+
+    def it_clones_independently_of_the_original(self):
+        pkg = OpcPackage.open(test_pptx_path)
+        clone = pkg.clone()
+        app_props = clone.part_for('/docProps/app.xml')
+        original_blob = app_props.blob
+        app_props.blob = b'<foo/>'
+        clone.rels.add_relationship('http://rt', app_props, 'rId99')
+        assert pkg.part_for('/docProps/app.xml').blob == original_blob
+        assert len(pkg.rels) == len(clone.rels) - 1
+
+    def it_can_clone_a_lazily_loaded_package(self, tmpdir):
+        with OpcPackage.open(test_pptx_path, lazy=True) as pkg:
+            clone = pkg.clone()
+            clone.save(str(tmpdir.join('clone.pptx')))
+            expected_blobs = blobs_of(pkg)
+        saved = OpcPackage.open(str(tmpdir.join('clone.pptx')))
+        assert blobs_of(saved) == expected_blobs
+
+    def it_reloads_parts_of_custom_part_classes_when_cloning(self):
+        # setup ------------------------
+        class _StatefulPart(Part):
+            @classmethod
+            def load(cls, partname, content_type, blob):
+                part = cls(partname, content_type, blob)
+                part.words = blob.split()
+                part.rel_count = None
+                return part
+
+            def _after_unmarshal(self):
+                self.rel_count = len(self.rels)
+
+            @property
+            def blob(self):
+                return b' '.join(self.words)
+
+        PartFactory.part_type_for[CT.PML_SLIDE] = _StatefulPart
+        try:
+            pkg = OpcPackage.open(test_pptx_path)
+        finally:
+            del PartFactory.part_type_for[CT.PML_SLIDE]
+        slide = pkg.part_for('/ppt/slides/slide1.xml')
+        # exercise ---------------------
+        clone = pkg.clone()
+        # verify -----------------------
+        slide_clone = clone.part_for('/ppt/slides/slide1.xml')
+        assert type(slide_clone) is _StatefulPart
+        assert slide_clone.words == slide.words
+        assert slide_clone.words is not slide.words
+        assert slide_clone.rel_count == len(slide.rels)
+        slide_clone.words.append(b'<extra/>')
+        assert slide.words[-1] != b'<extra/>'
+
+    def it_raises_on_clone_of_a_custom_part_it_cannot_reload(self):
+        class _UnloadablePart(Part):
+            pass
+
+        pkg = OpcPackage()
+        part = _UnloadablePart(PackURI('/part/name.xml'), 'app/xml', b'<a/>')
+        pkg._add_relationship('http://rt', part, 'rId1')
+        with pytest.raises(ValueError):
+            pkg.clone()
+
+    def it_carries_partiality_to_a_clone(self):
+        pkg = OpcPackage()
+        pkg._is_partial = True
+        assert pkg.clone().is_partial is True
+
+    def it_closes_its_pkg_reader_on_close(self):
+        pkg = OpcPackage()
+        pkg._pkg_reader = pkg_reader = Mock(name='pkg_reader')
+        pkg.close()
+        pkg_reader.close.assert_called_once_with()
+        assert pkg._pkg_reader is None
+        pkg.close()
+
+    def it_closes_on_exit_when_used_as_a_context_manager(self):
+        pkg_reader = Mock(name='pkg_reader')
+        with OpcPackage() as pkg:
+            pkg._pkg_reader = pkg_reader
+        pkg_reader.close.assert_called_once_with()
 
     def it_initializes_its_rels_collection_on_construction(
             self, RelationshipCollection_):
@@ -97,6 +256,46 @@ class DescribeOpcPackage(object):
         with patch.object(OpcPackage, '_walk_parts', return_value=parts):
             assert pkg.parts == (parts[0], parts[1])
 
+    def it_caches_its_parts_until_a_relationship_changes(self):
+        parts = [Part(PackURI('/part/name%d.xml' % n), None, None)
+                 for n in (1, 2)]
+        pkg = OpcPackage()
+        with patch.object(OpcPackage, '_walk_parts',
+                          return_value=parts) as _walk_parts:
+            assert pkg.parts is pkg.parts
+            assert _walk_parts.call_count == 1
+            parts[1]._add_relationship('reltype', 'target', 'rId1', True)
+            pkg.parts
+            assert _walk_parts.call_count == 2
+            pkg._add_relationship('reltype', 'target', 'rId1', True)
+            pkg.parts
+            assert _walk_parts.call_count == 3
+
+    def it_ignores_relationship_changes_in_other_packages(self):
+        pkg, other_pkg = OpcPackage.open(test_pptx_path), OpcPackage()
+        parts = pkg.parts
+        other_part = Part(PackURI('/part/name.xml'), None, None)
+        other_pkg._add_relationship('reltype', other_part, 'rId1')
+        other_pkg.parts
+        other_part._add_relationship('reltype', 'target', 'rId1', True)
+        with patch.object(OpcPackage, '_walk_parts') as _walk_parts:
+            assert pkg.parts is parts
+            assert not _walk_parts.called
+
+    def it_can_find_a_part_by_partname(self):
+        part1 = Part(PackURI('/part/name1.xml'), None, None)
+        part2 = Part(PackURI('/part/name2.xml'), None, None)
+        pkg = OpcPackage()
+        with patch.object(OpcPackage, '_walk_parts',
+                          return_value=[part1, part2]):
+            assert pkg.part_for('/part/name2.xml') is part2
+            part1.partname = PackURI('/part/name3.xml')
+            assert pkg.part_for('/part/name3.xml') is part1
+            part2._partname = PackURI('/part/name4.xml')
+            assert pkg.part_for('/part/name4.xml') is part2
+            with pytest.raises(KeyError):
+                pkg.part_for('/part/name1.xml')
+
     def it_can_iterate_over_parts_by_walking_rels_graph(self):
         # +----------+       +--------+
         # | pkg_rels |-----> | part_1 |
@@ -129,7 +328,177 @@ class DescribeOpcPackage(object):
         for part in parts:
             part._before_marshal.assert_called_once_with()
         PackageWriter_.write.assert_called_once_with(pkg_file, pkg._rels,
-                                                     parts)
+                                                     parts, None, None,
+                                                     None)
+
+    def it_can_save_using_a_pool_of_compression_workers(self, PackageWriter_,
+                                                        parts):
+        pkg_file = Mock(name='pkg_file')
+        pkg = OpcPackage()
+        parts.return_value = parts = [Mock(name='part1')]
+        pkg.save(pkg_file, workers=4)
+        PackageWriter_.write.assert_called_once_with(pkg_file, pkg._rels,
+                                                     parts, 4, None, None)
+
+    def it_can_save_with_a_compression_policy(self, PackageWriter_, parts):
+        pkg_file = Mock(name='pkg_file')
+        compression = Mock(name='compression')
+        pkg = OpcPackage()
+        parts.return_value = parts = [Mock(name='part1')]
+        pkg.save(pkg_file, compression=compression)
+        PackageWriter_.write.assert_called_once_with(
+            pkg_file, pkg._rels, parts, None, None, compression)
+
+    def it_can_inspect_a_pkg_file(self, PackageReader_):
+        pkg_file = Mock(name='pkg_file')
+        manifest = OpcPackage.inspect(pkg_file)
+        PackageReader_.inspect.assert_called_once_with(pkg_file, None)
+        assert manifest is PackageReader_.inspect.return_value
+
+    def it_can_open_part_of_a_pkg_file(self, PackageReader_, Unmarshaller_):
+        pkg_file, follow = Mock(name='pkg_file'), Mock(name='follow')
+        pkg = OpcPackage.open(pkg_file, follow=follow)
+        PackageReader_.from_file.assert_called_once_with(pkg_file, False,
+                                                         None, follow, None)
+        assert pkg.is_partial is True
+
+    def it_raises_on_save_of_a_partial_package(self, PackageWriter_):
+        pkg = OpcPackage()
+        pkg._is_partial = True
+        pkg._pkg_reader = Mock(name='pkg_reader')
+        with pytest.raises(ValueError):
+            pkg.save(Mock(name='pkg_file'))
+        with pytest.raises(ValueError):
+            pkg.save_incremental(Mock(name='pkg_file'))
+        assert not PackageWriter_.write.called
+        assert not PackageWriter_.update.called
+
+    def it_raises_on_save_over_the_pkg_file_it_holds_open(self,
+                                                          PackageWriter_):
+        pkg_file = Mock(name='pkg_file')
+        pkg = OpcPackage()
+        pkg._pkg_reader = pkg_reader = Mock(name='pkg_reader')
+        pkg_reader.reads_from.return_value = True
+        with pytest.raises(ValueError):
+            pkg.save(pkg_file)
+        pkg_reader.reads_from.assert_called_once_with(pkg_file)
+        assert not PackageWriter_.write.called
+
+    def it_can_save_incrementally_in_place(self, PackageWriter_, parts):
+        # mockery ----------------------
+        pkg_file = Mock(name='pkg_file')
+        pkg = OpcPackage()
+        pkg._pkg_reader = pkg_reader = Mock(name='pkg_reader')
+        parts.return_value = parts = [Mock(name='part1'), Mock(name='part2')]
+        # exercise ---------------------
+        pkg.save_incremental(pkg_file)
+        # verify -----------------------
+        PackageWriter_.update.assert_called_once_with(
+            pkg_file, pkg._rels, parts, pkg_reader, 0.5, None)
+        pkg_reader.reopen.assert_called_once_with(pkg_file)
+        for part in parts:
+            part._before_marshal.assert_called_once_with()
+            part._after_save.assert_called_once_with(pkg_reader)
+
+    def it_raises_on_save_incremental_to_another_pkg_file(
+            self, PackageWriter_, tmpdir):
+        other_path = str(tmpdir.join('other.pptx'))
+        with open(test_pptx_path, 'rb') as f:
+            tmpdir.join('other.pptx').write_binary(f.read())
+        with OpcPackage.open(test_pptx_path, lazy=True) as pkg:
+            with pytest.raises(ValueError):
+                pkg.save_incremental(other_path)
+            assert pkg._pkg_reader.reads_from(test_pptx_path)
+        assert not PackageWriter_.update.called
+
+    def it_raises_on_save_incremental_when_not_opened_lazily(self):
+        with pytest.raises(ValueError):
+            OpcPackage().save_incremental(Mock(name='pkg_file'))
+
+
+class DescribePackageCache(object):
+
+    @pytest.fixture
+    def pptx_copy(self, tmpdir):
+        pptx_copy = tmpdir.join('copy.pptx')
+        with open(test_pptx_path, 'rb') as f:
+            pptx_copy.write_binary(f.read())
+        return str(pptx_copy)
+
+    def it_parses_a_pkg_file_only_once(self, pptx_copy):
+        # setup ------------------------
+        cache = PackageCache()
+        PackageReader_ = patch('opc.package.PackageReader',
+                               wraps=PackageReader).start()
+        # exercise ---------------------
+        try:
+            pkg_1 = cache.open(pptx_copy)
+            pkg_2 = cache.open(pptx_copy)
+        finally:
+            patch.stopall()
+        # verify -----------------------
+        PackageReader_.from_file.assert_called_once_with(pptx_copy)
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert pkg_1 is not pkg_2
+        assert blobs_of(pkg_1) == blobs_of(pkg_2)
+
+    def it_parses_a_pkg_file_once_when_opened_concurrently(self, pptx_copy):
+        # setup ------------------------
+        cache = PackageCache()
+        from_file = PackageReader.from_file
+        parsed = []
+
+        def slow_from_file(pkg_file):
+            parsed.append(pkg_file)
+            time.sleep(0.05)
+            return from_file(pkg_file)
+
+        threads = [
+            threading.Thread(target=cache.open, args=(pptx_copy,))
+            for _ in range(4)
+        ]
+        # exercise ---------------------
+        with patch.object(PackageReader, 'from_file', slow_from_file):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        # verify -----------------------
+        assert parsed == [pptx_copy]
+        assert (cache.hits, cache.misses) == (3, 1)
+
+    def it_opens_independent_packages(self, pptx_copy):
+        cache = PackageCache()
+        pkg_1 = cache.open(pptx_copy)
+        pkg_1.part_for('/docProps/app.xml').blob = b'<foo/>'
+        pkg_2 = cache.open(pptx_copy)
+        assert pkg_2.part_for('/docProps/app.xml').blob != b'<foo/>'
+        assert pkg_2.part_for('/docProps/app.xml') is not (
+            pkg_1.part_for('/docProps/app.xml')
+        )
+
+    def it_reparses_a_pkg_file_that_changed(self, pptx_copy):
+        cache = PackageCache()
+        pkg = cache.open(pptx_copy)
+        pkg.part_for('/docProps/app.xml').blob = b'<foo/>'
+        pkg.save(pptx_copy)
+        reopened = cache.open(pptx_copy)
+        assert reopened.part_for('/docProps/app.xml').blob == b'<foo/>'
+        assert cache.misses == 2
+
+    def it_recognizes_a_pkg_file_by_digest(self, pptx_copy):
+        cache = PackageCache(keyed_by='digest')
+        cache.open(pptx_copy)
+        with open(pptx_copy, 'rb') as f:
+            cache.open(BytesIO(f.read()))
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert len(cache) == 1
+
+    def it_raises_on_a_pkg_file_it_cannot_cache(self, tmpdir):
+        with pytest.raises(ValueError):
+            PackageCache().open(str(tmpdir))
+        with pytest.raises(ValueError):
+            PackageCache(keyed_by='name')
 
 
 class DescribePart(object):
@@ -149,6 +518,70 @@ class DescribePart(object):
         assert part.content_type == content_type
         assert part.partname == partname
 
+    def it_can_clone_itself_without_its_relationships(self):
+        partname = PackURI('/part/name.xml')
+        part = Part(partname, 'app/xml', b'<a/>')
+        part._add_relationship('http://rt', 'http://foo', 'rId1', True)
+        clone = part._clone()
+        assert type(clone) is Part
+        assert clone.partname is partname
+        assert clone.blob is part.blob
+        assert len(clone.rels) == 0
+        assert len(part.rels) == 1
+
+    def it_reads_its_blob_on_first_access_when_loaded_lazily(self):
+        partname = Mock(name='partname')
+        blob_reader = Mock(name='blob_reader', caches_blobs=False)
+        part = Part(partname, None, None, blob_reader)
+        assert part.blob == blob_reader.blob_for.return_value
+        assert part.blob == blob_reader.blob_for.return_value
+        blob_reader.blob_for.assert_called_once_with(partname)
+
+    def it_leaves_its_blob_to_a_caching_blob_reader(self):
+        partname = Mock(name='partname')
+        blob_reader = Mock(name='blob_reader', caches_blobs=True)
+        part = Part(partname, None, None, blob_reader)
+        assert part.blob == blob_reader.blob_for.return_value
+        assert part.blob == blob_reader.blob_for.return_value
+        assert blob_reader.blob_for.call_count == 2
+        assert part._blob is None
+        assert part.is_dirty is False
+
+    def it_is_clean_until_its_blob_is_assigned(self):
+        partname = Mock(name='partname')
+        part = Part(partname, None, None, Mock(name='blob_reader'))
+        part.blob
+        assert part.is_dirty is False
+        part.blob = b'foobar'
+        assert part.is_dirty is True
+        assert part.blob == b'foobar'
+
+    def it_can_open_a_stream_on_its_lazily_loaded_content(self):
+        partname = Mock(name='partname')
+        blob_reader = Mock(name='blob_reader')
+        part = Part(partname, None, None, blob_reader)
+        stream = part.open_stream()
+        blob_reader.open_stream.assert_called_once_with(partname)
+        assert stream is blob_reader.open_stream.return_value
+        assert not blob_reader.blob_for.called
+
+    def it_can_open_a_stream_on_its_blob(self):
+        part = Part(Mock(name='partname'), None, b'foobar')
+        assert part.open_stream().read() == b'foobar'
+
+    def it_is_dirty_when_not_loaded_lazily(self):
+        part = Part(Mock(name='partname'), None, b'foobar')
+        assert part.is_dirty is True
+
+    def it_is_dirty_when_its_class_generates_its_blob(self):
+        class XmlPart(Part):
+            @property
+            def blob(self):
+                return b'<generated/>'
+        part = XmlPart(Mock(name='partname'), None, None,
+                       Mock(name='blob_reader'))
+        assert part.is_dirty is True
+
     def it_has_a_rels_collection_it_initializes_on_construction(
             self, RelationshipCollection_):
         partname = Mock(name='partname', baseURI='/')
@@ -175,6 +608,37 @@ class DescribePart(object):
         part._before_marshal()
 
 
+class DescribeStreamPart(object):
+
+    def it_generates_its_content_from_an_iterable(self):
+        chunks = [b'<a>', b'foo', b'</a>']
+        part = StreamPart(PackURI('/part/name.xml'), 'app/xml', iter(chunks))
+        assert part.is_streamed is True
+        assert list(part.iter_chunks()) == chunks
+
+    def it_generates_its_content_from_a_file_like_object(self):
+        content = b'x' * (StreamPart._CHUNK_SIZE + 1)
+        part = StreamPart(PackURI('/part/name.bin'), 'app/bin',
+                          BytesIO(content))
+        chunks = list(part.iter_chunks())
+        assert len(chunks) == 2
+        assert b''.join(chunks) == content
+
+    def it_cannot_be_cloned_before_its_content_is_read(self):
+        part = StreamPart(PackURI('/part/name.xml'), 'app/xml',
+                          iter([b'<a>', b'</a>']))
+        with pytest.raises(ValueError):
+            part._clone()
+        part.blob
+        assert part._clone().blob == b'<a></a>'
+
+    def it_can_materialize_its_content_as_a_blob(self):
+        part = StreamPart(PackURI('/part/name.xml'), 'app/xml',
+                          iter([b'<a>', b'</a>']))
+        assert part.blob == b'<a></a>'
+        assert list(part.iter_chunks()) == [b'<a></a>']
+
+
 class DescribePartFactory(object):
 
     @pytest.fixture
@@ -190,9 +654,44 @@ class DescribePartFactory(object):
         # exercise ---------------------
         part = PartFactory(partname, content_type, blob)
         # verify -----------------------
-        Part_.assert_called_once_with(partname, content_type, blob)
+        Part_.assert_called_once_with(partname, content_type, blob, None)
+        assert part == Part_.return_value
+
+    def it_constructs_a_lazily_loaded_part_instance(self, Part_):
+        partname, content_type, blob_reader = (
+            Mock(name='partname'), Mock(name='content_type'),
+            Mock(name='blob_reader')
+        )
+        part = PartFactory(partname, content_type, None, blob_reader)
+        Part_.assert_called_once_with(partname, content_type, None,
+                                      blob_reader)
+        assert not blob_reader.blob_for.called
         assert part == Part_.return_value
 
+    def it_reads_blob_before_loading_custom_part_from_blob_reader(self):
+        CustomPartClass = Mock(name='CustomPartClass')
+        partname, blob_reader = (
+            Mock(name='partname'), Mock(name='blob_reader')
+        )
+        PartFactory.part_type_for[CT.PML_SLIDE] = CustomPartClass
+        try:
+            part = PartFactory(partname, CT.PML_SLIDE, None, blob_reader)
+        finally:
+            del PartFactory.part_type_for[CT.PML_SLIDE]
+        blob_reader.blob_for.assert_called_once_with(partname)
+        CustomPartClass.load.assert_called_once_with(
+            partname, CT.PML_SLIDE, blob_reader.blob_for.return_value)
+        assert part is CustomPartClass.load.return_value
+
+    def it_can_name_the_part_class_for_a_content_type(self):
+        CustomPartClass = Mock(name='CustomPartClass')
+        PartFactory.part_type_for[CT.PML_SLIDE] = CustomPartClass
+        try:
+            assert PartFactory.part_class_for(CT.PML_SLIDE) is CustomPartClass
+        finally:
+            del PartFactory.part_type_for[CT.PML_SLIDE]
+        assert PartFactory.part_class_for(CT.PML_SLIDE) is Part
+
     def it_constructs_custom_part_type_for_registered_content_types(self):
         # mockery ----------------------
         CustomPartClass = Mock(name='CustomPartClass')
@@ -242,6 +741,13 @@ class Describe_Relationship(object):
         rel = _Relationship(None, None, part, baseURI)  # external=False
         assert rel.target_ref == '../media/image1.png'
 
+    def it_reflects_a_renamed_target_in_its_relative_ref(self):
+        part = Mock(name='part', partname=PackURI('/ppt/media/image1.png'))
+        rel = _Relationship(None, None, part, '/ppt/slides')
+        rel.target_ref
+        part.partname = PackURI('/ppt/media/image2.png')
+        assert rel.target_ref == '../media/image2.png'
+
 
 class DescribeRelationshipCollection(object):
 
@@ -288,6 +794,11 @@ class DescribeRelationshipCollection(object):
         rels = RelationshipCollection(None)
         assert len(rels) == 0
 
+    def it_is_iterable(self):
+        rels = RelationshipCollection(None)
+        rel = rels.add_relationship('reltype', 'target', 'rId1', True)
+        assert [r for r in rels] == [rel]
+
     def it_supports_indexed_access(self):
         rels = RelationshipCollection(None)
         try:
@@ -299,18 +810,44 @@ class DescribeRelationshipCollection(object):
             pass
 
     def it_has_dict_style_lookup_of_rel_by_rId(self):
-        rel = Mock(name='rel', rId='foobar')
         rels = RelationshipCollection(None)
-        rels._rels.append(rel)
+        rel = rels.add_relationship('reltype', 'target', 'foobar', True)
         assert rels['foobar'] == rel
 
     def it_should_raise_on_failed_lookup_by_rId(self):
-        rel = Mock(name='rel', rId='foobar')
         rels = RelationshipCollection(None)
-        rels._rels.append(rel)
+        rels.add_relationship('reltype', 'target', 'foobar', True)
         with pytest.raises(KeyError):
             rels['barfoo']
 
+    def it_can_find_the_single_rel_of_a_reltype(self):
+        rels = RelationshipCollection(None)
+        rel = rels.add_relationship('reltype1', 'target', 'rId1', True)
+        rels.add_relationship('reltype2', 'target', 'rId2', True)
+        rels.add_relationship('reltype2', 'target', 'rId3', True)
+        assert rels.get_rel_of_type('reltype1') is rel
+        with pytest.raises(ValueError):
+            rels.get_rel_of_type('reltype2')
+        with pytest.raises(KeyError):
+            rels.get_rel_of_type('reltype3')
+
+    def it_can_list_the_rels_of_a_reltype(self):
+        rels = RelationshipCollection(None)
+        rel1 = rels.add_relationship('reltype1', 'target', 'rId1', True)
+        rels.add_relationship('reltype2', 'target', 'rId2', True)
+        rel3 = rels.add_relationship('reltype1', 'target', 'rId3', True)
+        assert rels.rels_of_type('reltype1') == [rel1, rel3]
+        assert rels.rels_of_type('reltype3') == []
+
+    def it_knows_the_next_available_rId(self):
+        rels = RelationshipCollection(None)
+        assert rels.next_available_rId == 'rId1'
+        for rId in ('rId1', 'rId2', 'rId4'):
+            rels.add_relationship('reltype', 'target', rId, True)
+        assert rels.next_available_rId == 'rId3'
+        rels.add_relationship('reltype', 'target', 'rId3', True)
+        assert rels.next_available_rId == 'rId5'
+
     def it_can_add_a_relationship(self, _Relationship_):
         baseURI, rId, reltype, target, external = (
             'baseURI', 'rId9', 'reltype', 'target', False
@@ -340,6 +877,32 @@ class DescribeRelationshipCollection(object):
 
 class DescribeUnmarshaller(object):
 
+    @pytest.fixture
+    def pkg_reader(self):
+        def srel(rId, target_partname):
+            return Mock(name='srel', rId=rId, reltype='http://rt',
+                        target_partname=target_partname, is_external=False)
+
+        pkg_reader = Mock(name='pkg_reader')
+        pkg_reader.iter_sparts.return_value = [
+            (PackURI(partname), content_type, b'<x/>')
+            for partname, content_type in (
+                ('/a.xml', 'ct/serial'), ('/b.xml', 'ct/safe'),
+                ('/c.xml', 'ct/serial'), ('/d.xml', 'ct/safe'),
+            )
+        ]
+        pkg_reader.iter_srels.return_value = [
+            ('/', srel('rId1', '/a.xml')),
+            ('/', srel('rId2', '/c.xml')),
+            ('/a.xml', srel('rId1', '/b.xml')),
+            ('/c.xml', srel('rId1', '/d.xml')),
+        ]
+        return pkg_reader
+
+    @pytest.fixture
+    def _unmarshal_in_parallel(self, request):
+        return method_mock(Unmarshaller, '_unmarshal_in_parallel', request)
+
     @pytest.fixture
     def _unmarshal_parts(self, request):
         return method_mock(Unmarshaller, '_unmarshal_parts', request)
@@ -365,6 +928,108 @@ class DescribeUnmarshaller(object):
         for part in parts.values():
             part._after_unmarshal.assert_called_once_with()
 
+    def it_can_unmarshal_from_a_pkg_reader_in_parallel(
+            self, _unmarshal_in_parallel, _unmarshal_parts):
+        pkg, pkg_reader, part_factory = (
+            Mock(name='pkg'), Mock(name='pkg_reader'),
+            Mock(name='part_factory')
+        )
+        Unmarshaller.unmarshal(pkg_reader, pkg, part_factory, workers=4)
+        _unmarshal_in_parallel.assert_called_once_with(pkg_reader, pkg,
+                                                       part_factory, 4)
+        assert not _unmarshal_parts.called
+
+    def it_unmarshals_thread_safe_parts_on_a_pool(self, pkg_reader):
+        # mockery ----------------------
+        main_thread = threading.current_thread()
+        events = []
+
+        def on_main_thread():
+            return threading.current_thread() is main_thread
+
+        class _SerialPart(Part):
+            @classmethod
+            def load(cls, partname, content_type, blob):
+                events.append(('load', partname, on_main_thread()))
+                return cls(partname, content_type, blob)
+
+            def _after_unmarshal(self):
+                events.append(('hook', self.partname, on_main_thread()))
+
+        class _ThreadSafePart(_SerialPart):
+            is_thread_safe = True
+
+        part_type_for = {'ct/safe': _ThreadSafePart, 'ct/serial': _SerialPart}
+
+        def part_factory(partname, content_type, blob):
+            return part_type_for[content_type].load(partname, content_type,
+                                                    blob)
+        part_factory.part_class_for = part_type_for.get
+
+        pkg = OpcPackage()
+        # exercise ---------------------
+        Unmarshaller.unmarshal(pkg_reader, pkg, part_factory, workers=2)
+        # verify -----------------------
+        parts = dict((p.partname, p) for p in pkg.parts)
+        assert sorted(parts) == ['/a.xml', '/b.xml', '/c.xml', '/d.xml']
+        assert parts['/a.xml'].rels['rId1'].target_part is parts['/b.xml']
+        assert parts['/c.xml'].rels['rId1'].target_part is parts['/d.xml']
+        serial_events = [e for e in events if e[2]]
+        pooled_events = [e for e in events if not e[2]]
+        assert serial_events == [
+            ('load', '/a.xml', True), ('load', '/c.xml', True),
+            ('hook', '/a.xml', True), ('hook', '/c.xml', True),
+        ]
+        assert sorted(pooled_events) == [
+            ('hook', '/b.xml', False), ('hook', '/d.xml', False),
+            ('load', '/b.xml', False), ('load', '/d.xml', False),
+        ]
+
+    def it_unmarshals_part_classes_not_derived_from_part(self, pkg_reader):
+        # mockery ----------------------
+        main_thread = threading.current_thread()
+        hook_threads = []
+
+        class _Slide(object):
+            def __init__(self, partname):
+                self.partname = partname
+                self.rels = []
+
+            @classmethod
+            def load(cls, partname, content_type, blob):
+                return cls(partname)
+
+            def _add_relationship(self, reltype, target, rId, external):
+                self.rels.append(target)
+
+            def _after_unmarshal(self):
+                hook_threads.append(threading.current_thread())
+
+        part_type_for = {'ct/safe': _Slide, 'ct/serial': _Slide}
+
+        def part_factory(partname, content_type, blob):
+            return part_type_for[content_type].load(partname, content_type,
+                                                    blob)
+        part_factory.part_class_for = part_type_for.get
+        # exercise ---------------------
+        Unmarshaller.unmarshal(pkg_reader, Mock(name='pkg'), part_factory,
+                               workers=2)
+        # verify -----------------------
+        assert hook_threads == [main_thread] * 4
+
+    def it_unmarshals_parts_on_the_calling_thread_for_other_factories(
+            self, pkg_reader):
+        main_thread = threading.current_thread()
+        threads = []
+
+        def part_factory(partname, content_type, blob):
+            threads.append(threading.current_thread())
+            return Part(partname, content_type, blob)
+
+        Unmarshaller.unmarshal(pkg_reader, OpcPackage(), part_factory,
+                               workers=2)
+        assert threads == [main_thread] * 4
+
     def it_can_unmarshal_parts(self):
         # test data --------------------
         part_properties = (
@@ -387,6 +1052,17 @@ class DescribeUnmarshaller(object):
         assert part_factory.call_args_list == expected_calls
         assert retval == expected_parts
 
+    def it_gives_lazily_loaded_parts_the_pkg_reader(self):
+        pkg_reader = Mock(name='pkg_reader')
+        pkg_reader.iter_sparts.return_value = (
+            ('/part/name1.xml', 'app/vnd.contentType_A', None),
+        )
+        part_factory = Mock(name='part_factory')
+        retval = Unmarshaller._unmarshal_parts(pkg_reader, part_factory)
+        part_factory.assert_called_once_with(
+            '/part/name1.xml', 'app/vnd.contentType_A', None, pkg_reader)
+        assert retval == {'/part/name1.xml': part_factory.return_value}
+
     def it_can_unmarshal_relationships(self):
         # test data --------------------
         reltype = 'http://reltype'
@@ -9,9 +9,11 @@
 
 """Test suite for opc.packuri module."""
 
+import pickle
+
 import pytest
 
-from opc.packuri import PackURI
+from opc.packuri import PackURI, _from_rel_ref_cache, _relative_ref_cache
 
 
 class DescribePackURI(object):
@@ -38,6 +40,25 @@ class DescribePackURI(object):
         pack_uri = PackURI.from_rel_ref(baseURI, relative_ref)
         assert pack_uri == '/ppt/slideLayouts/slideLayout1.xml'
 
+    def it_interns_instances_with_the_same_uri_str(self):
+        pack_uri = PackURI('/ppt/slides/slide1.xml')
+        assert PackURI('/ppt/slides/slide1.xml') is pack_uri
+        assert PackURI(pack_uri) is pack_uri
+
+    def it_unpickles_to_the_interned_instance(self):
+        pack_uri = PackURI('/ppt/slides/slide1.xml')
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            unpickled = pickle.loads(pickle.dumps(pack_uri, protocol))
+            assert unpickled is pack_uri
+            assert unpickled.baseURI == '/ppt/slides'
+
+    def it_caches_construction_from_relative_ref(self):
+        baseURI = '/ppt/slides'
+        relative_ref = '../slideLayouts/slideLayout1.xml'
+        pack_uri = PackURI.from_rel_ref(baseURI, relative_ref)
+        assert _from_rel_ref_cache.get((baseURI, relative_ref)) is pack_uri
+        assert PackURI.from_rel_ref(baseURI, relative_ref) is pack_uri
+
     def it_should_raise_on_construct_with_bad_pack_uri_str(self):
         with pytest.raises(ValueError):
             PackURI('foobar')
@@ -78,6 +99,12 @@ class DescribePackURI(object):
             pack_uri = PackURI(uri_str)
             assert pack_uri.relative_ref(baseURI) == expected_relative_ref
 
+    def it_caches_relative_ref_values(self):
+        pack_uri = PackURI('/ppt/slideLayouts/slideLayout1.xml')
+        relative_ref = pack_uri.relative_ref('/ppt/slides')
+        cached = _relative_ref_cache.get((pack_uri, '/ppt/slides'))
+        assert cached == relative_ref == '../slideLayouts/slideLayout1.xml'
+
     def it_can_calculate_rels_uri(self):
         expected_values = (
             '/_rels/.rels',
@@ -86,3 +113,7 @@ class DescribePackURI(object):
         )
         for pack_uri, expected_rels_uri in self.cases(expected_values):
             assert pack_uri.rels_uri == expected_rels_uri
+
+    def it_computes_rels_uri_only_once(self):
+        pack_uri = PackURI('/ppt/slides/slide1.xml')
+        assert pack_uri.rels_uri is pack_uri.rels_uri
@@ -16,16 +16,19 @@ except ImportError:
 
 import hashlib
 
-from zipfile import ZIP_DEFLATED, ZipFile
+from zipfile import BadZipfile, ZIP_DEFLATED, ZIP_STORED, ZipFile
 
+from opc.constants import CONTENT_TYPE as CT
 from opc.packuri import PACKAGE_URI, PackURI
 from opc.phys_pkg import (
-    PhysPkgReader, PhysPkgWriter, ZipPkgReader, ZipPkgWriter
+    DictPkgReader, DictPkgWriter, DirPkgReader, DirPkgWriter,
+    MmapZipPkgReader, PhysPkgReader, PhysPkgUpdater, PhysPkgWriter,
+    register_backend, ZipPkgReader, ZipPkgUpdater, ZipPkgWriter
 )
 
 import pytest
 
-from mock import Mock
+from mock import call, Mock, patch
 
 from .unitutil import abspath, class_mock
 
@@ -53,6 +56,39 @@ class DescribePhysPkgReader(object):
         ZipPkgReader_.assert_called_once_with(pkg_file)
         assert phys_pkg_reader == ZipPkgReader_.return_value
 
+    def it_constructs_a_mmap_reader_for_a_pkg_file_path(self):
+        # mockery ----------------------
+        _patch = patch('opc.phys_pkg.MmapZipPkgReader')
+        MmapZipPkgReader_ = _patch.start()
+        # exercise ---------------------
+        phys_pkg_reader = PhysPkgReader('/path/to/pkg.pptx')
+        _patch.stop()
+        # verify -----------------------
+        MmapZipPkgReader_.assert_called_once_with('/path/to/pkg.pptx')
+        assert phys_pkg_reader == MmapZipPkgReader_.return_value
+
+    def it_constructs_a_reader_suited_to_the_pkg_file(self, tmpdir):
+        assert isinstance(PhysPkgReader({}), DictPkgReader)
+        assert isinstance(PhysPkgReader(str(tmpdir)), DirPkgReader)
+
+    def it_constructs_a_reader_for_a_named_backend(self, request):
+        # mockery ----------------------
+        _patch = patch.dict('opc.phys_pkg._backends')
+        _patch.start()
+        request.addfinalizer(_patch.stop)
+        reader_factory = Mock(name='reader_factory')
+        register_backend('foo', reader_factory, None)
+        pkg_file = Mock(name='pkg_file')
+        # exercise ---------------------
+        phys_pkg_reader = PhysPkgReader(pkg_file, 'foo')
+        # verify -----------------------
+        reader_factory.assert_called_once_with(pkg_file)
+        assert phys_pkg_reader is reader_factory.return_value
+
+    def it_raises_on_an_unknown_backend(self):
+        with pytest.raises(ValueError):
+            PhysPkgReader(Mock(name='pkg_file'), 'foo')
+
 
 class DescribePhysPkgWriter(object):
 
@@ -66,9 +102,30 @@ class DescribePhysPkgWriter(object):
         # exercise ---------------------
         phys_pkg_writer = PhysPkgWriter(pkg_file)
         # verify -----------------------
-        ZipPkgWriter_.assert_called_once_with(pkg_file)
+        ZipPkgWriter_.assert_called_once_with(pkg_file, None)
         assert phys_pkg_writer == ZipPkgWriter_.return_value
 
+    def it_constructs_a_writer_suited_to_the_pkg_file(self, tmpdir):
+        assert isinstance(PhysPkgWriter({}), DictPkgWriter)
+        assert isinstance(PhysPkgWriter(str(tmpdir)), DirPkgWriter)
+
+    def it_constructs_a_writer_for_a_named_backend(self, tmpdir):
+        pkg_dir = str(tmpdir.join('pkg'))
+        assert isinstance(PhysPkgWriter(pkg_dir, 'dir'), DirPkgWriter)
+
+
+class DescribePhysPkgUpdater(object):
+
+    @pytest.fixture
+    def ZipPkgUpdater_(self, request):
+        return class_mock('opc.phys_pkg.ZipPkgUpdater', request)
+
+    def it_constructs_a_pkg_updater_instance(self, ZipPkgUpdater_):
+        pkg_file = Mock(name='pkg_file')
+        phys_pkg_updater = PhysPkgUpdater(pkg_file)
+        ZipPkgUpdater_.assert_called_once_with(pkg_file, None)
+        assert phys_pkg_updater == ZipPkgUpdater_.return_value
+
 
 class DescribeZipPkgReader(object):
 
@@ -107,11 +164,106 @@ class DescribeZipPkgReader(object):
         sha1 = hashlib.sha1(rels_xml).hexdigest()
         assert sha1 == 'e31451d4bbe7d24adbe21454b8e9fdae92f50de5'
 
+    def it_can_open_a_stream_on_a_pack_uri(self, phys_reader):
+        pack_uri = PackURI('/ppt/presentation.xml')
+        stream = phys_reader.open_stream(pack_uri)
+        sha1 = hashlib.sha1()
+        for chunk in iter(lambda: stream.read(256), b''):
+            sha1.update(chunk)
+        stream.close()
+        assert sha1.hexdigest() == 'efa7bee0ac72464903a67a6744c1169035d52a54'
+
+    def it_can_retrieve_the_raw_member_for_a_pack_uri(self, phys_reader):
+        pack_uri = PackURI('/ppt/presentation.xml')
+        zinfo, raw_chunks = phys_reader.raw_member_for(pack_uri)
+        raw_data = b''.join(raw_chunks)
+        assert zinfo.filename == 'ppt/presentation.xml'
+        assert len(raw_data) == zinfo.compress_size
+
+    def it_can_retrieve_the_size_of_a_member(self, phys_reader):
+        pack_uri = PackURI('/ppt/presentation.xml')
+        size, compressed_size = phys_reader.member_size(pack_uri)
+        assert size == len(phys_reader.blob_for(pack_uri))
+        assert compressed_size == (
+            phys_reader._zipf.getinfo(pack_uri.membername).compress_size)
+
     def it_returns_none_when_part_has_no_rels_xml(self, phys_reader):
         partname = PackURI('/ppt/viewProps.xml')
         rels_xml = phys_reader.rels_xml_for(partname)
         assert rels_xml is None
 
+    def it_knows_whether_it_reads_from_a_pkg_file(self, phys_reader):
+        assert phys_reader.reads_from(test_pptx_path)
+        assert phys_reader.reads_from(abspath('test_files/../test_files/'
+                                              'test.pptx'))
+        assert not phys_reader.reads_from(abspath('test_files/test.docx'))
+        assert not phys_reader.reads_from(BytesIO())
+
+
+class DescribeMmapZipPkgReader(object):
+
+    @pytest.fixture
+    def phys_reader(self, request):
+        phys_reader = MmapZipPkgReader(test_pptx_path)
+        request.addfinalizer(phys_reader.close)
+        return phys_reader
+
+    @pytest.fixture
+    def stored_pkg_path(self, tmpdir):
+        pkg_path = str(tmpdir.join('stored.zip'))
+        zipf = ZipFile(pkg_path, 'w', compression=ZIP_STORED)
+        zipf.writestr('[Content_Types].xml', b'<Types/>')
+        zipf.writestr('part/name.xml', b'<BlobbityFooBlob/>')
+        zipf.close()
+        return pkg_path
+
+    def it_reads_the_same_blobs_as_a_zip_reader(self, phys_reader):
+        zip_reader = ZipPkgReader(test_pptx_path)
+        pack_uri = PackURI('/ppt/presentation.xml')
+        assert phys_reader.blob_for(pack_uri) == zip_reader.blob_for(pack_uri)
+        assert phys_reader.content_types_xml == zip_reader.content_types_xml
+        assert (phys_reader.rels_xml_for(pack_uri) ==
+                zip_reader.rels_xml_for(pack_uri))
+        zip_reader.close()
+
+    def it_raises_on_a_missing_member(self, phys_reader):
+        with pytest.raises(KeyError):
+            phys_reader.blob_for(PackURI('/no/such/part.xml'))
+
+    def it_provides_a_zero_copy_view_of_a_stored_member(
+            self, stored_pkg_path):
+        phys_reader = MmapZipPkgReader(stored_pkg_path)
+        view = phys_reader.view_for(PackURI('/part/name.xml'))
+        assert isinstance(view, memoryview)
+        assert view.obj is phys_reader._mmap
+        assert view.tobytes() == b'<BlobbityFooBlob/>'
+        view.release()
+        phys_reader.close()
+
+    def it_provides_a_view_of_a_deflated_member(self, phys_reader):
+        pack_uri = PackURI('/ppt/presentation.xml')
+        view = phys_reader.view_for(pack_uri)
+        assert view.tobytes() == phys_reader.blob_for(pack_uri)
+
+    def it_can_retrieve_the_raw_member_for_a_pack_uri(self, phys_reader):
+        pack_uri = PackURI('/ppt/presentation.xml')
+        zinfo, raw_chunks = phys_reader.raw_member_for(pack_uri)
+        raw_data = b''.join(bytes(chunk) for chunk in raw_chunks)
+        assert len(raw_data) == zinfo.compress_size
+
+    def it_raises_on_a_bad_crc(self, stored_pkg_path):
+        phys_reader = MmapZipPkgReader(stored_pkg_path)
+        phys_reader._zipf.getinfo('part/name.xml').CRC ^= 1
+        with pytest.raises(BadZipfile):
+            phys_reader.blob_for(PackURI('/part/name.xml'))
+        phys_reader.close()
+
+    def it_raises_on_an_empty_file(self, tmpdir):
+        pkg_path = str(tmpdir.join('empty.zip'))
+        open(pkg_path, 'wb').close()
+        with pytest.raises(BadZipfile):
+            MmapZipPkgReader(pkg_path)
+
 
 class DescribeZipPkgWriter(object):
 
@@ -151,3 +303,321 @@ class DescribeZipPkgWriter(object):
         zipf.close()
         retrieved_blob_sha1 = hashlib.sha1(retrieved_blob).hexdigest()
         assert retrieved_blob_sha1 == written_blob_sha1
+
+    def it_can_write_a_raw_member(self, pkg_file):
+        # setup ------------------------
+        src_uri = PackURI('/ppt/presentation.xml')
+        pack_uri = PackURI('/ppt/presentation2.xml')
+        phys_reader = ZipPkgReader(test_pptx_path)
+        zinfo, raw_chunks = phys_reader.raw_member_for(src_uri)
+        # exercise ---------------------
+        pkg_writer = ZipPkgWriter(pkg_file)
+        pkg_writer.write_raw(pack_uri, zinfo, raw_chunks)
+        pkg_writer.write(PackURI('/part/name.xml'), b'<Blob/>')
+        pkg_writer.close()
+        # verify -----------------------
+        expected_blob = phys_reader.blob_for(src_uri)
+        phys_reader.close()
+        zipf = ZipFile(pkg_file, 'r')
+        assert zipf.testzip() is None
+        assert zipf.read(pack_uri.membername) == expected_blob
+        assert zipf.read('part/name.xml') == b'<Blob/>'
+        zipf.close()
+
+    def it_can_write_a_stream_of_chunks(self, pkg_file):
+        # setup ------------------------
+        pack_uri = PackURI('/part/name.xml')
+        chunks = [b'<Blob>', b'foo' * 1000, b'</Blob>']
+        # exercise ---------------------
+        pkg_writer = ZipPkgWriter(pkg_file)
+        pkg_writer.write_stream(pack_uri, iter(chunks))
+        pkg_writer.close()
+        # verify -----------------------
+        zipf = ZipFile(pkg_file, 'r')
+        assert zipf.testzip() is None
+        assert zipf.read(pack_uri.membername) == b''.join(chunks)
+        zipf.close()
+
+    def it_can_compress_a_blob_for_raw_writing(self, pkg_file):
+        # setup ------------------------
+        pack_uri = PackURI('/part/name.xml')
+        blob = b'<BlobbityFooBlob/>' * 100
+        # exercise ---------------------
+        pkg_writer = ZipPkgWriter(pkg_file)
+        zinfo, raw_chunks = pkg_writer.compress(pack_uri, blob)
+        pkg_writer.write_raw(pack_uri, zinfo, raw_chunks)
+        pkg_writer.close()
+        # verify -----------------------
+        assert zinfo.compress_type == ZIP_DEFLATED
+        assert zinfo.compress_size < len(blob)
+        zipf = ZipFile(pkg_file, 'r')
+        assert zipf.testzip() is None
+        assert zipf.read(pack_uri.membername) == blob
+        zipf.close()
+
+    def it_compresses_each_member_as_its_policy_decides(self, pkg_file):
+        # mockery ----------------------
+        compression = Mock(name='compression')
+        compression.level_for.side_effect = (
+            lambda content_type, size=None: 0 if content_type == 'x/y' else 9
+        )
+        blob = b'<BlobbityFooBlob/>' * 100
+        # exercise ---------------------
+        pkg_writer = ZipPkgWriter(pkg_file, compression)
+        pkg_writer.write(PackURI('/stored.bin'), blob, 'x/y')
+        pkg_writer.write(PackURI('/deflated.xml'), blob, 'a/b+xml')
+        pkg_writer.write_stream(PackURI('/streamed.bin'), iter((blob,)),
+                                'x/y')
+        pkg_writer.close()
+        # verify -----------------------
+        assert compression.level_for.call_args_list == [
+            call('x/y', len(blob)), call('a/b+xml', len(blob)), call('x/y')
+        ]
+        zipf = ZipFile(pkg_file, 'r')
+        assert zipf.testzip() is None
+        compress_types = [(zinfo.filename, zinfo.compress_type)
+                          for zinfo in zipf.infolist()]
+        assert compress_types == [('stored.bin', ZIP_STORED),
+                                  ('deflated.xml', ZIP_DEFLATED),
+                                  ('streamed.bin', ZIP_STORED)]
+        zipf.close()
+
+    def it_stores_compressed_media_by_default(self, pkg_file):
+        pkg_writer = ZipPkgWriter(pkg_file)
+        zinfo, _ = pkg_writer.compress(PackURI('/media/image1.png'),
+                                       b'\x89PNG', CT.PNG)
+        assert zinfo.compress_type == ZIP_STORED
+
+
+class DescribeZipPkgUpdater(object):
+
+    @pytest.fixture
+    def pkg_file(self, request):
+        with open(test_pptx_path, 'rb') as f:
+            pkg_file = BytesIO(f.read())
+        request.addfinalizer(pkg_file.close)
+        return pkg_file
+
+    def it_opens_pkg_file_zip_for_appending(self, ZipFile_):
+        pkg_file = Mock(name='pkg_file')
+        ZipPkgUpdater(pkg_file)
+        ZipFile_.assert_called_once_with(pkg_file, 'a',
+                                         compression=ZIP_DEFLATED)
+
+    def it_can_read_an_existing_member_blob(self, pkg_file):
+        pkg_updater = ZipPkgUpdater(pkg_file)
+        blob = pkg_updater.member_blob(PackURI('/ppt/presentation.xml'))
+        sha1 = hashlib.sha1(blob).hexdigest()
+        assert sha1 == 'efa7bee0ac72464903a67a6744c1169035d52a54'
+        assert pkg_updater.member_blob(PackURI('/no/such/part.xml')) is None
+        pkg_updater.close()
+
+    def it_replaces_an_existing_member_on_write(self, pkg_file):
+        # setup ------------------------
+        pack_uri = PackURI('/docProps/core.xml')
+        membernames = ZipFile(pkg_file, 'r').namelist()
+        # exercise ---------------------
+        pkg_updater = ZipPkgUpdater(pkg_file)
+        pkg_updater.write(pack_uri, b'<Blob/>')
+        pkg_updater.close()
+        # verify -----------------------
+        zipf = ZipFile(pkg_file, 'r')
+        assert zipf.testzip() is None
+        assert sorted(zipf.namelist()) == sorted(membernames)
+        assert zipf.read(pack_uri.membername) == b'<Blob/>'
+        zipf.close()
+
+    def it_removes_the_members_not_retained(self, pkg_file):
+        # setup ------------------------
+        pack_uris = [PackURI('/[Content_Types].xml'),
+                     PackURI('/ppt/presentation.xml')]
+        # exercise ---------------------
+        pkg_updater = ZipPkgUpdater(pkg_file)
+        pkg_updater.retain(pack_uris)
+        pkg_updater.close()
+        # verify -----------------------
+        zipf = ZipFile(pkg_file, 'r')
+        assert sorted(zipf.namelist()) == [
+            '[Content_Types].xml', 'ppt/presentation.xml'
+        ]
+        zipf.close()
+
+    def it_can_compact_the_archive(self, pkg_file):
+        # setup ------------------------
+        pack_uri = PackURI('/ppt/presentation.xml')
+        pkg_updater = ZipPkgUpdater(pkg_file)
+        blob = pkg_updater.member_blob(pack_uri)
+        pkg_updater.write(pack_uri, blob)
+        pkg_updater.remove(PackURI('/docProps/thumbnail.jpeg'))
+        garbage_ratio = pkg_updater.garbage_ratio
+        # exercise ---------------------
+        pkg_updater.compact()
+        pkg_updater.close()
+        # verify -----------------------
+        assert garbage_ratio > 0.0
+        assert ZipPkgUpdater(pkg_file).garbage_ratio < 0.01
+        zipf = ZipFile(pkg_file, 'r')
+        assert zipf.testzip() is None
+        assert zipf.read(pack_uri.membername) == blob
+        assert 'docProps/thumbnail.jpeg' not in zipf.namelist()
+        zipf.close()
+        assert len(pkg_file.getvalue()) < len(open(test_pptx_path,
+                                                   'rb').read())
+
+
+class DescribeDirPkgReader(object):
+
+    @pytest.fixture
+    def pkg_dir(self, tmpdir):
+        tmpdir.join('[Content_Types].xml').write_binary(b'<Types/>')
+        tmpdir.join('_rels', '.rels').write_binary(b'<Relationships/>',
+                                                   ensure=True)
+        tmpdir.join('ppt', 'presentation.xml').write_binary(b'<foo/>',
+                                                            ensure=True)
+        return str(tmpdir)
+
+    def it_can_retrieve_the_blob_for_a_pack_uri(self, pkg_dir):
+        phys_reader = DirPkgReader(pkg_dir)
+        blob = phys_reader.blob_for(PackURI('/ppt/presentation.xml'))
+        assert blob == b'<foo/>'
+
+    def it_raises_on_a_missing_member(self, pkg_dir):
+        phys_reader = DirPkgReader(pkg_dir)
+        with pytest.raises(KeyError):
+            phys_reader.blob_for(PackURI('/no/such/part.xml'))
+
+    def it_has_the_content_types_xml(self, pkg_dir):
+        assert DirPkgReader(pkg_dir).content_types_xml == b'<Types/>'
+
+    def it_can_retrieve_rels_xml_for_source_uri(self, pkg_dir):
+        phys_reader = DirPkgReader(pkg_dir)
+        partname = PackURI('/ppt/presentation.xml')
+        assert phys_reader.rels_xml_for(PACKAGE_URI) == b'<Relationships/>'
+        assert phys_reader.rels_xml_for(partname) is None
+
+    def it_can_retrieve_the_size_of_a_member(self, pkg_dir):
+        phys_reader = DirPkgReader(pkg_dir)
+        pack_uri = PackURI('/ppt/presentation.xml')
+        assert phys_reader.member_size(pack_uri) == (6, 6)
+        with pytest.raises(KeyError):
+            phys_reader.member_size(PackURI('/no/such/part.xml'))
+
+    def it_can_open_a_stream_on_a_pack_uri(self, pkg_dir):
+        phys_reader = DirPkgReader(pkg_dir)
+        stream = phys_reader.open_stream(PackURI('/ppt/presentation.xml'))
+        assert stream.read() == b'<foo/>'
+        stream.close()
+
+    def it_knows_whether_it_reads_from_a_pkg_file(self, pkg_dir, tmpdir):
+        phys_reader = DirPkgReader(pkg_dir)
+        assert phys_reader.reads_from(pkg_dir)
+        assert not phys_reader.reads_from(str(tmpdir.join('ppt')))
+        assert not phys_reader.reads_from(BytesIO())
+
+
+class DescribeDirPkgWriter(object):
+
+    def it_writes_each_member_to_a_file(self, tmpdir):
+        # mockery ----------------------
+        pkg_dir = tmpdir.join('pkg')
+        pack_uri = PackURI('/ppt/slides/slide1.xml')
+        # exercise ---------------------
+        phys_writer = DirPkgWriter(str(pkg_dir))
+        phys_writer.write(pack_uri, b'<foo/>')
+        phys_writer.write_stream(PackURI('/a.bin'), iter((b'ab', b'cd')))
+        phys_writer.write_raw(PackURI('/b.bin'),
+                              *phys_writer.compress(None, b'ef'))
+        phys_writer.close()
+        # verify -----------------------
+        assert pkg_dir.join('ppt', 'slides', 'slide1.xml').read_binary() == (
+            b'<foo/>')
+        assert pkg_dir.join('a.bin').read_binary() == b'abcd'
+        assert pkg_dir.join('b.bin').read_binary() == b'ef'
+
+    def it_removes_stale_members_of_a_previous_package(self, tmpdir):
+        # mockery ----------------------
+        tmpdir.join('[Content_Types].xml').write_binary(
+            b'<Types xmlns="http://schemas.openxmlformats.org/package/2006/'
+            b'content-types"><Override PartName="/ppt/old.xml" ContentType'
+            b'="app/xml"/></Types>'
+        )
+        tmpdir.join('_rels', '.rels').write_binary(
+            b'<Relationships xmlns="http://schemas.openxmlformats.org/package'
+            b'/2006/relationships"><Relationship Id="rId1" Type="http://rt" '
+            b'Target="ppt/old.xml"/></Relationships>', ensure=True
+        )
+        tmpdir.join('ppt', 'old.xml').write_binary(b'<old/>', ensure=True)
+        tmpdir.join('notes.txt').write_binary(b'keep me')
+        tmpdir.join('.git', 'HEAD').write_binary(b'keep me', ensure=True)
+        # exercise ---------------------
+        phys_writer = DirPkgWriter(str(tmpdir))
+        phys_writer.write(PackURI('/[Content_Types].xml'), b'<New/>')
+        phys_writer.close()
+        # verify -----------------------
+        assert sorted(p.basename for p in tmpdir.listdir()) == [
+            '.git', '[Content_Types].xml', 'notes.txt'
+        ]
+        assert tmpdir.join('[Content_Types].xml').read_binary() == b'<New/>'
+        assert tmpdir.join('.git', 'HEAD').read_binary() == b'keep me'
+
+    def it_refuses_a_directory_not_holding_a_package(self, tmpdir):
+        tmpdir.join('notes.txt').write('keep me')
+        with pytest.raises(ValueError):
+            DirPkgWriter(str(tmpdir))
+
+
+class DescribeDictPkgReader(object):
+
+    @pytest.fixture
+    def phys_reader(self):
+        return DictPkgReader({
+            '[Content_Types].xml': b'<Types/>',
+            '_rels/.rels': b'<Relationships/>',
+            'ppt/presentation.xml': b'<foo/>',
+        })
+
+    def it_can_retrieve_the_blob_for_a_pack_uri(self, phys_reader):
+        blob = phys_reader.blob_for(PackURI('/ppt/presentation.xml'))
+        assert blob == b'<foo/>'
+
+    def it_has_the_content_types_xml(self, phys_reader):
+        assert phys_reader.content_types_xml == b'<Types/>'
+
+    def it_can_retrieve_rels_xml_for_source_uri(self, phys_reader):
+        partname = PackURI('/ppt/presentation.xml')
+        assert phys_reader.rels_xml_for(PACKAGE_URI) == b'<Relationships/>'
+        assert phys_reader.rels_xml_for(partname) is None
+
+    def it_can_open_a_stream_on_a_pack_uri(self, phys_reader):
+        stream = phys_reader.open_stream(PackURI('/ppt/presentation.xml'))
+        assert stream.read() == b'<foo/>'
+
+    def it_can_retrieve_the_size_of_a_member(self, phys_reader):
+        pack_uri = PackURI('/ppt/presentation.xml')
+        assert phys_reader.member_size(pack_uri) == (6, 6)
+
+    def it_knows_whether_it_reads_from_a_pkg_file(self):
+        members = {}
+        phys_reader = DictPkgReader(members)
+        assert phys_reader.reads_from(members)
+        assert not phys_reader.reads_from({})
+
+
+class DescribeDictPkgWriter(object):
+
+    def it_replaces_the_members_of_the_dict(self):
+        # mockery ----------------------
+        members = {'stale.xml': b'<stale/>'}
+        # exercise ---------------------
+        phys_writer = DictPkgWriter(members)
+        phys_writer.write(PackURI('/ppt/presentation.xml'), b'<foo/>')
+        phys_writer.write_stream(PackURI('/a.bin'), iter((b'ab', b'cd')))
+        phys_writer.write_raw(PackURI('/b.bin'),
+                              *phys_writer.compress(None, b'ef'))
+        phys_writer.close()
+        # verify -----------------------
+        assert members == {
+            'ppt/presentation.xml': b'<foo/>',
+            'a.bin': b'abcd',
+            'b.bin': b'ef',
+        }
@@ -13,22 +13,23 @@ import pytest
 
 from mock import call, Mock, patch
 
-from opc.constants import RELATIONSHIP_TARGET_MODE as RTM
-from opc.packuri import PackURI
-from opc.phys_pkg import ZipPkgReader
+from opc.cache import BlobCache
+from opc.constants import (
+    CONTENT_TYPE as CT, RELATIONSHIP_TARGET_MODE as RTM,
+    RELATIONSHIP_TYPE as RT
+)
+from opc.packuri import PACKAGE_URI, PackURI
 from opc.pkgreader import (
-    _ContentTypeMap, PackageReader, _SerializedPart, _SerializedRelationship,
+    _ContentTypeMap, PackageManifest, PackageReader, PartInfo,
+    _SerializedPart, _SerializedRelationship,
     _SerializedRelationshipCollection
 )
 
-from .unitutil import class_mock, initializer_mock, method_mock
+from .unitdata import a_Relationships, a_Types
+from .unitutil import abspath, class_mock, initializer_mock, method_mock
 
 
-@pytest.fixture
-def oxml_fromstring(request):
-    _patch = patch('opc.pkgreader.oxml_fromstring')
-    request.addfinalizer(_patch.stop)
-    return _patch.start()
+test_pptx_path = abspath('test_files/test.pptx')
 
 
 class DescribePackageReader(object):
@@ -47,7 +48,7 @@ class DescribePackageReader(object):
 
     @pytest.fixture
     def PhysPkgReader_(self, request):
-        _patch = patch('opc.pkgreader.PhysPkgReader', spec_set=ZipPkgReader)
+        _patch = patch('opc.pkgreader.PhysPkgReader')
         request.addfinalizer(_patch.stop)
         return _patch.start()
 
@@ -79,15 +80,100 @@ class DescribePackageReader(object):
         # exercise ---------------------
         pkg_reader = PackageReader.from_file(pkg_file)
         # verify -----------------------
-        PhysPkgReader_.assert_called_once_with(pkg_file)
+        PhysPkgReader_.assert_called_once_with(pkg_file, None)
         from_xml.assert_called_once_with(phys_reader.content_types_xml)
-        _srels_for.assert_called_once_with(phys_reader, '/')
-        _load_serialized_parts.assert_called_once_with(phys_reader, pkg_srels,
-                                                       content_types)
+        _srels_for.assert_called_once_with(phys_reader, '/', None)
+        _load_serialized_parts.assert_called_once_with(
+            phys_reader, pkg_srels, content_types, False, None, None)
         phys_reader.close.assert_called_once_with()
         init.assert_called_once_with(content_types, pkg_srels, sparts)
         assert isinstance(pkg_reader, PackageReader)
 
+    def it_keeps_phys_reader_open_when_loaded_lazily(
+            self, init, PhysPkgReader_, from_xml, _srels_for,
+            _load_serialized_parts):
+        phys_reader = PhysPkgReader_.return_value
+        content_types = from_xml.return_value
+        pkg_srels = _srels_for.return_value
+        sparts = _load_serialized_parts.return_value
+        PackageReader.from_file(Mock(name='pkg_file'), lazy=True)
+        _load_serialized_parts.assert_called_once_with(
+            phys_reader, pkg_srels, content_types, True, None, None)
+        assert not phys_reader.close.called
+        init.assert_called_once_with(content_types, pkg_srels, sparts,
+                                     phys_reader)
+
+    def it_can_read_a_blob_on_demand(self):
+        phys_reader = Mock(name='phys_reader')
+        pkg_reader = PackageReader(None, None, [], phys_reader)
+        blob = pkg_reader.blob_for('/part/name.xml')
+        phys_reader.blob_for.assert_called_once_with('/part/name.xml')
+        assert blob == phys_reader.blob_for.return_value
+
+    def it_serves_blobs_from_its_blob_cache(self):
+        # mockery ----------------------
+        phys_reader = Mock(name='phys_reader')
+        phys_reader.blob_for.return_value = b'foobar'
+        pkg_reader = PackageReader(None, None, [], phys_reader)
+        pkg_reader.blob_cache = blob_cache = BlobCache(1024)
+        partname = PackURI('/part/name.xml')
+        # exercise ---------------------
+        blobs = [pkg_reader.blob_for(partname) for _ in range(3)]
+        # verify -----------------------
+        assert blobs == [b'foobar'] * 3
+        phys_reader.blob_for.assert_called_once_with(partname)
+        assert (blob_cache.hits, blob_cache.misses) == (2, 1)
+        assert pkg_reader.caches_blobs is True
+
+    def it_does_not_serve_blobs_cached_before_it_was_reopened(
+            self, PhysPkgReader_):
+        partname = PackURI('/part/name.xml')
+        phys_reader = Mock(name='phys_reader')
+        phys_reader.blob_for.return_value = b'old'
+        PhysPkgReader_.return_value.blob_for.return_value = b'new'
+        pkg_reader = PackageReader(None, None, [], phys_reader)
+        pkg_reader.blob_cache = BlobCache(1024)
+        pkg_reader.blob_for(partname)
+        pkg_reader.reopen(Mock(name='pkg_file'))
+        assert pkg_reader.blob_for(partname) == b'new'
+
+    def it_can_open_a_stream_on_a_part(self):
+        phys_reader = Mock(name='phys_reader')
+        pkg_reader = PackageReader(None, None, [], phys_reader)
+        stream = pkg_reader.open_stream('/part/name.xml')
+        phys_reader.open_stream.assert_called_once_with('/part/name.xml')
+        assert stream == phys_reader.open_stream.return_value
+
+    def it_closes_its_phys_reader_on_close(self):
+        phys_reader = Mock(name='phys_reader')
+        pkg_reader = PackageReader(None, None, [], phys_reader)
+        pkg_reader.close()
+        phys_reader.close.assert_called_once_with()
+        with pytest.raises(ValueError):
+            pkg_reader.blob_for('/part/name.xml')
+
+    def it_knows_whether_it_reads_from_a_pkg_file(self):
+        pkg_file = Mock(name='pkg_file')
+        phys_reader = Mock(name='phys_reader')
+        pkg_reader = PackageReader(None, None, [], phys_reader)
+        assert pkg_reader.reads_from(pkg_file) is (
+            phys_reader.reads_from.return_value)
+        phys_reader.reads_from.assert_called_once_with(pkg_file)
+        pkg_reader.close()
+        assert pkg_reader.reads_from(pkg_file) is False
+
+    def it_can_reopen_its_phys_reader(self, PhysPkgReader_):
+        # mockery ----------------------
+        pkg_file = Mock(name='pkg_file')
+        phys_reader = Mock(name='phys_reader')
+        pkg_reader = PackageReader(None, None, [], phys_reader)
+        # exercise ---------------------
+        pkg_reader.reopen(pkg_file)
+        # verify -----------------------
+        phys_reader.close.assert_called_once_with()
+        PhysPkgReader_.assert_called_once_with(pkg_file)
+        assert pkg_reader._phys_reader is PhysPkgReader_.return_value
+
     def it_can_iterate_over_the_serialized_parts(self):
         # mockery ----------------------
         partname, content_type, blob = ('part/name.xml', 'app/vnd.type',
@@ -150,6 +236,29 @@ class DescribePackageReader(object):
         assert _SerializedPart_.call_args_list == expected_calls
         assert retval == expected_sparts
 
+    def it_can_read_blobs_on_a_pool_of_threads(self):
+        pkg_reader = PackageReader.from_file(test_pptx_path, workers=3)
+        expected = PackageReader.from_file(test_pptx_path)
+        assert list(pkg_reader.iter_sparts()) == list(expected.iter_sparts())
+
+    def it_walks_lazily_before_reading_blobs_on_a_pool(
+            self, _SerializedPart_, _walk_phys_parts):
+        phys_reader = Mock(name='phys_reader')
+        phys_reader.blob_for.side_effect = lambda partname: partname.upper()
+        _walk_phys_parts.return_value = iter([
+            ('/a.xml', None, 'srels_a'), ('/b.xml', None, 'srels_b'),
+        ])
+        content_types = {'/a.xml': 'ct_a', '/b.xml': 'ct_b'}
+        PackageReader._load_serialized_parts(
+            phys_reader, 'pkg_srels', content_types, workers=2
+        )
+        _walk_phys_parts.assert_called_once_with(
+            phys_reader, 'pkg_srels', lazy=True, follow_srel=None)
+        assert _SerializedPart_.call_args_list == [
+            call('/a.xml', 'ct_a', '/A.XML', 'srels_a'),
+            call('/b.xml', 'ct_b', '/B.XML', 'srels_b'),
+        ]
+
     def it_can_walk_phys_pkg_parts(self, _srels_for):
         # test data --------------------
         # +----------+       +--------+
@@ -194,6 +303,16 @@ class DescribePackageReader(object):
         ]
         assert generated_tuples == expected_tuples
 
+    def it_does_not_read_blobs_when_walking_lazily(self, _srels_for):
+        srels = [Mock(name='rId1', is_external=False,
+                      target_partname='/part/name1.xml')]
+        phys_reader = Mock(name='phys_reader')
+        _srels_for.return_value = []
+        generated_tuples = [t for t in PackageReader._walk_phys_parts(
+            phys_reader, srels, lazy=True)]
+        assert generated_tuples == [('/part/name1.xml', None, [])]
+        assert not phys_reader.blob_for.called
+
     def it_can_retrieve_srels_for_a_source_uri(
             self, _SerializedRelationshipCollection_):
         # mockery ----------------------
@@ -209,46 +328,109 @@ class DescribePackageReader(object):
         load_from_xml.assert_called_once_with(source_uri.baseURI, rels_xml)
         assert retval == srels
 
-
-class Describe_ContentTypeMap(object):
-
-    def it_can_construct_from_types_xml(self, oxml_fromstring):
-        # test data --------------------
-        content_types = (
-            'app/vnd.type1', 'app/vnd.type2', 'app/vnd.type3',
-            'app/vnd.type4',
-        )
-        content_types_xml = '<DontCare/>'
-        extensions = ('rels', 'xml')
-        exts = tuple(['.%s' % extension for extension in extensions])
-        partnames = ('/part/name1.xml', '/part/name2.xml')
+    def it_prunes_the_srels_not_followed(self):
         # mockery ----------------------
-        overrides = (
-            Mock(name='override_elm_1', partname=partnames[0],
-                 content_type=content_types[0]),
-            Mock(name='override_elm_2', partname=partnames[1],
-                 content_type=content_types[1]),
+        phys_reader = Mock(name='phys_reader')
+        phys_reader.rels_xml_for.return_value = a_Relationships().xml
+        source_uri = PackURI('/ppt/presentation.xml')
+        follow_srel = Mock(name='follow_srel')
+        follow_srel.side_effect = (
+            lambda source_uri, srel: srel.reltype == 'http://reltype2'
         )
-        defaults = (
-            Mock(name='default_elm_1', extension=extensions[0],
-                 content_type=content_types[2]),
-            Mock(name='default_elm_2', extension=extensions[1],
-                 content_type=content_types[3]),
+        # exercise ---------------------
+        srels = PackageReader._srels_for(phys_reader, source_uri,
+                                         follow_srel)
+        # verify -----------------------
+        assert [srel.rId for srel in srels] == ['rId2', 'rId3']
+        assert follow_srel.call_count == 2
+        assert follow_srel.call_args[0][0] is source_uri
+
+    def it_only_loads_the_parts_it_follows(self):
+        # mockery ----------------------
+        follow = Mock(name='follow')
+        follow.side_effect = lambda source_uri, reltype, content_type: (
+            content_type != CT.PML_SLIDE
         )
-        types_elm = Mock(
-            name='types_elm', overrides=overrides, defaults=defaults
+        # exercise ---------------------
+        pkg_reader = PackageReader.from_file(test_pptx_path, follow=follow)
+        # verify -----------------------
+        partnames = set(partname for partname, _, _ in
+                        pkg_reader.iter_sparts())
+        target_partnames = set(
+            srel.target_partname for _, srel in pkg_reader.iter_srels()
+            if not srel.is_external
         )
-        oxml_fromstring.return_value = types_elm
+        assert '/ppt/presentation.xml' in partnames
+        assert '/ppt/slides/slide1.xml' not in partnames
+        assert target_partnames <= partnames
+        follow.assert_any_call(PACKAGE_URI, RT.OFFICE_DOCUMENT,
+                               CT.PML_PRESENTATION_MAIN)
+
+    def it_can_inspect_a_pkg_file_without_reading_blobs(self):
+        # exercise ---------------------
+        with patch('opc.phys_pkg.ZipPkgReader._read_member',
+                   autospec=True) as _read_member:
+            _read_member.side_effect = self._read_metadata_member
+            with open(test_pptx_path, 'rb') as pkg_file:
+                manifest = PackageReader.inspect(pkg_file)
+        # verify -----------------------
+        assert _read_member.called
+        pkg_reader = PackageReader.from_file(test_pptx_path)
+        expected = [
+            (partname, content_type, len(blob))
+            for partname, content_type, blob in pkg_reader.iter_sparts()
+        ]
+        actual = [(part_info.partname, part_info.content_type,
+                   part_info.size) for part_info in manifest]
+        assert actual == expected
+        assert manifest['/docProps/thumbnail.jpeg'].compressed_size == 11061
+        assert [srel.rId for srel in manifest.pkg_srels] == (
+            [srel.rId for srel in pkg_reader._pkg_srels])
+
+    @staticmethod
+    def _read_metadata_member(phys_reader, membername):
+        if not (membername == '[Content_Types].xml' or
+                membername.endswith('.rels')):
+            raise AssertionError("read blob of part '%s'" % membername)
+        return phys_reader._zipf.read(membername)
+
+
+class DescribePackageManifest(object):
+
+    def it_describes_the_parts_of_a_package(self):
+        # mockery ----------------------
+        partname1, partname2 = PackURI('/a.xml'), PackURI('/b.png')
+        part_info1 = PartInfo(partname1, 'app/xml', 100, 20, 'srels1')
+        part_info2 = PartInfo(partname2, 'image/png', 50, 50, 'srels2')
+        # exercise ---------------------
+        manifest = PackageManifest('pkg_srels', [part_info1, part_info2])
+        # verify -----------------------
+        assert manifest.parts == (part_info1, part_info2)
+        assert list(manifest) == [part_info1, part_info2]
+        assert len(manifest) == 2
+        assert manifest[partname2] is part_info2
+        assert manifest.pkg_srels == 'pkg_srels'
+        assert manifest.size == 150
+        assert manifest.compressed_size == 70
+        assert part_info1.srels == 'srels1'
+
+
+class Describe_ContentTypeMap(object):
+
+    def it_can_construct_from_types_xml(self):
+        # test data --------------------
+        content_types_xml = a_Types().xml
         # exercise ---------------------
         ct_map = _ContentTypeMap.from_xml(content_types_xml)
         # verify -----------------------
         expected_overrides = {
-            partnames[0]: content_types[0], partnames[1]: content_types[1]
+            '/docProps/core.xml': 'app/vnd.type1',
+            '/ppt/presentation.xml': 'app/vnd.type2',
+            '/docProps/thumbnail.jpeg': 'image/jpeg',
         }
         expected_defaults = {
-            exts[0]: content_types[2], exts[1]: content_types[3]
+            '.xml': 'application/xml', '.jpeg': 'image/jpeg'
         }
-        oxml_fromstring.assert_called_once_with(content_types_xml)
         assert ct_map._overrides == expected_overrides
         assert ct_map._defaults == expected_defaults
 
@@ -301,12 +483,12 @@ class Describe_SerializedRelationship(object):
 
     def it_remembers_construction_values(self):
         # test data --------------------
-        rel_elm = Mock(
-            name='rel_elm', rId='rId9', reltype='ReLtYpE',
-            target_ref='docProps/core.xml', target_mode=RTM.INTERNAL
+        rId, reltype, target_ref, target_mode = (
+            'rId9', 'ReLtYpE', 'docProps/core.xml', RTM.INTERNAL
         )
         # exercise ---------------------
-        srel = _SerializedRelationship('/', rel_elm)
+        srel = _SerializedRelationship('/', rId, reltype, target_ref,
+                                       target_mode)
         # verify -----------------------
         assert srel.rId == 'rId9'
         assert srel.reltype == 'ReLtYpE'
@@ -317,9 +499,8 @@ class Describe_SerializedRelationship(object):
         cases = (RTM.INTERNAL, RTM.EXTERNAL, 'FOOBAR')
         expected_values = (False, True, False)
         for target_mode, expected_value in zip(cases, expected_values):
-            rel_elm = Mock(name='rel_elm', rId=None, reltype=None,
-                           target_ref=None, target_mode=target_mode)
-            srel = _SerializedRelationship(None, rel_elm)
+            srel = _SerializedRelationship(None, None, None, None,
+                                           target_mode)
             assert srel.is_external is expected_value
 
     def it_can_calculate_its_target_partname(self):
@@ -332,55 +513,54 @@ class Describe_SerializedRelationship(object):
         )
         for baseURI, target_ref, expected_partname in cases:
             # setup --------------------
-            rel_elm = Mock(name='rel_elm', rId=None, reltype=None,
-                           target_ref=target_ref, target_mode=RTM.INTERNAL)
             # exercise -----------------
-            srel = _SerializedRelationship(baseURI, rel_elm)
+            srel = _SerializedRelationship(baseURI, None, None, target_ref)
             # verify -------------------
             assert srel.target_partname == expected_partname
 
     def it_raises_on_target_partname_when_external(self):
-        rel_elm = Mock(
-            name='rel_elm', rId='rId9', reltype='ReLtYpE',
-            target_ref='docProps/core.xml', target_mode=RTM.EXTERNAL
-        )
-        srel = _SerializedRelationship('/', rel_elm)
+        srel = _SerializedRelationship('/', 'rId9', 'ReLtYpE',
+                                       'docProps/core.xml', RTM.EXTERNAL)
         with pytest.raises(ValueError):
             srel.target_partname
 
 
 class Describe_SerializedRelationshipCollection(object):
 
-    @pytest.fixture
-    def oxml_fromstring(self, request):
-        _patch = patch('opc.pkgreader.oxml_fromstring')
-        request.addfinalizer(_patch.stop)
-        return _patch.start()
-
     @pytest.fixture
     def _SerializedRelationship_(self, request):
         return class_mock('opc.pkgreader._SerializedRelationship', request)
 
-    def it_can_load_from_xml(self, oxml_fromstring, _SerializedRelationship_):
+    def it_can_load_from_xml(self, _SerializedRelationship_):
         # mockery ----------------------
-        baseURI, rels_item_xml, rel_elm_1, rel_elm_2 = (
-            Mock(name='baseURI'), Mock(name='rels_item_xml'),
-            Mock(name='rel_elm_1'), Mock(name='rel_elm_2'),
-        )
-        rels_elm = Mock(name='rels_elm', Relationship=[rel_elm_1, rel_elm_2])
-        oxml_fromstring.return_value = rels_elm
+        baseURI = Mock(name='baseURI')
+        rels_item_xml = a_Relationships().xml
         # exercise ---------------------
         srels = _SerializedRelationshipCollection.load_from_xml(
             baseURI, rels_item_xml)
         # verify -----------------------
         expected_calls = [
-            call(baseURI, rel_elm_1),
-            call(baseURI, rel_elm_2),
+            call(baseURI, 'rId1', 'http://reltype1', 'docProps/core.xml',
+                 RTM.INTERNAL),
+            call(baseURI, 'rId2', 'http://linktype', 'http://some/link',
+                 RTM.EXTERNAL),
+            call(baseURI, 'rId3', 'http://reltype2', '../slides/slide1.xml',
+                 RTM.INTERNAL),
         ]
-        oxml_fromstring.assert_called_once_with(rels_item_xml)
         assert _SerializedRelationship_.call_args_list == expected_calls
         assert isinstance(srels, _SerializedRelationshipCollection)
 
+    def it_loads_an_empty_collection_when_there_is_no_rels_xml(self):
+        srels = _SerializedRelationshipCollection.load_from_xml('/', None)
+        assert list(srels) == []
+
+    def it_can_filter_its_relationships(self):
+        srels = _SerializedRelationshipCollection.load_from_xml(
+            '/', a_Relationships().xml)
+        filtered = srels.filtered(lambda srel: srel.is_external)
+        assert [srel.rId for srel in filtered] == ['rId2']
+        assert [srel.rId for srel in srels] == ['rId1', 'rId2', 'rId3']
+
     def it_should_be_iterable(self):
         srels = _SerializedRelationshipCollection()
         try:
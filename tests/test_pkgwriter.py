@@ -14,6 +14,7 @@ import pytest
 from mock import call, MagicMock, Mock, patch
 
 from opc.constants import CONTENT_TYPE as CT
+from opc.package import RelationshipCollection
 from opc.packuri import PackURI
 from opc.pkgwriter import _ContentTypesItem, PackageWriter
 
@@ -63,9 +64,9 @@ class DescribePackageWriter(object):
         expected_calls = [
             call._write_content_types_stream(phys_writer, parts),
             call._write_pkg_rels(phys_writer, pkg_rels),
-            call._write_parts(phys_writer, parts),
+            call._write_parts(phys_writer, parts, None),
         ]
-        PhysPkgWriter_.assert_called_once_with(pkg_file)
+        PhysPkgWriter_.assert_called_once_with(pkg_file, None, None)
         assert _write_methods.mock_calls == expected_calls
         phys_writer.close.assert_called_once_with()
 
@@ -88,25 +89,131 @@ class DescribePackageWriter(object):
         PackageWriter._write_pkg_rels(phys_writer, pkg_rels)
         # verify -----------------------
         phys_writer.write.assert_called_once_with('/_rels/.rels',
-                                                  pkg_rels.xml)
+                                                  pkg_rels.xml,
+                                                  CT.OPC_RELATIONSHIPS)
 
     def it_can_write_a_list_of_parts(self):
         # mockery ----------------------
         phys_writer = Mock(name='phys_writer')
         rels = MagicMock(name='rels')
         rels.__len__.return_value = 1
-        part1 = Mock(name='part1', _rels=rels)
-        part2 = Mock(name='part2', _rels=[])
+        part1 = Mock(name='part1', is_streamed=False, _rels=rels)
+        part2 = Mock(name='part2', is_streamed=False, _rels=[])
         # exercise ---------------------
         PackageWriter._write_parts(phys_writer, [part1, part2])
         # verify -----------------------
         expected_calls = [
-            call(part1.partname, part1.blob),
-            call(part1.partname.rels_uri, part1._rels.xml),
-            call(part2.partname, part2.blob),
+            call(part1.partname, part1.blob, part1.content_type),
+            call(part1.partname.rels_uri, part1._rels.xml,
+                 CT.OPC_RELATIONSHIPS),
+            call(part2.partname, part2.blob, part2.content_type),
         ]
         assert phys_writer.write.mock_calls == expected_calls
 
+    def it_copies_the_raw_member_of_a_clean_part(self):
+        # mockery ----------------------
+        phys_writer = Mock(name='phys_writer', raw_format='zip')
+        part = Mock(name='part', is_dirty=False, _rels=[])
+        blob_reader = part._blob_reader
+        blob_reader.raw_format = 'zip'
+        blob_reader.raw_member_for.return_value = ('zinfo', 'raw_chunks')
+        # exercise ---------------------
+        PackageWriter._write_parts(phys_writer, [part])
+        # verify -----------------------
+        blob_reader.raw_member_for.assert_called_once_with(
+            part._src_partname)
+        phys_writer.write_raw.assert_called_once_with(
+            part.partname, 'zinfo', 'raw_chunks')
+        assert not phys_writer.write.called
+
+    def it_can_write_parts_compressed_in_parallel(self):
+        # mockery ----------------------
+        phys_writer = Mock(name='phys_writer', raw_format='zip')
+        phys_writer.compress.side_effect = (
+            lambda uri, blob, content_type: (uri, [blob])
+        )
+        rels = MagicMock(name='rels')
+        rels.__len__.return_value = 1
+        part1 = Mock(name='part1', is_dirty=True, is_streamed=False,
+                     _rels=rels)
+        part2 = Mock(name='part2', is_dirty=False, _rels=[])
+        part2._blob_reader.raw_format = 'zip'
+        part2._blob_reader.raw_member_for.return_value = ('zinfo', 'chunks')
+        part3 = Mock(name='part3', is_dirty=True, is_streamed=True, _rels=[])
+        # exercise ---------------------
+        PackageWriter._write_parts(phys_writer, [part1, part2, part3],
+                                   workers=2)
+        # verify -----------------------
+        expected_calls = [
+            call(part1.partname, part1.partname, [part1.blob]),
+            call(part1.partname.rels_uri, part1.partname.rels_uri,
+                 [part1._rels.xml]),
+            call(part2.partname, 'zinfo', 'chunks'),
+        ]
+        assert phys_writer.write_raw.mock_calls == expected_calls
+        phys_writer.write_stream.assert_called_once_with(
+            part3.partname, part3.iter_chunks.return_value,
+            part3.content_type)
+        assert not phys_writer.write.called
+
+    def it_streams_the_content_of_a_streamed_part(self):
+        phys_writer = Mock(name='phys_writer')
+        part = Mock(name='part', is_dirty=True, is_streamed=True, _rels=[])
+        PackageWriter._write_parts(phys_writer, [part])
+        phys_writer.write_stream.assert_called_once_with(
+            part.partname, part.iter_chunks.return_value, part.content_type)
+        assert not phys_writer.write.called
+
+    def it_leaves_an_unchanged_part_in_place_on_update(self):
+        phys_writer = Mock(name='phys_writer')
+        pkg_reader = Mock(name='pkg_reader')
+        part = Mock(name='part', is_dirty=False, _blob_reader=pkg_reader)
+        part._src_partname = part.partname
+        PackageWriter._update_part(phys_writer, part, pkg_reader)
+        assert not phys_writer.write_raw.called
+        assert not phys_writer.write.called
+
+    def it_writes_a_renamed_part_on_update(self):
+        # mockery ----------------------
+        phys_writer = Mock(name='phys_writer', raw_format='zip')
+        pkg_reader = Mock(name='pkg_reader', raw_format='zip')
+        pkg_reader.raw_member_for.return_value = ('zinfo', 'raw_chunks')
+        part = Mock(name='part', is_dirty=False, _blob_reader=pkg_reader)
+        # exercise ---------------------
+        PackageWriter._update_part(phys_writer, part, pkg_reader)
+        # verify -----------------------
+        pkg_reader.raw_member_for.assert_called_once_with(part._src_partname)
+        phys_writer.write_raw.assert_called_once_with(
+            part.partname, 'zinfo', 'raw_chunks')
+
+    def it_only_rewrites_a_rels_item_that_changed_on_update(self):
+        # mockery ----------------------
+        source_uri = PackURI('/ppt/presentation.xml')
+        target = Mock(name='target', partname=PackURI('/ppt/slides/s1.xml'))
+        rels = RelationshipCollection(source_uri.baseURI)
+        rels.add_relationship('http://reltype1', target, 'rId1')
+        phys_writer = Mock(name='phys_writer')
+        phys_writer.member_blob.return_value = rels.xml.replace(
+            b'slides/s1.xml', b'/ppt/slides/s1.xml')
+        # exercise ---------------------
+        pack_uris = PackageWriter._update_rels_item(phys_writer, source_uri,
+                                                    rels)
+        rels.add_relationship('http://reltype2', 'http://x', 'rId2', True)
+        PackageWriter._update_rels_item(phys_writer, source_uri, rels)
+        # verify -----------------------
+        assert pack_uris == [source_uri.rels_uri]
+        phys_writer.write.assert_called_once_with(source_uri.rels_uri,
+                                                  rels.xml,
+                                                  CT.OPC_RELATIONSHIPS)
+
+    def it_omits_the_rels_item_of_a_source_without_rels_on_update(self):
+        phys_writer = Mock(name='phys_writer')
+        source_uri = PackURI('/ppt/presentation.xml')
+        pack_uris = PackageWriter._update_rels_item(phys_writer, source_uri,
+                                                    [])
+        assert pack_uris == []
+        assert not phys_writer.write.called
+
 
 class Describe_ContentTypesItem(object):
 